@@ -0,0 +1,191 @@
+"""
+⏱️ Benchmark de banners de bienvenida/despedida (canales.render_banner)
+
+Compara el dibujo completo por miembro con la plantilla cacheada y muestra
+banners/segundo (render + PNG, lo mismo que hace un worker).
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_banners.py [--n 200]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from utils.image_effects import linear_gradient
+from módulos import canales
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🐢 IMPLEMENTACIÓN ANTERIOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+def legacy_render_banner(mode: str, seed: int, display_name: str, member_count: int, joined: str, avatar_bytes: bytes = None):
+    """canales.render_banner antes de la plantilla cacheada"""
+    W, H = 900, 400
+    
+    # Gradiente oscuro elegante
+    base = linear_gradient(W, H, (0, 10, 10), (30, 10, 40))
+    draw = ImageDraw.Draw(base)
+    
+    # Efectos de partículas (estrellas)
+    import random
+    random.seed(seed)
+    for _ in range(50):
+        x = random.randint(0, W)
+        y = random.randint(0, H)
+        size = random.randint(1, 3)
+        alpha = random.randint(100, 255)
+        draw.ellipse((x, y, x+size, y+size), fill=(255, 121, 198, alpha))
+    
+    # Marco rosa elegante con brillo
+    for i in range(3):
+        draw.rounded_rectangle(
+            (12-i, 12-i, W-12+i, H-12+i),
+            radius=24,
+            outline=(255, 121, 198, 100-i*20),
+            width=2
+        )
+    draw.rounded_rectangle(
+        (12, 12, W-12, H-12),
+        radius=24,
+        outline="#ff79c6",
+        width=4
+    )
+    
+    # Avatar con efecto glow
+    avatar_size = 140
+    try:
+        avatar = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA").resize((avatar_size, avatar_size))
+        
+        # Crear máscara circular
+        mask = Image.new("L", (avatar_size, avatar_size), 0)
+        ImageDraw.Draw(mask).ellipse((0, 0, avatar_size, avatar_size), fill=255)
+        
+        # Efecto glow alrededor del avatar
+        glow = Image.new("RGBA", (avatar_size+20, avatar_size+20), (0, 0, 0, 0))
+        glow_draw = ImageDraw.Draw(glow)
+        for i in range(10, 0, -1):
+            alpha = int(50 - i*4)
+            glow_draw.ellipse(
+                (10-i, 10-i, avatar_size+10+i, avatar_size+10+i),
+                fill=(255, 121, 198, alpha)
+            )
+        
+        base.paste(glow, (60-10, H//2 - avatar_size//2-10), glow)
+        avatar.putalpha(mask)
+        
+        # Borde del avatar
+        avatar_border = Image.new("RGBA", (avatar_size+8, avatar_size+8), (0, 0, 0, 0))
+        ImageDraw.Draw(avatar_border).ellipse((0, 0, avatar_size+8, avatar_size+8), outline="#ff79c6", width=4)
+        base.paste(avatar_border, (60-4, H//2 - avatar_size//2-4), avatar_border)
+        base.paste(avatar, (60, H//2 - avatar_size//2), avatar)
+    except:
+        pass
+    
+    # ──────────────────────────────
+    # CARGAR FUENTES PERSONALIZADAS (DESDE CARPETA fonts/)
+    # ──────────────────────────────
+    try:
+        # Busca la fuente en la carpeta fonts/ en el directorio raíz
+        font_title = ImageFont.truetype("fonts/classic.ttf", 40)  # Título grande
+        font_subtitle = ImageFont.truetype("fonts/classic.ttf", 20)  # Subtítulo
+        font_username = ImageFont.truetype("fonts/classic.ttf", 30)  # Usuario
+        font_info = ImageFont.truetype("fonts/classic.ttf", 20)  # Info extra
+    except:
+        # Fuentes por defecto más grandes
+        try:
+            font_title = ImageFont.truetype("arial.ttf", 48)
+            font_subtitle = ImageFont.truetype("arial.ttf", 28)
+            font_username = ImageFont.truetype("arial.ttf", 38)
+            font_info = ImageFont.truetype("arial.ttf", 24)
+        except:
+            font_title = None
+            font_subtitle = None
+            font_username = None
+            font_info = None
+    
+    if mode == "welcome":
+        title = "WELCOME TO NODEX"
+        subtitle = "a new soul has arrived"
+        icon = "@"
+    else:
+        title = "GOODBYE, SWEET SOUL"
+        subtitle = "your echo will remain"
+        icon = ":C"
+    
+    username = display_name[:20]
+    count = f"Soul #{member_count}"
+    
+    # ──────────────────────────────
+    # TEXTOS CON FUENTES GRANDES Y LEGIBLES
+    # ──────────────────────────────
+    text_x = 240
+    
+    # Título (GRANDE Y VISIBLE)
+    draw.text((text_x, 60), title, fill="#ff79c6", font=font_title)
+    
+    # Subtítulo
+    draw.text((text_x, 120), subtitle, fill="#d1d1d1", font=font_subtitle)
+    
+    # Usuario con icono
+    draw.text((text_x, 180), f"{icon} {username}", fill="#ffffff", font=font_username)
+    
+    # Contador de miembros
+    draw.text((text_x, 240), count, fill="#ff79c6", font=font_info)
+    
+    # Fecha/hora
+    draw.text((text_x, 280), joined, fill="#a0a0a0", font=font_info)
+    
+    # Decoraciones finales
+    draw.text((W-120, H-50), "<3", fill="#ff79c6", font=font_info)
+    
+    return base
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 📊 MEDICIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+def avatar_de_prueba() -> bytes:
+    img = linear_gradient(256, 256, (255, 121, 198), (60, 20, 100))
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def banners_por_segundo(render, n: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(n):
+        img = render(i)
+        img.save(io.BytesIO(), format="PNG")
+    return n / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200, help="banners por modo")
+    args = parser.parse_args()
+
+    avatar = avatar_de_prueba()
+    joined = "01/01/2026 - 12:00 UTC"
+
+    print(f"{'modo':<10}{'antes b/s':>12}{'ahora b/s':>12}{'speedup':>10}")
+    for mode in ("welcome", "leave"):
+        antes = banners_por_segundo(
+            lambda i: legacy_render_banner(mode, i, f"miembro{i}", 1000 + i, joined, avatar), args.n
+        )
+        ahora = banners_por_segundo(
+            lambda i: canales.render_banner(mode, f"miembro{i}", 1000 + i, joined, avatar), args.n
+        )
+        print(f"{mode:<10}{antes:>12.1f}{ahora:>12.1f}{ahora / antes:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
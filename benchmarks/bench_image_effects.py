@@ -0,0 +1,186 @@
+"""
+⏱️ Benchmark de utils.image_effects frente a los bucles que reemplaza
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_image_effects.py [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from utils import image_effects as fx
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🐢 IMPLEMENTACIONES ANTERIORES (copiadas de los builders)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def legacy_linear_scanlines(w, h, c1, c2):
+    """glass_image_builder._create_gradient_bg"""
+    img = Image.new('RGBA', (w, h))
+    draw = ImageDraw.Draw(img)
+    for y in range(h):
+        r = int(c1[0] + (c2[0] - c1[0]) * y / h)
+        g = int(c1[1] + (c2[1] - c1[1]) * y / h)
+        b = int(c1[2] + (c2[2] - c1[2]) * y / h)
+        draw.line([(0, y), (w, y)], fill=(r, g, b, 255))
+    return img
+
+
+def legacy_linear_pixels(w, h, c1, c2):
+    """roblox.create_gradient_bg (píxel a píxel)"""
+    img = Image.new('RGBA', (w, h))
+    pixels = img.load()
+    for y in range(h):
+        ratio = y / h
+        r = int(c1[0] + (c2[0] - c1[0]) * ratio)
+        g = int(c1[1] + (c2[1] - c1[1]) * ratio)
+        b = int(c1[2] + (c2[2] - c1[2]) * ratio)
+        for x in range(w):
+            pixels[x, y] = (r, g, b, 255)
+    return img
+
+
+def legacy_linear_putdata(w, h, c1, c2):
+    """ajustes.GlassCard.create_gradient (máscara con putdata)"""
+    base = Image.new('RGB', (w, h), c1)
+    top = Image.new('RGB', (w, h), c2)
+    mask = Image.new('L', (w, h))
+    mask.putdata([int(255 * (y / h)) for y in range(h) for x in range(w)])
+    base.paste(top, (0, 0), mask)
+    return base
+
+
+def legacy_radial(w, h, inner, outer):
+    img = Image.new('RGBA', (w, h))
+    pixels = img.load()
+    cx, cy = w / 2, h / 2
+    max_dist = (cx ** 2 + cy ** 2) ** 0.5
+    for y in range(h):
+        for x in range(w):
+            t = min(1.0, ((x - cx) ** 2 + (y - cy) ** 2) ** 0.5 / max_dist)
+            pixels[x, y] = tuple(int(a + (b - a) * t) for a, b in zip(inner, outer))
+    return img
+
+
+def legacy_vignette(w, h):
+    """anuncios._crear_fondo_glass_iphone: bloques de 5x5"""
+    vig = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(vig)
+    cx, cy = w // 2, h // 2
+    max_dist = (cx ** 2 + cy ** 2) ** 0.5
+    for y in range(0, h, 5):
+        for x in range(0, w, 5):
+            alpha = int(100 * (((x - cx) ** 2 + (y - cy) ** 2) ** 0.5 / max_dist))
+            draw.rectangle([x, y, x + 5, y + 5], fill=(0, 0, 0, alpha))
+    return vig
+
+
+def legacy_noise(w, h, max_alpha):
+    capa = Image.new('RGBA', (w, h))
+    capa.putdata([(255, 255, 255, random.randint(0, max_alpha)) for _ in range(w * h)])
+    return capa
+
+
+def legacy_sparkles(w, h, count):
+    """anuncios: 700 draw.ellipse"""
+    capa = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(capa)
+    for _ in range(count):
+        x, y = random.randint(0, w), random.randint(0, h)
+        size = random.randint(1, 3)
+        draw.ellipse([x, y, x + size, y + size], fill=(255, 255, 255, random.randint(10, 50)))
+    return capa
+
+
+def legacy_glass_tint(img, blur):
+    blurred = img.filter(ImageFilter.GaussianBlur(blur))
+    return Image.alpha_composite(blurred.convert('RGBA'), Image.new('RGBA', img.size, (255, 255, 255, 30)))
+
+
+# Radios de las luces y sombras de los builders
+RADIOS_BLUR = (15, 20, 30, 80, 150, 200)
+# Desde RADIO_CON_FACTOR fast_blur tiene que reducir en RGBA y ser más rápido que el
+# exacto; desde RADIO_CON_SPEEDUP, al menos SPEEDUP_MIN veces (si no, el script sale con 1)
+RADIO_CON_FACTOR = 30
+RADIO_CON_SPEEDUP = 80
+SPEEDUP_MIN = 1.3
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 📊 MEDICIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+def medir(func, repeat):
+    mejor = float("inf")
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--width", type=int, default=1200)
+    parser.add_argument("--height", type=int, default=800)
+    args = parser.parse_args()
+
+    w, h, n = args.width, args.height, args.repeat
+    c1, c2 = (10, 15, 40), (60, 20, 100)
+    base = fx.linear_gradient(w, h, c1, c2)
+    # Capa de luz como las de glass_image_builder (elipse de borde duro)
+    luz = Image.new('RGBA', (w, h), (0, 0, 0, 0))
+    ImageDraw.Draw(luz).ellipse([(w // 2 - 400, -150), (w // 2 + 400, 300)], fill=(150, 200, 255, 45))
+
+    casos = [
+        ("linear (scanlines)", lambda: legacy_linear_scanlines(w, h, c1, c2), lambda: fx.linear_gradient(w, h, c1, c2)),
+        ("linear (pixel loop)", lambda: legacy_linear_pixels(w, h, c1, c2), lambda: fx.linear_gradient(w, h, c1, c2)),
+        ("linear (putdata)", lambda: legacy_linear_putdata(w, h, c1, c2), lambda: fx.linear_gradient(w, h, c1, c2).convert('RGB')),
+        ("radial", lambda: legacy_radial(w, h, (255, 255, 255, 255), (0, 0, 0, 255)),
+         lambda: fx.radial_gradient(w, h, (255, 255, 255, 255), (0, 0, 0, 255))),
+        ("vignette", lambda: legacy_vignette(w, h), lambda: fx.vignette(w, h, 100)),
+        ("noise", lambda: legacy_noise(w, h, 20), lambda: fx.noise(w, h, 20)),
+        ("sparkles x700", lambda: legacy_sparkles(w, h, 700), lambda: fx.sparkle_field(w, h, 700)),
+        ("glass tint", lambda: legacy_glass_tint(base, 30), lambda: fx.glass_tint(base, (255, 255, 255), 30, blur=30)),
+    ]
+    for radio in RADIOS_BLUR:
+        casos.append((f"blur r={radio}", lambda r=radio: luz.filter(ImageFilter.GaussianBlur(r)),
+                      lambda r=radio: fx.fast_blur(luz, r)))
+
+    backend = "numpy " + fx.np.__version__ if fx.np is not None else "Pillow (sin numpy)"
+    print(f"Backend: {backend} | {w}x{h} | mejor de {n}")
+    print(f"{'primitiva':<22}{'antes ms':>12}{'ahora ms':>12}{'speedup':>10}")
+    speedups = {}
+    for nombre, antes, ahora in casos:
+        t_antes = medir(antes, n)
+        t_ahora = medir(ahora, n)
+        speedups[nombre] = t_antes / max(t_ahora, 1e-6)
+        print(f"{nombre:<22}{t_antes:>12.2f}{t_ahora:>12.2f}{speedups[nombre]:>9.1f}x")
+
+    print(f"\nBlur aproximado (umbral r>={fx.BLUR_UMBRAL}, error máx. {fx.BLUR_ERROR_MAX}/255)")
+    print(f"{'radio':<10}{'factor':>8}{'error luz':>12}{'error base':>12}")
+    fallos = []
+    for radio in RADIOS_BLUR:
+        factor = fx.factor_verificado(radio, 'RGBA')
+        print(f"{radio:<10}{factor:>8}{fx.blur_error(luz, radio, factor):>12}{fx.blur_error(base, radio, factor):>12}")
+        speedup = speedups[f"blur r={radio}"]
+        minimo = SPEEDUP_MIN if radio >= RADIO_CON_SPEEDUP else 1.0
+        if radio >= RADIO_CON_FACTOR and (factor <= 1 or speedup < minimo):
+            fallos.append(f"r={radio}: factor {factor}, {speedup:.2f}x (mín. {minimo}x)")
+
+    if fallos:
+        print("\n❌ fast_blur sin speedup: " + "; ".join(fallos))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+⏱️ Benchmark de todos los builders de imágenes + imágenes golden
+
+Cada caso es un RenderSpec con entradas fijas y azar sembrado; se ejecuta
+igual que en un worker (ejecutar_spec: render + encode) en un proceso nuevo,
+para que el pico de RSS sea solo de ese caso. Reporta ms/op, pico de RSS y
+bytes de salida, compara con benchmarks/baseline_renders.json y falla si algo
+empeora más del umbral. Además compara la salida con benchmarks/golden/ con
+un diff perceptual, para que una optimización no cambie el dibujo sin avisar.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_renders.py [--n 5] [--solo anuncio] [--umbral 0.15]
+    python benchmarks/bench_renders.py --guardar-baseline --guardar-golden
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from PIL import Image, ImageChops, ImageFilter, ImageStat
+
+
+BASELINE = os.path.join(RAIZ, "benchmarks", "baseline_renders.json")
+GOLDEN_DIR = os.path.join(RAIZ, "benchmarks", "golden")
+SEMILLA = 1234
+
+# Diff perceptual: se suavizan ambas imágenes (el antialiasing no cuenta) y se mide en luminancia
+DIFF_MEDIA_MAX = 1.5        # diferencia media tolerada (0-255)
+DIFF_PIXEL = 24             # un píxel "cambia" si difiere más que esto
+DIFF_PCT_MAX = 0.5          # % máximo de píxeles cambiados
+# Por debajo de esto el RSS extra se considera ruido
+RSS_RUIDO_MB = 2.0
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🧪 CASOS (entradas fijas)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _png(img) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _avatar(c1=(255, 121, 198), c2=(60, 20, 100), size=256):
+    from utils.image_effects import linear_gradient
+    return linear_gradient(size, size, c1, c2)
+
+
+TEXTO_LARGO = (
+    "Este fin de semana tenemos evento especial en el servidor: torneo, sorteos y "
+    "música en vivo. Pasen por el canal de anuncios para ver los horarios y las reglas."
+)
+
+
+def casos():
+    """nombre -> (target, args, kwargs) con datos planos; las imágenes PIL van en ENTRADAS_IMAGEN"""
+    avatar = _png(_avatar())
+    icono = _png(_avatar((0, 191, 255), (20, 20, 60), 128))
+    paises = {
+        str(i): {"nombre": nombre, "bandera": bandera, "color": color, "miembros": 10 + i}
+        for i, (nombre, bandera, color) in enumerate([
+            ("México", "🇲🇽", 0x006847), ("Argentina", "🇦🇷", 0x74ACDF),
+            ("Chile", "🇨🇱", 0xD52B1E), ("Colombia", "🇨🇴", 0xFCD116),
+            ("Perú", "🇵🇪", 0xD91023), ("Venezuela", "🇻🇪", 0xCF142B),
+        ])
+    }
+    ranking = [(f"usuario{i}", 50 - i * 3, 12000 - i * 900) for i in range(10)]
+    ajustes = {"levels_enabled": True, "xp_multiplier": 1.5, "xp_cooldown": 45,
+               "levelup_notifs": "channel", "theme": "PURPLE", "xp_min": 15, "xp_max": 25}
+    sugerencias = {
+        "titulo": "Buzón de Sugerencias", "subtitulo": "Tu opinión construye el servidor",
+        "mensaje_central": "Comparte tus ideas para mejorar la comunidad y vota las de los demás",
+        "pie_pagina": "Sistema de sugerencias", "color_principal": 0x9B59B6, "color_exito": 0x2ECC71,
+        "emoji_like": "👍", "emoji_dislike": "👎",
+    }
+    anuncio = {"tipo": "evento", "titulo": "Gran Evento de Verano", "contenido": TEXTO_LARGO,
+               "icono_bytes": icono, "guild_name": "NODEX", "variante": 0}
+
+    return {
+        # módulos/anuncios.py
+        "anuncio_estatico": ("módulos.anuncios:GeneradorImagenes.renderizar_anuncio", (), anuncio),
+        "anuncio_3d": ("módulos.anuncios:GeneradorImagenes.renderizar_anuncio", (), {**anuncio, "es_3d": True}),
+        "anuncio_gif": ("módulos.anuncios:GeneradorImagenes.renderizar_gif_anuncio", (), anuncio),
+        "anuncio_emblema": ("módulos.anuncios:GeneradorImagenes.renderizar_emblema",
+                            ("logro", "Miembro del Mes", icono, "dorado", False), {}),
+        "anuncio_barras": ("módulos.anuncios:GeneradorImagenes.renderizar_grafica_barras",
+                           (900, 500, {"Sí": 42, "No": 17, "Tal vez": 9}, "Encuesta semanal", (0, 191, 255)), {}),
+        # utils/glass_image_builder.py
+        "glass_verificacion": ("utils.glass_image_builder:GlassImageBuilder.create_verification_panel",
+                               ("RobloxUser123", 123456789), {}),
+        "glass_roblox": ("utils.glass_image_builder:GlassImageBuilder.create_roblox_panel", (35000000, "NODEX"), {}),
+        "glass_intro": ("utils.glass_image_builder:GlassImageBuilder.create_intro_panel", (), {}),
+        "glass_sugerencias_panel": ("utils.glass_image_builder:GlassImageBuilder.create_suggestion_panel",
+                                    (sugerencias,), {}),
+        "glass_sugerencia": ("utils.glass_image_builder:GlassImageBuilder.create_suggestion_image",
+                             ("usuario", "Eventos", "Hacer un torneo mensual de juegos", TEXTO_LARGO), {}),
+        "glass_perfil": ("utils.glass_image_builder:GlassImageBuilder.create_profile_card", (), {}),
+        # utils/country_image_builder.py
+        "pais_panel": ("utils.country_image_builder:CountryImageBuilder.create_country_panel", (paises["0"],), {}),
+        "pais_grid": ("utils.country_image_builder:CountryImageBuilder.create_countries_grid", (paises,), {}),
+        "pais_perfil": ("utils.country_image_builder:CountryImageBuilder.create_profile_card",
+                        (paises["1"], "usuario"), {}),
+        "pais_bienvenida": ("utils.country_image_builder:CountryImageBuilder.create_welcome_banner",
+                            ("NODEX", len(paises)), {}),
+        # utils/roblox_image_builder.py
+        "roblox_tarjeta": ("utils.roblox_image_builder:RobloxImageBuilder.create_verification_card", (), {}),
+        "roblox_simple": ("utils.roblox_image_builder:RobloxImageBuilder.create_simple_verification",
+                          ("usuario", "RobloxUser123"), {}),
+        # módulos/ajustes.py (GlassCard)
+        "card_perfil": ("módulos.ajustes:GlassCard.render_profile_card",
+                        ("usuario", avatar, {"level": 12, "xp": 3400, "messages": 820, "daily_streak": 5}, "PINK"), {}),
+        "card_ranking": ("módulos.ajustes:GlassCard.render_leaderboard_card", (ranking, "GOLD"), {}),
+        "card_config": ("módulos.ajustes:GlassCard.render_config_panel", ("NODEX", ajustes, "PURPLE"), {}),
+        "card_oraculo": ("módulos.ajustes:GlassCard.render_oracle_card", ("Hoy es un buen día para crear",), {}),
+        # banners y paneles de los módulos
+        "canales_bienvenida": ("módulos.canales:render_banner",
+                               ("welcome", "usuario", 1234, "01/01/2026 - 12:00 UTC", avatar), {}),
+        "canales_despedida": ("módulos.canales:render_banner",
+                              ("leave", "usuario", 1233, "01/01/2026 - 12:00 UTC", avatar), {}),
+        "ticket_panel": ("módulos.tickets:render_ticket_panel_banner", (), {"icon_bytes": icono}),
+        "confesiones_panel": ("módulos.confesiones:create_panel_image", (), {}),
+        "tiktok_creador": ("módulos.tiktokers:render_creator_banner", ("creador", avatar, "PINK"), {}),
+        "tiktok_herramientas": ("módulos.tiktokers:render_tools_banner",
+                                ("usuario", "creador", avatar, "PINK",
+                                 {"total_posts": 120, "total_likes": 45000, "total_views": 1200000}), {}),
+        "roblox_verificacion_panel": ("módulos.roblox:create_roblox_verification_panel", (35000000, "NODEX"), {}),
+    }
+
+
+# Casos que reciben imágenes PIL (no caben en el JSON de casos): se completan en el proceso
+ENTRADAS_IMAGEN = {
+    "glass_verificacion": lambda: {"bot_icon": _avatar((0, 191, 255), (20, 20, 60), 128)},
+    "glass_intro": lambda: {"server_icon": _avatar((0, 191, 255), (20, 20, 60), 128)},
+    "glass_perfil": lambda: {"discord_name": "usuario", "discord_avatar": _avatar(),
+                             "roblox_name": "RobloxUser123", "roblox_avatar": _avatar((0, 191, 255), (20, 20, 60))},
+    "roblox_tarjeta": lambda: {"discord_name": "usuario", "discord_avatar": _avatar(),
+                               "roblox_name": "RobloxUser123", "roblox_avatar": _avatar((0, 191, 255), (20, 20, 60))},
+}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 📊 MEDICIÓN (en un proceso por caso)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _rss_pico_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _sembrar():
+    random.seed(SEMILLA)
+    try:
+        import numpy as np
+        np.random.seed(SEMILLA)
+    except ImportError:
+        pass
+
+
+def _imagen(resultado) -> Image.Image:
+    """Salida del builder como imagen (primer frame si ya viene codificada)"""
+    if isinstance(resultado, Image.Image):
+        return resultado
+    if isinstance(resultado, io.BytesIO):
+        resultado = resultado.getvalue()
+    img = Image.open(io.BytesIO(resultado))
+    img.seek(0)
+    return img.copy()
+
+
+def medir_caso(nombre: str, n: int, formato: str, calidad: int, nivel: str) -> dict:
+    from utils.encode_policy import PoliticaEncode
+    from utils.render_service import RenderSpec, _resolver, ejecutar_spec
+    from utils.font_registry import precargar_fuentes
+    from utils.quality_tiers import activar
+
+    target, args, kwargs = casos()[nombre]
+    kwargs = {**kwargs, **ENTRADAS_IMAGEN.get(nombre, lambda: {})()}
+    spec = RenderSpec(target, args, kwargs, politica=PoliticaEncode(formato=formato, calidad=calidad),
+                      calidad=nivel)
+
+    # Igual que un worker ya caliente: fuentes precargadas y una pasada previa fuera del cronómetro
+    precargar_fuentes()
+    _sembrar()
+    activar(nivel)
+    golden = _png(_imagen(_resolver(target)(*args, **kwargs)).convert("RGBA"))
+    rss_base = _rss_pico_mb()
+
+    tiempos, tamaño = [], 0
+    for _ in range(n):
+        _sembrar()
+        inicio = time.perf_counter()
+        data, _ = ejecutar_spec(spec)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        tamaño = len(data)
+
+    tiempos.sort()
+    return {
+        "ms": round(tiempos[len(tiempos) // 2], 2),
+        "ms_min": round(tiempos[0], 2),
+        "rss_mb": round(_rss_pico_mb(), 1),
+        "rss_extra_mb": round(_rss_pico_mb() - rss_base, 1),
+        "bytes": tamaño,
+        "golden": golden,
+    }
+
+
+def _ejecutar_aislado(nombre: str, n: int, formato: str, calidad: int, nivel: str) -> dict:
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+        return pool.submit(medir_caso, nombre, n, formato, calidad, nivel).result()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🔍 DIFF PERCEPTUAL
+# ══════════════════════════════════════════════════════════════════════════════
+
+def diff_perceptual(a: Image.Image, b: Image.Image) -> dict:
+    """Diferencia media y % de píxeles cambiados en luminancia, tras un blur leve"""
+    if a.size != b.size:
+        return {"ok": False, "motivo": f"tamaño {a.size} != {b.size}", "media": 255.0, "pct": 100.0}
+
+    def preparar(img):
+        fondo = Image.new("RGBA", img.size, (0, 0, 0, 255))
+        return Image.alpha_composite(fondo, img.convert("RGBA")).convert("L").filter(ImageFilter.GaussianBlur(1))
+
+    diff = ImageChops.difference(preparar(a), preparar(b))
+    media = ImageStat.Stat(diff).mean[0]
+    histograma = diff.histogram()
+    cambiados = sum(histograma[DIFF_PIXEL + 1:])
+    pct = 100 * cambiados / (a.width * a.height)
+    ok = media <= DIFF_MEDIA_MAX and pct <= DIFF_PCT_MAX
+    return {"ok": ok, "motivo": "" if ok else "salida distinta", "media": round(media, 2), "pct": round(pct, 2)}
+
+
+def _ruta_golden(nombre: str) -> str:
+    return os.path.join(GOLDEN_DIR, f"{nombre}.png")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🏁 PRINCIPAL
+# ══════════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=5, help="repeticiones por caso (se usa la mediana)")
+    parser.add_argument("--solo", default=None, help="solo casos cuyo nombre contenga este texto")
+    parser.add_argument("--umbral", type=float, default=0.15, help="regresión tolerada (0.15 = 15%%)")
+    parser.add_argument("--formato", default="WEBP", help="formato de encode medido")
+    parser.add_argument("--calidad", type=int, default=85)
+    parser.add_argument("--nivel", default="completa", help="nivel de calidad (completa, reducida, minima)")
+    parser.add_argument("--guardar-baseline", action="store_true", help="escribir los resultados como baseline")
+    parser.add_argument("--guardar-golden", action="store_true", help="escribir las salidas como golden")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE):
+        with open(BASELINE, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    nombres = [c for c in casos() if not args.solo or args.solo in c]
+    resultados, fallos = {}, []
+
+    print(f"{'caso':<28}{'ms/op':>9}{'base':>9}{'RSS MB':>9}{'KB':>9}{'base KB':>9}{'golden':>14}")
+    for nombre in nombres:
+        try:
+            r = _ejecutar_aislado(nombre, args.n, args.formato, args.calidad, args.nivel)
+        except Exception as e:
+            fallos.append(f"{nombre}: error ({type(e).__name__}: {e})")
+            print(f"{nombre:<28}{'ERROR':>9}  {type(e).__name__}: {e}")
+            continue
+
+        golden_png = r.pop("golden")
+        resultados[nombre] = r
+        base = baseline.get(nombre, {})
+
+        # Golden
+        ruta = _ruta_golden(nombre)
+        if args.guardar_golden:
+            os.makedirs(GOLDEN_DIR, exist_ok=True)
+            with open(ruta, "wb") as f:
+                f.write(golden_png)
+            estado_golden = "guardado"
+        elif os.path.exists(ruta):
+            d = diff_perceptual(Image.open(io.BytesIO(golden_png)), Image.open(ruta))
+            estado_golden = f"{d['media']:.2f}/{d['pct']:.1f}%"
+            if not d["ok"]:
+                fallos.append(f"{nombre}: {d['motivo']} (media {d['media']}, {d['pct']}% píxeles)")
+                estado_golden += " ✗"
+        else:
+            estado_golden = "sin golden"
+
+        # Regresiones frente al baseline
+        if base and not args.guardar_baseline:
+            if r["ms"] > base["ms"] * (1 + args.umbral):
+                fallos.append(f"{nombre}: {r['ms']} ms/op vs {base['ms']} de baseline")
+            if r["bytes"] > base["bytes"] * (1 + args.umbral):
+                fallos.append(f"{nombre}: {r['bytes']} bytes vs {base['bytes']} de baseline")
+            if r["rss_extra_mb"] > max(base["rss_extra_mb"] * (1 + args.umbral), base["rss_extra_mb"] + RSS_RUIDO_MB):
+                fallos.append(f"{nombre}: +{r['rss_extra_mb']} MB de RSS vs +{base['rss_extra_mb']} de baseline")
+
+        print(
+            f"{nombre:<28}{r['ms']:>9.1f}{base.get('ms', float('nan')):>9.1f}{r['rss_mb']:>9.1f}"
+            f"{r['bytes'] / 1024:>9.1f}{base.get('bytes', float('nan')) / 1024:>9.1f}{estado_golden:>14}"
+        )
+
+    if args.guardar_baseline:
+        baseline.update(resultados)
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline guardado en {os.path.relpath(BASELINE, RAIZ)}")
+
+    if fallos:
+        print("\n❌ Regresiones:")
+        for fallo in fallos:
+            print(f"  - {fallo}")
+        sys.exit(1)
+    print("\n✅ Sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
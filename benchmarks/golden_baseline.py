@@ -0,0 +1,311 @@
+"""
+🖼️ Imágenes golden a partir del código de antes de la refactorización
+
+Las golden de bench_renders.py deben salir de los builders originales, no
+del código ya optimizado: si no, un diff de 0.00 solo demuestra que el
+render no cambió desde que se guardaron. Este script ejecuta los casos de
+bench_renders.py (mismas entradas y misma semilla) contra un checkout del
+commit baseline, adaptando cada caso a la API antigua (builders async,
+objetos de discord, descargas por URL servidas desde memoria).
+
+Uso (desde la raíz del repo):
+    git worktree add /tmp/desfcita-baseline <commit-baseline>
+    python benchmarks/golden_baseline.py /tmp/desfcita-baseline [--solo anuncio]
+
+Los casos cuya salida cambió a propósito en la serie están en
+CAMBIOS_INTENCIONADOS: para ellos no se escribe golden (lo guarda
+bench_renders.py --guardar-golden --solo <caso> en el commit del cambio).
+"""
+
+import io
+import os
+import sys
+import asyncio
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_DIR = os.path.join(RAIZ, "benchmarks", "golden")
+
+# caso -> motivo (request que cambió el dibujo a propósito)
+CAMBIOS_INTENCIONADOS = {
+    "anuncio_emblema": "user-007: burbujas y borde glass salen de la capa de fondo cacheada",
+    "anuncio_barras": "user-007: burbujas y borde glass salen de la capa de fondo cacheada",
+    "anuncio_estatico": "user-007/018: capa de fondo cacheada; texto partido por ancho en píxeles",
+    "anuncio_3d": "user-007/018: capa de fondo cacheada; texto partido por ancho en píxeles",
+    "anuncio_gif": "user-007/018: capa de fondo cacheada; texto partido por ancho en píxeles",
+    "glass_sugerencias_panel": "user-018: texto partido por ancho en píxeles (el alto cambia)",
+    "glass_sugerencia": "user-018: texto partido por ancho en píxeles",
+    "card_oraculo": "user-018: mensaje maquetado con el motor de texto (ancho real, no 30 caracteres)",
+    "card_ranking": "user-021: la XP se muestra por tramos y cada fila lleva avatar",
+}
+
+URL_AVATAR = "https://cdn.discordapp.com/avatars/1/avatar.png"
+URL_ICONO = "https://cdn.discordapp.com/icons/1/icono.png"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🧩 DOBLES DE RED Y DE DISCORD (solo en el proceso del árbol baseline)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _instalar_red(recursos: dict):
+    """aiohttp.ClientSession y requests.get sirven `recursos` (url -> bytes); el resto falla"""
+    import aiohttp
+
+    class _Respuesta:
+        def __init__(self, url):
+            if url not in recursos:
+                raise aiohttp.ClientError(f"sin red en el golden baseline: {url}")
+            self.status = 200
+            self._data = recursos[url]
+
+        async def read(self):
+            return self._data
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class _Sesion:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def get(self, url, **kwargs):
+            return _Respuesta(str(url))
+
+        async def close(self):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    aiohttp.ClientSession = _Sesion
+
+    try:
+        import requests
+
+        class _RespuestaRequests:
+            def __init__(self, url):
+                if url not in recursos:
+                    raise requests.ConnectionError(f"sin red en el golden baseline: {url}")
+                self.status_code = 200
+                self.content = recursos[url]
+
+        requests.get = lambda url, *args, **kwargs: _RespuestaRequests(str(url))
+    except ImportError:
+        pass
+
+
+class _Asset:
+    def __init__(self, url: str, data: bytes):
+        self.url = url
+        self._data = data
+
+    async def read(self):
+        return self._data
+
+    def __str__(self):
+        return self.url
+
+
+class _Obj:
+    def __init__(self, **atributos):
+        self.__dict__.update(atributos)
+
+
+def _fijar_fecha(modulo, *fecha):
+    """datetime.now/utcnow del módulo fijos (los casos del bench llevan la fecha en los argumentos)"""
+    from datetime import datetime
+
+    class _Fecha(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(*fecha)
+
+        @classmethod
+        def utcnow(cls):
+            return cls(*fecha)
+
+    modulo.datetime = _Fecha
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🔁 CASOS EN LA API ANTIGUA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _builder(ruta: str):
+    """'utils.glass_image_builder:GlassImageBuilder.create_intro_panel' -> método de una instancia"""
+    import importlib
+    modulo, _, nombre = ruta.partition(":")
+    clase, _, metodo = nombre.partition(".")
+    return getattr(getattr(importlib.import_module(modulo), clase)(), metodo)
+
+
+def _avatar_bytes(args, kwargs, indice: int):
+    return args[indice] if len(args) > indice else kwargs.get("avatar_bytes")
+
+
+async def _renderizar_baseline(nombre: str, target: str, args: tuple, kwargs: dict):
+    avatar = icono = None
+    if nombre.startswith("anuncio"):
+        from módulos.anuncios import GeneradorImagenes
+        gen = GeneradorImagenes()
+        if nombre in ("anuncio_estatico", "anuncio_3d"):
+            return await gen.crear_imagen_anuncio(
+                kwargs["tipo"], kwargs["titulo"], kwargs["contenido"], guild_icon_url=URL_ICONO,
+                guild_name=kwargs["guild_name"], es_3d=kwargs.get("es_3d", False)
+            )
+        if nombre == "anuncio_gif":
+            return await gen.crear_gif_anuncio(
+                tipo=kwargs["tipo"], titulo=kwargs["titulo"], contenido=kwargs["contenido"],
+                guild_icon_url=URL_ICONO, guild_name=kwargs["guild_name"]
+            )
+        if nombre == "anuncio_emblema":
+            tipo, titulo, _, color, es_3d = args
+            return await gen.crear_imagen_emblema(tipo, titulo, URL_ICONO, color, es_3d)
+        return gen.renderizar_grafica_barras(*args)
+
+    if target.startswith("utils."):
+        # Los builders de utils/ conservan firma: métodos de instancia síncronos
+        return _builder(target)(*args, **kwargs)
+
+    if nombre.startswith("card_"):
+        from módulos.ajustes import GlassCard
+        if nombre == "card_perfil":
+            display_name, avatar, datos, tema = args
+            miembro = _Obj(display_name=display_name, display_avatar=_Asset(URL_AVATAR, avatar))
+            return await GlassCard.create_profile_card(miembro, datos, tema)
+        if nombre == "card_ranking":
+            entradas, tema = args
+            bot = _Obj(get_user=lambda uid: _Obj(name=entradas[uid][0]))
+            filas = [(str(i), {"level": nivel, "xp": xp}) for i, (_, nivel, xp) in enumerate(entradas)]
+            return await GlassCard.create_leaderboard_card(filas, bot, tema)
+        if nombre == "card_config":
+            return await GlassCard.create_config_panel(*args)
+        return await GlassCard.create_oracle_card(*args)
+
+    if nombre.startswith("canales"):
+        import módulos.canales as canales
+        modo, display_name, miembros, _, avatar = args
+        # El bench pasa "01/01/2026 - 12:00 UTC": la versión antigua la leía del reloj
+        _fijar_fecha(canales, 2026, 1, 1, 12, 0)
+        miembro = _Obj(id=1, display_name=display_name, display_avatar=_Asset(URL_AVATAR, avatar),
+                       guild=_Obj(member_count=miembros))
+        return await canales.generate_banner(miembro, modo)
+
+    if nombre == "ticket_panel":
+        from módulos.tickets import generate_ticket_panel_banner
+        guild = _Obj(icon=_Asset(URL_ICONO, kwargs["icon_bytes"]))
+        return await generate_ticket_panel_banner(guild)
+
+    if nombre == "confesiones_panel":
+        from módulos.confesiones import create_panel_image
+        return create_panel_image()
+
+    if nombre.startswith("tiktok"):
+        import módulos.tiktokers as tiktokers
+        if nombre == "tiktok_creador":
+            usuario, _, color = args
+            return await tiktokers.generate_creator_banner(usuario, URL_AVATAR, color)
+        nombre_usuario, usuario, _, color, stats = args
+        return await tiktokers.generate_tools_banner(nombre_usuario, usuario, URL_AVATAR, color, stats)
+
+    if nombre == "roblox_verificacion_panel":
+        from módulos.roblox import create_roblox_verification_panel
+        return create_roblox_verification_panel(*args)
+
+    raise KeyError(f"caso sin adaptar a la API antigua: {nombre}")
+
+
+def _recursos(nombre: str, args: tuple, kwargs: dict) -> dict:
+    """Bytes que el caso del bench recibe ya descargados, por la URL que pedía la versión antigua"""
+    recursos = {}
+    if nombre.startswith("anuncio"):
+        icono = kwargs.get("icono_bytes") or (args[2] if nombre == "anuncio_emblema" else None)
+        if icono:
+            recursos[URL_ICONO] = icono
+    for indice_avatar, prefijo in ((1, "card_perfil"), (4, "canales"), (1, "tiktok_creador"),
+                                   (2, "tiktok_herramientas")):
+        if nombre.startswith(prefijo):
+            recursos[URL_AVATAR] = args[indice_avatar]
+    return recursos
+
+
+def generar_caso(arbol: str, nombre: str, target: str, args: tuple, kwargs: dict, semilla: int) -> bytes:
+    """En un proceso nuevo con el árbol baseline delante en sys.path: render -> PNG RGBA"""
+    os.chdir(arbol)
+    sys.path.insert(0, arbol)
+    _instalar_red(_recursos(nombre, args, kwargs))
+
+    import random
+    random.seed(semilla)
+    try:
+        import numpy as np
+        np.random.seed(semilla)
+    except ImportError:
+        pass
+
+    resultado = asyncio.run(_renderizar_baseline(nombre, target, args, kwargs))
+
+    from PIL import Image
+    if isinstance(resultado, io.BytesIO):
+        resultado = resultado.getvalue()
+    img = resultado if isinstance(resultado, Image.Image) else Image.open(io.BytesIO(resultado))
+    img.seek(0)
+    buffer = io.BytesIO()
+    img.convert("RGBA").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🏁 PRINCIPAL
+# ══════════════════════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("arbol", help="checkout del commit baseline (p. ej. un git worktree)")
+    parser.add_argument("--solo", default=None, help="solo casos cuyo nombre contenga este texto")
+    args = parser.parse_args()
+    arbol = os.path.abspath(args.arbol)
+
+    # Las entradas se preparan con el código actual, igual que en bench_renders.py
+    sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+    sys.path.insert(0, RAIZ)
+    import bench_renders
+
+    casos = bench_renders.casos()
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    contexto = multiprocessing.get_context("spawn")
+    fallos = []
+    for nombre, (target, c_args, c_kwargs) in casos.items():
+        if args.solo and args.solo not in nombre:
+            continue
+        if nombre in CAMBIOS_INTENCIONADOS:
+            print(f"{nombre:<28}omitido ({CAMBIOS_INTENCIONADOS[nombre]})")
+            continue
+        c_kwargs = {**c_kwargs, **bench_renders.ENTRADAS_IMAGEN.get(nombre, lambda: {})()}
+        try:
+            # Un proceso por caso: los módulos del árbol baseline no se mezclan con los actuales
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+                png = pool.submit(generar_caso, arbol, nombre, target, c_args, c_kwargs,
+                                  bench_renders.SEMILLA).result()
+        except Exception as e:
+            fallos.append(nombre)
+            print(f"{nombre:<28}ERROR  {type(e).__name__}: {e}")
+            continue
+        with open(os.path.join(GOLDEN_DIR, f"{nombre}.png"), "wb") as f:
+            f.write(png)
+        print(f"{nombre:<28}guardado")
+
+    if fallos:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
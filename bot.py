@@ -17,9 +17,18 @@ from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
 from dotenv import load_dotenv
 from info.keep_alive import keep_alive
+from utils.storage import SQLiteStorage
+from utils.audit_log import AuditLog
+from utils.render_service import render_service
+from utils.render_cache import render_cache
+from utils.single_flight import descargas, renders
+from utils.http_client import cliente_http
+from utils.remote_assets import assets_remotos
+from utils import blocking_guard
+from utils.quality_tiers import NIVELES, calidades, normalizar as normalizar_calidad
+from utils.encode_policy import FORMATOS, PoliticaEncode, metricas as metricas_encode, politicas as politicas_encode
 
 load_dotenv()
-keep_alive()
 
 # ══════════════════════════════════════════════════════════════════════════════
 # 🔇 SILENCIAR LOGS DE DISCORD.PY
@@ -59,6 +68,25 @@ class BotConfig:
     AUTO_RELOAD = True
     DEBUG_MODE = False
     
+    # 🏭 Render de imágenes en procesos aparte (0 = renderizar en el proceso del bot)
+    RENDER_WORKERS = 2
+    RENDER_TIMEOUT = 30
+    # Targets que cada worker ejecuta al arrancar para llenar sus cachés
+    RENDER_WARMUP = [
+        "módulos.anuncios:GeneradorImagenes.precalentar_fondos",
+        "utils.asset_registry:precargar_assets",
+    ]
+    
+    # 🧠 Caché de renders deterministas (@render_cacheable): memoria + data/render_cache
+    RENDER_CACHE_MB = 64
+    RENDER_CACHE_DISK_MB = 256
+    
+    # 📦 Codificación de imágenes (WEBP, WEBP_LOSSLESS, PNG, PNG_PALETA)
+    IMAGE_FORMAT = "WEBP"
+    IMAGE_QUALITY = 85
+    # Por encima de este tamaño se baja calidad/escala hasta que entre (None = sin límite)
+    IMAGE_MAX_BYTES = 2 * 1024 * 1024
+    
     # 🖼️ Banner de Carga
     BANNER_TITLE = "D E S F C I T A  •  B O T  S Y S T E M"
     BANNER_SUBTITLE = "Premium Management System"
@@ -177,6 +205,8 @@ bot.Icons = Icons
 bot.PAISES_LATAM = PAISES_LATAM
 bot.BotConfig = BotConfig
 
+bot.render_service = render_service
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 🎭 ROTACIÓN DE STATUS EN CALIENTE
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -219,8 +249,13 @@ TICKETS_FILE = 'data/tickets.json'
 LOGS_FILE = 'data/logs.json'
 ANONYMOUS_STORIES_FILE = 'data/anonymous_stories.json'
 
-if not os.path.exists('data'):
-    os.makedirs('data')
+# Se abren en preparar(): los workers de render (spawn) re-importan este
+# archivo como __mp_main__ y no deben abrir la base de datos ni leer la config
+storage = None
+audit_log = None
+warns_data = {}
+tickets_data = {}
+stories_data = {}
 
 def load_config():
     default_config = {
@@ -235,77 +270,82 @@ def load_config():
         "story_public_channel": None,
         "story_log_channel": None
     }
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-            loaded = json.load(f)
-            for key, value in default_config.items():
-                if key not in loaded:
-                    loaded[key] = value
-            return loaded
-    return default_config
-
-def save_config(data):
-    with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    return storage.cargar("config", default_config)
+
+# Con claves solo se serializan esas entradas; sin ellas se compara todo el dominio
+def save_config(data, *claves):
+    storage.sincronizar("config", data, claves or None)
 
 def load_warns():
-    if os.path.exists(WARNS_FILE):
-        with open(WARNS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    return storage.cargar("warns")
 
-def save_warns(warns):
-    with open(WARNS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(warns, f, indent=4, ensure_ascii=False)
+def save_warns(warns, *claves):
+    storage.sincronizar("warns", warns, claves or None)
 
 def load_tickets():
-    if os.path.exists(TICKETS_FILE):
-        with open(TICKETS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
+    return storage.cargar("tickets")
 
-def save_tickets(data):
-    with open(TICKETS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+def save_tickets(data, *guild_ids):
+    storage.sincronizar("tickets", data, guild_ids or None)
 
 def load_logs():
-    if os.path.exists(LOGS_FILE):
-        with open(LOGS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return []
+    return list(audit_log.iterar())
 
 def save_logs(data):
-    with open(LOGS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    audit_log.vaciar()
+    audit_log.importar(data)
 
 def load_stories():
-    if os.path.exists(ANONYMOUS_STORIES_FILE):
-        with open(ANONYMOUS_STORIES_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return []
+    return storage.cargar("stories")
 
-def save_stories(data):
-    with open(ANONYMOUS_STORIES_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+def save_stories(data, *ids):
+    storage.sincronizar("stories", data, ids or None)
 
 def log_action(action, user_id, guild_id, details=""):
-    logs = load_logs()
-    logs.append({
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "action": action,
-        "user_id": user_id,
-        "guild_id": guild_id,
-        "details": details
-    })
-    save_logs(logs)
-
-# Configuración inicial del bot
-bot.config = load_config()
+    audit_log.registrar(action, user_id, guild_id, details)
+
 bot.save_config = save_config
 bot.log_action = log_action
-warns_data = load_warns()
-tickets_data = load_tickets()
-stories_data = load_stories()
+
+def preparar():
+    """Abrir los datos y configurar los servicios (solo en el proceso principal)"""
+    global storage, audit_log, warns_data, tickets_data, stories_data
+
+    if not os.path.exists('data'):
+        os.makedirs('data')
+
+    render_service.configure(BotConfig.RENDER_WORKERS, BotConfig.RENDER_TIMEOUT, BotConfig.RENDER_WARMUP)
+    render_cache.configurar(BotConfig.RENDER_CACHE_MB, BotConfig.RENDER_CACHE_DISK_MB,
+                            os.path.join(BotConfig.DATA_FOLDER, 'render_cache'))
+
+    # Los JSON de arriba solo se leen una vez para migrarlos a SQLite
+    storage = SQLiteStorage(BotConfig.DATA_FOLDER)
+    bot.storage = storage
+
+    # Acciones en JSONL append-only (logs.json se importa una vez y se renombra)
+    audit_log = AuditLog(os.path.join(BotConfig.DATA_FOLDER, 'audit'))
+    bot.audit_log = audit_log
+    if os.path.exists(LOGS_FILE):
+        try:
+            with open(LOGS_FILE, 'r', encoding='utf-8') as f:
+                audit_log.importar(json.load(f))
+            os.replace(LOGS_FILE, LOGS_FILE + '.migrado')
+        except Exception as e:
+            print(f"Error migrando logs.json: {e}")
+
+    # Configuración inicial del bot
+    bot.config = load_config()
+    # Overrides de encode por servidor: viven en config y el registro comparte el dict
+    politicas_encode.configurar(
+        PoliticaEncode(formato=BotConfig.IMAGE_FORMAT, calidad=BotConfig.IMAGE_QUALITY,
+                       max_bytes=BotConfig.IMAGE_MAX_BYTES),
+        bot.config.setdefault("encode_overrides", {})
+    )
+    # Niveles de calidad fijados por servidor (el resto se elige según la carga)
+    calidades.configurar(bot.config.setdefault("calidad_render", {}))
+    warns_data = load_warns()
+    tickets_data = load_tickets()
+    stories_data = load_stories()
 
 # ══════════════════════════════════════════════════════════════════════════════
 # 🔐 SISTEMA DE PERMISOS
@@ -843,6 +883,217 @@ async def modules_info(ctx):
     embed.set_footer(text=f"Última actualización: {datetime.now().strftime('%H:%M:%S')}")
     await ctx.send(embed=embed)
 
+# ══════════════════════════════════════════════════════════════════════════════
+# 🏭 RENDER E IMÁGENES
+# ══════════════════════════════════════════════════════════════════════════════
+
+@bot.command(name="encode", aliases=["formato-img"])
+@is_admin_only()
+async def encode_cmd(ctx, formato: str = None, calidad: int = None, max_kb: int = None):
+    """Formato de las imágenes del servidor: -encode <formato> [calidad] [max_kb] | -encode reset"""
+    if formato and formato.lower() == "reset":
+        politicas_encode.quitar(ctx.guild.id)
+        save_config(bot.config, "encode_overrides")
+    elif formato:
+        cambios = {"formato": formato.upper()}
+        if calidad is not None:
+            cambios["calidad"] = max(1, min(100, calidad))
+        if max_kb is not None:
+            cambios["max_bytes"] = max_kb * 1024 if max_kb > 0 else None
+        try:
+            politicas_encode.fijar(ctx.guild.id, **cambios)
+        except ValueError:
+            return await ctx.send(f"❌ Formatos disponibles: `{', '.join(FORMATOS)}`")
+        save_config(bot.config, "encode_overrides")
+
+    politica = politicas_encode.para(ctx.guild.id)
+    limite = f"{politica.max_bytes // 1024} KB" if politica.max_bytes else "sin límite"
+    embed = discord.Embed(title="📦 Codificación de Imágenes", color=Colors.LAVENDER)
+    embed.add_field(name="Formato", value=f"`{politica.formato}`", inline=True)
+    embed.add_field(name="Calidad", value=f"`{politica.calidad}`", inline=True)
+    embed.add_field(name="Límite", value=f"`{limite}`", inline=True)
+    embed.set_footer(text="Personalizado" if str(ctx.guild.id) in politicas_encode.overrides else "Por defecto")
+    await ctx.send(embed=embed)
+
+@bot.command(name="calidad", aliases=["calidad-img"])
+@is_admin_only()
+async def calidad_cmd(ctx, nivel: str = None):
+    """Calidad de las imágenes del servidor: -calidad <completa|reducida|minima> | -calidad auto"""
+    if nivel and nivel.lower() == "auto":
+        calidades.quitar(ctx.guild.id)
+        save_config(bot.config, "calidad_render")
+    elif nivel:
+        try:
+            calidades.fijar(ctx.guild.id, normalizar_calidad(nivel))
+        except ValueError:
+            return await ctx.send(f"❌ Niveles disponibles: `{', '.join(NIVELES)}` o `auto`")
+        save_config(bot.config, "calidad_render")
+
+    fijado = calidades.fijados.get(str(ctx.guild.id))
+    embed = discord.Embed(title="🎚️ Calidad de Imágenes", color=Colors.LAVENDER)
+    embed.add_field(name="Nivel", value=f"`{fijado or calidades.nivel}`", inline=True)
+    embed.add_field(name="Modo", value="`Fijado`" if fijado else "`Automático`", inline=True)
+    embed.set_footer(text="En automático baja con la cola de render llena y vuelve a subir al despejarse")
+    await ctx.send(embed=embed)
+
+@bot.command(name="render-cache", aliases=["rcache"])
+@commands.is_owner()
+async def render_cache_cmd(ctx, accion: str = None):
+    """Estado de la caché de renders; `-render-cache vaciar` la borra (solo Owner)"""
+    if accion == "vaciar":
+        await asyncio.to_thread(render_cache.vaciar)
+    info = render_cache.estadisticas()
+    embed = discord.Embed(title="🧠 Caché de Renders", color=Colors.LAVENDER)
+    embed.add_field(name="Hits Memoria / Disco", value=f"`{info['hits_memoria']}` / `{info['hits_disco']}`", inline=True)
+    embed.add_field(name="Misses", value=f"`{info['misses']}`", inline=True)
+    embed.add_field(name="Hit Rate", value=f"`{info['hit_rate'] * 100:.1f}%`", inline=True)
+    embed.add_field(
+        name="Memoria",
+        value=f"`{info['entradas_memoria']}` • `{info['mb_memoria']} / {info['max_memoria_mb']} MB`",
+        inline=True
+    )
+    embed.add_field(
+        name="Disco",
+        value=f"`{info['entradas_disco']}` • `{info['mb_disco']} / {info['max_disco_mb']} MB`",
+        inline=True
+    )
+    embed.add_field(
+        name="Evicciones",
+        value=f"`{info['evicciones_memoria']}` / `{info['evicciones_disco']}`",
+        inline=True
+    )
+    if accion == "vaciar":
+        embed.set_footer(text="Caché vaciada")
+    await ctx.send(embed=embed)
+
+@bot.command(name="render-stats", aliases=["rstats"])
+@commands.is_owner()
+async def render_stats_cmd(ctx):
+    """Estadísticas del render service y de la codificación (solo Owner)"""
+    stats = render_service.stats
+    total = stats["pool"] + stats["fallback"]
+    embed = discord.Embed(title="🏭 Render Service", color=Colors.LAVENDER)
+    embed.add_field(
+        name="Renders",
+        value=(
+            f"Pool: `{stats['pool']}` • Fallback: `{stats['fallback']}` • Caché: `{stats['cache']}`\n"
+            f"Timeouts: `{stats['timeouts']}` • Errores: `{stats['errores']}`\n"
+            f"Lotes: `{stats['lotes']}` ({stats['tiles']} tiles)\n"
+            f"Medio: `{stats['ms_total'] / total if total else 0:.1f} ms`"
+        ),
+        inline=False
+    )
+
+    vuelos = []
+    for grupo in (renders, descargas):
+        s = grupo.estadisticas()
+        vuelos.append(
+            f"`{grupo.nombre}`: {s['lideres']} únicas • {s['colapsadas']} colapsadas "
+            f"({s['ratio_colapso'] * 100:.0f}%) • {s['timeouts']} timeouts • {s['en_vuelo']} en vuelo"
+        )
+    embed.add_field(name="Single-flight", value="\n".join(vuelos), inline=False)
+
+    cal = calidades.estadisticas()
+    embed.add_field(
+        name="Calidad",
+        value=(
+            f"Nivel: `{cal['nivel']}` • En cola: `{cal['en_cola']}` • Latencia: `{cal['latencia_ms']} ms`\n"
+            f"Bajadas: `{cal['bajadas']}` • Subidas: `{cal['subidas']}` • Degradados: `{cal['degradados']}` • "
+            f"Fijados: `{cal['fijados']}`\n"
+            + " • ".join(f"{n}: `{c}`" for n, c in cal["por_nivel"].items())
+        ),
+        inline=False
+    )
+
+    sesiones = cliente_http.estadisticas()
+    embed.add_field(
+        name="HTTP",
+        value="\n".join(
+            f"`{nombre}`: {h['peticiones']} peticiones • {h['errores']} errores • "
+            f"conexiones {h['conexiones_nuevas']} nuevas / {h['reutilizadas']} reutilizadas • "
+            f"pool {h['en_uso']} en uso, {h['libres']} libres • "
+            f"{h['bytes_leidos'] // 1024} KB leídos • {h['excedidas']} sobre el tope"
+            for nombre, h in sesiones.items()
+        ) + f"\nBloqueantes en el loop: `{blocking_guard.stats['detectados']}`",
+        inline=False
+    )
+
+    remotos = assets_remotos.estadisticas()
+    embed.add_field(
+        name="Assets remotos",
+        value=(
+            f"Hits: `{remotos['hits']}` (memoria {remotos['hits_memoria']} • disco {remotos['hits_disco']}) • "
+            f"Descargas: `{remotos['descargas']}` ({remotos['kb_descargados']} KB) • Fallos: `{remotos['fallos']}`\n"
+            f"Revalidadas: `{remotos['revalidadas']}` • 304: `{remotos['no_modificadas']}` • "
+            f"Obsoletas servidas: `{remotos['obsoletas']}`\n"
+            f"Memoria: `{remotos['entradas_memoria']}` ({remotos['mb_memoria']} MB) • "
+            f"Disco: `{remotos['entradas_disco']}` ({remotos['mb_disco']} MB)"
+        ),
+        inline=False
+    )
+
+    resumen = metricas_encode.resumen()
+    formatos = "\n".join(
+        f"`{nombre}`: {f['n']} • {f['kb_medio']} KB • {f['ms_medio']} ms"
+        for nombre, f in resumen["formatos"].items()
+    ) or "Sin datos"
+    embed.add_field(name="Encode", value=formatos, inline=False)
+    embed.add_field(
+        name="Presupuesto",
+        value=f"Escalones: `{resumen['escalones']}` • Excedidos: `{resumen['excedidos']}`",
+        inline=False
+    )
+
+    # Registro de fuentes del worker que atienda la consulta
+    try:
+        f = await render_service.consultar("utils.font_registry:estadisticas_fuentes")
+        memoria = f"{f['kb_memoria']} KB RSS" if f['kb_memoria'] else "n/d"
+        embed.add_field(
+            name="Fuentes",
+            value=(
+                f"Cargadas: `{f['fuentes']}` ({', '.join(f['caras'])})\n"
+                f"Memoria: `{memoria}` • Archivos: `{f['kb_archivos']} KB`\n"
+                f"Hits/Misses: `{f['hits']}` / `{f['misses']}` • Fallbacks: `{f['fallbacks']}`"
+            ),
+            inline=False
+        )
+    except Exception as e:
+        embed.add_field(name="Fuentes", value=f"Error: {str(e)[:80]}", inline=False)
+
+    # Assets del repo: cada uno debería decodificarse una sola vez por worker
+    try:
+        a = await render_service.consultar("utils.asset_registry:estadisticas_assets")
+        decodes = ", ".join(f"{n}×{c}" for n, c in a["decodificaciones"].items()) or "ninguno"
+        embed.add_field(
+            name="Assets",
+            value=(
+                f"Assets: `{a['assets']}` • Variantes: `{a['variantes']}` • `{a['kb']} KB`\n"
+                f"Decodificados: `{decodes}`\n"
+                f"Hits: `{a['hits']}` • Copias: `{a['copias']}`"
+            ),
+            inline=False
+        )
+    except Exception as e:
+        embed.add_field(name="Assets", value=f"Error: {str(e)[:80]}", inline=False)
+
+    # Avatares e iconos decodificados del worker que atienda la consulta
+    try:
+        v = await render_service.consultar("utils.remote_assets:estadisticas_variantes")
+        embed.add_field(
+            name="Variantes decodificadas",
+            value=(
+                f"Variantes: `{v['variantes']}` • `{v['kb']} / {v['max_kb']} KB`\n"
+                f"Hits: `{v['hits']}` • Decodificaciones: `{v['decodificaciones']}` • "
+                f"Evicciones: `{v['evicciones']}` • Errores: `{v['errores']}`\n"
+                f"Decode medio: `{v['ms_decodificacion']} ms` • Draft: `{v['drafts']}` • "
+                f"Reduce: `{v['reducciones']}` • Rechazadas: `{v['rechazadas']}`"
+            ),
+            inline=False
+        )
+    except Exception as e:
+        embed.add_field(name="Variantes decodificadas", value=f"Error: {str(e)[:80]}", inline=False)
+    await ctx.send(embed=embed)
+
 # ══════════════════════════════════════════════════════════════════════════════
 # 📚 COMANDO DE AYUDA PERSONALIZADO
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1303,6 +1554,14 @@ class ModuleManager:
                 # Remover de lista de errores si estaba
                 self.failed_modules = [e for e in self.failed_modules if e['module'] != module_name]
                 
+                # Las claves de la caché de renders llevan el mtime del builder recargado
+                render_cache.olvidar_versiones()
+                
+                # Los workers de render tienen importado el código viejo
+                if render_service.activo:
+                    await render_service.shutdown()
+                    await render_service.start()
+                
                 return True, f"✅ **{module_name}** recargado (con utils) exitosamente"
             
             except Exception as e:
@@ -1360,13 +1619,24 @@ if __name__ == "__main__":
             # Guardar tiempo de inicio
             bot.start_time = datetime.now()
             
+            # Avisar de cualquier HTTP síncrono (requests, urllib) en el hilo del loop
+            blocking_guard.instalar()
+            
             # Mostrar animación de carga
             aesthetic_loading()
             
             # Iniciar bot
             async with bot:
-                await load_extensions()
-                await bot.start(BotConfig.TOKEN)
+                try:
+                    await render_service.start()
+                    await load_extensions()
+                    await bot.start(BotConfig.TOKEN)
+                finally:
+                    # Vaciar escrituras pendientes antes de salir
+                    await storage.close()
+                    audit_log.cerrar()
+                    await render_service.shutdown()
+                    await cliente_http.cerrar()
                 
         except KeyboardInterrupt:
             T = Colors.Terminal
@@ -1375,6 +1645,15 @@ if __name__ == "__main__":
             T = Colors.Terminal
             print(f"\n{T.PINK}  {Icons.ERROR} Error crítico: {T.WHITE}{e}{T.RESET}\n")
     
+    # Los módulos hacen `import bot`: que reciban este mismo módulo y no una
+    # segunda copia que vuelva a abrir la base de datos
+    sys.modules.setdefault("bot", sys.modules[__name__])
+    
+    # Solo en el proceso principal: los workers de render (spawn) re-importan
+    # este archivo y no deben abrir datos ni levantar otro servidor web
+    preparar()
+    keep_alive()
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -6,11 +6,19 @@ import os
 import random
 import asyncio
 import time
+import heapq
+import threading
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Union, Any
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-from io import BytesIO
-import aiohttp
+from typing import Optional, Dict, List, Tuple, Union, Any
+from PIL import Image, ImageDraw
+from utils.render_service import ImagenRender, RenderSpec, render_service
+from utils.encode_policy import politicas
+from utils.quality_tiers import COMPLETA
+from utils.image_effects import fast_blur, linear_gradient, glass_tint
+from utils.font_registry import fuentes, obtener_fuente
+from utils.render_cache import render_cacheable
+from utils.remote_assets import assets_remotos, imagen_rgba
+from utils.text_layout import maquetador
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 🎨 TEMAS Y COLORES
@@ -39,42 +47,20 @@ def get_theme(name: str) -> dict:
 class GlassCard:
     """Generador de tarjetas con efecto glassmorphism estilo iPhone"""
     
-    FONTS_PATH = "fonts"
-    
     @staticmethod
     def get_font(font_type: str, size: int):
-        """Obtiene la fuente desde la carpeta fonts"""
-        font_map = {
-            "classic": "classic.ttf",
-            "emoji": "emojis.ttf"
-        }
-        try:
-            path = os.path.join(GlassCard.FONTS_PATH, font_map.get(font_type, "classic.ttf"))
-            return ImageFont.truetype(path, size)
-        except:
-            return ImageFont.load_default()
+        """Obtiene la fuente del registro compartido"""
+        return obtener_fuente(font_type if font_type in ("classic", "emoji") else "classic", size)
     
     @staticmethod
     def create_gradient(width: int, height: int, colors: tuple) -> Image.Image:
         """Crea un gradiente suave entre dos colores"""
-        base = Image.new('RGB', (width, height), colors[0])
-        top = Image.new('RGB', (width, height), colors[1])
-        mask = Image.new('L', (width, height))
-        mask_data = []
-        for y in range(height):
-            for x in range(width):
-                mask_data.append(int(255 * (y / height)))
-        mask.putdata(mask_data)
-        base.paste(top, (0, 0), mask)
-        return base
+        return linear_gradient(width, height, colors[0], colors[1]).convert('RGB')
     
     @staticmethod
     def add_glass_effect(img: Image.Image, blur: int = 15, opacity: int = 180) -> Image.Image:
         """Aplica efecto de vidrio esmerilado"""
-        blurred = img.filter(ImageFilter.GaussianBlur(blur))
-        glass = Image.new('RGBA', img.size, (255, 255, 255, opacity))
-        blurred = blurred.convert('RGBA')
-        return Image.alpha_composite(blurred, glass)
+        return glass_tint(img, (255, 255, 255), opacity, blur=blur)
     
     @staticmethod
     def add_particles(draw: ImageDraw, width: int, height: int, color: tuple, count: int = 20):
@@ -96,15 +82,27 @@ class GlassCard:
         return output
     
     @staticmethod
-    async def fetch_avatar(url: str) -> Image.Image:
+    async def fetch_avatar(url: str, size: int = 256) -> Image.Image:
         """Descarga avatar de usuario"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                return Image.open(BytesIO(await resp.read())).convert('RGBA')
+        return imagen_rgba(await GlassCard.fetch_avatar_bytes(url, size), (size, size))
     
     @staticmethod
-    async def create_profile_card(member: discord.Member, data: dict, theme_name: str = 'PINK') -> BytesIO:
+    async def fetch_avatar_bytes(url: str, size: Optional[int] = None) -> Optional[bytes]:
+        """Bytes del avatar en la variante del CDN justa para `size` (caché de assets remotos)"""
+        return await assets_remotos.obtener(url, size)
+    
+    @staticmethod
+    async def create_profile_card(member: discord.Member, data: dict, theme_name: str = 'PINK') -> ImagenRender:
         """Genera tarjeta de perfil con glassmorphism mejorada"""
+        avatar_bytes = await GlassCard.fetch_avatar_bytes(str(member.display_avatar.url), 150)
+        return await render_service.render_io(RenderSpec(
+            "módulos.ajustes:GlassCard.render_profile_card",
+            (member.display_name, avatar_bytes, dict(data), theme_name),
+            guild_id=member.guild.id
+        ))
+    
+    @staticmethod
+    def render_profile_card(display_name: str, avatar_bytes: Optional[bytes], data: dict, theme_name: str = 'PINK') -> Image.Image:
         width, height = 880, 450
         theme = get_theme(theme_name)
         
@@ -117,18 +115,16 @@ class GlassCard:
         draw.rounded_rectangle([(20, 20), (width-20, height-20)], radius=30, fill=(255, 255, 255, 30))
         draw.rounded_rectangle([(15, 15), (width-15, height-15)], radius=35, outline=(*theme['rgb'], 180), width=3)
         
-        font_title = GlassCard.get_font("classic", 40)
         font_main = GlassCard.get_font("classic", 28)
         font_small = GlassCard.get_font("classic", 20)
         font_mini = GlassCard.get_font("classic", 16)
         
         try:
-            avatar = await GlassCard.fetch_avatar(str(member.display_avatar.url))
-            avatar = GlassCard.circular_avatar(avatar, 150)
+            avatar = GlassCard.circular_avatar(imagen_rgba(avatar_bytes, (150, 150)), 150)
             
             glow = Image.new('RGBA', (180, 180), (0, 0, 0, 0))
             ImageDraw.Draw(glow).ellipse((0, 0, 180, 180), fill=(*theme['rgb'], 100))
-            glow = glow.filter(ImageFilter.GaussianBlur(12))
+            glow = fast_blur(glow, 12)
             bg.paste(glow, (35, 45), glow)
             bg.paste(avatar, (50, 60), avatar)
             
@@ -147,8 +143,9 @@ class GlassCard:
         needed = int(100 * (level ** 1.5) + 150 * level)
         progress = min(xp / needed, 1.0) if needed > 0 else 0
         
-        draw.text((230, 50), member.display_name[:16], fill=(255, 255, 255), 
-                 font=font_title, stroke_width=2, stroke_fill=(0, 0, 0))
+        # Los emojis del nombre salen de fonts/emojis.ttf
+        fuentes.dibujar(draw, (230, 50), display_name[:16], "classic", 40, fill=(255, 255, 255),
+                        stroke_width=2, stroke_fill=(0, 0, 0))
         
         level_badge = Image.new('RGBA', (120, 35), (0, 0, 0, 0))
         badge_draw = ImageDraw.Draw(level_badge)
@@ -201,14 +198,20 @@ class GlassCard:
         
         draw.text((width - 40, height - 30), theme_name, fill=(255, 255, 255, 100), font=font_mini, anchor='rm')
         
-        buffer = BytesIO()
-        bg.save(buffer, format='PNG', quality=95)
-        buffer.seek(0)
-        return buffer
+        return bg
+    
+    @staticmethod
+    async def create_leaderboard_card(entries: list, theme_name: str = 'GOLD', guild_id: Optional[int] = None,
+                                      avatars: tuple = ()) -> ImagenRender:
+        """Genera tarjeta de ranking top 10 (entries: nombre, nivel, xp; avatars: bytes por fila)"""
+        # Se reutiliza hasta que cambie el top: siempre en calidad completa
+        return await render_service.render_io(RenderSpec(
+            "módulos.ajustes:GlassCard.render_leaderboard_card", (list(entries), theme_name, tuple(avatars)),
+            guild_id=guild_id, calidad=COMPLETA
+        ))
     
     @staticmethod
-    async def create_leaderboard_card(users_data: list, bot, theme_name: str = 'GOLD') -> BytesIO:
-        """Genera tarjeta de ranking top 10 mejorada"""
+    def render_leaderboard_card(entries: list, theme_name: str = 'GOLD', avatars: tuple = ()) -> Image.Image:
         width, height = 900, 680
         theme = get_theme(theme_name)
         
@@ -231,31 +234,42 @@ class GlassCard:
         medals = ["🥇", "🥈", "🥉"]
         y = 110
         
-        for i, (uid, data) in enumerate(users_data[:10], 1):
-            u = bot.get_user(int(uid))
-            name = u.name[:14] if u else f"Usuario"
-            level = data.get("level", 1)
-            xp = data.get("xp", 0)
+        for i, (name, level, xp) in enumerate(entries[:10], 1):
             medal = medals[i-1] if i <= 3 else f"#{i}"
             
             entry_color = (*theme['rgb'], 80) if i <= 3 else (255, 255, 255, 50)
             draw.rounded_rectangle([(50, y), (width - 50, y + 50)], radius=15, fill=entry_color)
             
             draw.text((80, y + 25), medal, font=font_entry, fill=(255, 255, 255), anchor='lm')
-            draw.text((130, y + 25), name, font=font_entry, fill=(255, 255, 255), anchor='lm')
+            name_x = 130
+            avatar_bytes = avatars[i-1] if i <= len(avatars) else None
+            if avatar_bytes:
+                try:
+                    avatar = GlassCard.circular_avatar(imagen_rgba(avatar_bytes, (40, 40)), 40)
+                    bg.paste(avatar, (125, y + 5), avatar)
+                    name_x = 177
+                except:
+                    pass
+            draw.text((name_x, y + 25), name, font=font_entry, fill=(255, 255, 255), anchor='lm')
             draw.text((width - 100, y + 25), f"Lv.{level}", font=font_entry, fill=(*theme['rgb'], 255), anchor='rm')
             draw.text((width - 180, y + 25), f"{xp} XP", font=font_small, fill=(255, 255, 255, 180), anchor='rm')
             
             y += 55
         
-        buffer = BytesIO()
-        bg.save(buffer, format='PNG', quality=95)
-        buffer.seek(0)
-        return buffer
+        return bg
     
     @staticmethod
-    async def create_config_panel(guild_name: str, settings: dict, theme_name: str = 'PURPLE') -> BytesIO:
+    async def create_config_panel(guild_name: str, settings: dict, theme_name: str = 'PURPLE',
+                                  guild_id: Optional[int] = None) -> ImagenRender:
         """Genera banner para el panel de configuración"""
+        return await render_service.render_io(RenderSpec(
+            "módulos.ajustes:GlassCard.render_config_panel", (guild_name, dict(settings), theme_name),
+            guild_id=guild_id
+        ))
+    
+    @staticmethod
+    @render_cacheable()
+    def render_config_panel(guild_name: str, settings: dict, theme_name: str = 'PURPLE') -> Image.Image:
         width, height = 800, 520
         theme = get_theme(theme_name)
         
@@ -303,14 +317,17 @@ class GlassCard:
         draw.text((width//2, height - 45), 'Usa los botones para configurar', 
                  font=font_value, fill=(255, 255, 255, 150), anchor='mt')
         
-        buffer = BytesIO()
-        bg.save(buffer, format='PNG', quality=95)
-        buffer.seek(0)
-        return buffer
+        return bg
     
     @staticmethod
-    async def create_oracle_card(message: str) -> BytesIO:
+    async def create_oracle_card(message: str, guild_id: Optional[int] = None) -> ImagenRender:
         """Tarjeta del oráculo místico"""
+        return await render_service.render_io(
+            RenderSpec("módulos.ajustes:GlassCard.render_oracle_card", (message,), guild_id=guild_id)
+        )
+    
+    @staticmethod
+    def render_oracle_card(message: str) -> Image.Image:
         width, height = 700, 400
         
         # Gradiente púrpura-azul
@@ -320,7 +337,6 @@ class GlassCard:
         draw = ImageDraw.Draw(bg)
         
         font_title = GlassCard.get_font("classic", 52)
-        font_text = GlassCard.get_font("classic", 32)
         
         # Título
         draw.text((width // 2, 60), "🔮 ORÁCULO ESTELAR", 
@@ -334,25 +350,9 @@ class GlassCard:
             outline=(255, 255, 255, 200), width=3
         )
         
-        # Mensaje (multi-línea si es necesario)
-        lines = []
-        words = message.split()
-        current_line = ""
-        for word in words:
-            test_line = current_line + word + " "
-            if len(test_line) > 30:
-                lines.append(current_line.strip())
-                current_line = word + " "
-            else:
-                current_line = test_line
-        if current_line:
-            lines.append(current_line.strip())
-        
-        y_text = 180
-        for line in lines[:3]:
-            draw.text((width // 2, y_text), line, fill=(50, 50, 50), 
-                     font=font_text, anchor="mt")
-            y_text += 45
+        # Mensaje: ajuste por ancho medido (emojis y mayúsculas incluidos), 3 líneas como máximo
+        bloque = maquetador.maquetar(message, width - 160, "classic", 32, interlineado=8, max_lineas=3)
+        maquetador.dibujar(draw, bloque, (80, 180), ancho_caja=width - 160, alinear="centro", fill=(50, 50, 50))
         
         # Borde exterior
         draw.rounded_rectangle(
@@ -360,10 +360,7 @@ class GlassCard:
             radius=30, outline=(255, 215, 0, 220), width=4
         )
         
-        buffer = BytesIO()
-        bg.save(buffer, format='PNG')
-        buffer.seek(0)
-        return buffer
+        return bg
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 📦 GESTIÓN DE DATOS
@@ -398,10 +395,163 @@ class DataManager:
 
     @staticmethod
     def save(data: Dict[str, Any]):
+        DataManager.write(json.dumps(data, indent=4, ensure_ascii=False))
+
+    @staticmethod
+    def write(text: str):
+        """Escritura atómica: nunca deja nivel.json a medias"""
         if not os.path.exists('data'): 
             os.makedirs('data')
-        with open(DataManager.PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        tmp = f"{DataManager.PATH}.{time.time_ns()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, DataManager.PATH)
+
+
+class WriteBehind:
+    """Buffer de escritura diferida: marca cambios y guarda en lote"""
+    FLUSH_INTERVAL = 30.0   # Segundos entre guardados
+    MAX_DIRTY = 50          # Usuarios modificados que fuerzan un guardado inmediato
+
+    def __init__(self, data: Dict[str, Any], flush_interval: float = None, max_dirty: int = None):
+        self.data = data
+        self.flush_interval = flush_interval or WriteBehind.FLUSH_INTERVAL
+        self.max_dirty = max_dirty or WriteBehind.MAX_DIRTY
+        self.dirty = set()
+        self.pending_marks = 0
+        self.stats = {"flushes": 0, "marks": 0, "coalesced": 0, "errors": 0, "stale": 0}
+        self._lock = asyncio.Lock()
+        self._urgent: Optional[asyncio.Task] = None
+        # Cada volcado lleva versión: uno en hilo que termina tarde no pisa otro más nuevo
+        self._version = 0
+        self._written = 0
+        self._write_lock = threading.Lock()
+
+    def mark(self, key: Any = "*"):
+        """Registrar un cambio; el disco se toca en el próximo flush"""
+        self.dirty.add(str(key))
+        self.pending_marks += 1
+        self.stats["marks"] += 1
+        if len(self.dirty) >= self.max_dirty and (self._urgent is None or self._urgent.done()):
+            try:
+                self._urgent = asyncio.get_running_loop().create_task(self.flush())
+            except RuntimeError:
+                self.flush_sync()
+
+    def _take(self) -> Optional[Tuple[int, str]]:
+        """(versión, texto) del próximo volcado, o None si no hay cambios; se serializa en el loop"""
+        if not self.dirty:
+            return None
+        self.stats["coalesced"] += max(self.pending_marks - 1, 0)
+        self.dirty.clear()
+        self.pending_marks = 0
+        self._version += 1
+        # En el loop nadie muta self.data a la vez: la copia es coherente (xp y nivel del mismo instante)
+        return self._version, json.dumps(self.data, indent=4, ensure_ascii=False)
+
+    def _write(self, version: int, text: str):
+        with self._write_lock:
+            if version <= self._written:
+                self.stats["stale"] += 1
+                return
+            DataManager.write(text)
+            self._written = version
+
+    async def flush(self):
+        async with self._lock:
+            pending = self._take()
+            if pending is None:
+                return
+            try:
+                # Solo la escritura del archivo sale del loop
+                await asyncio.to_thread(self._write, *pending)
+                self.stats["flushes"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.dirty.add("*")
+                print(f"Error guardando niveles: {e}")
+
+    def flush_sync(self):
+        """En el loop (cog_unload): espera a un volcado en hilo en curso y escribe lo último"""
+        if self._version > self._written:
+            # Hay un volcado en un hilo sin terminar: no dar por buena su copia
+            self.dirty.add("*")
+        pending = self._take()
+        if pending is None:
+            return
+        try:
+            self._write(*pending)
+            self.stats["flushes"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Error guardando niveles: {e}")
+
+class RankingCache:
+    """
+    Top 10 con número de versión: la versión solo sube cuando cambia el top
+    ordenado (ids, niveles, XP por tramos, nombres, avatares) o el tema, y
+    mientras no cambie se sirve la última tarjeta ya codificada. La tarjeta
+    muestra el tramo de XP ("1.25k+ XP"), no la cifra exacta, así que lo que
+    se sirve de la caché nunca enseña un número viejo.
+    """
+    TOP = 10
+    XP_TRAMO = 250        # La XP cuenta por tramos: no se re-renderiza por cada mensaje
+    AVATAR_PX = 40        # Lado del avatar en cada fila
+
+    def __init__(self):
+        self.version = 0
+        self._firma = None
+        self._top: List[Tuple[str, dict]] = []
+        self._marcas = -1
+        # politica de encode -> (versión, bytes, formato)
+        self._tarjetas: Dict[str, Tuple[int, bytes, str]] = {}
+        self.stats = {"renders": 0, "servidas": 0, "ordenaciones": 0}
+
+    def top(self, users: Dict[str, dict], marcas: int) -> List[Tuple[str, dict]]:
+        """Top ordenado; solo se recalcula si hubo cambios en los datos (marcas del WriteBehind)"""
+        if marcas != self._marcas:
+            self._top = heapq.nlargest(self.TOP, users.items(), key=lambda x: (x[1]["level"], x[1]["xp"]))
+            self._marcas = marcas
+            self.stats["ordenaciones"] += 1
+        return self._top
+
+    @classmethod
+    def xp_visible(cls, xp: int) -> str:
+        """XP como sale en la tarjeta: el inicio de su tramo (cambia justo cuando cambia la firma)"""
+        base = xp // cls.XP_TRAMO * cls.XP_TRAMO
+        if base <= 0:
+            return f"<{cls.XP_TRAMO}"
+        texto = f"{base / 1000:.2f}".rstrip("0").rstrip(".") + "k" if base >= 1000 else str(base)
+        return texto + "+"
+
+    async def tarjeta(self, users: Dict[str, dict], marcas: int, bot, theme: str,
+                      guild_id: Optional[int] = None) -> ImagenRender:
+        filas = []
+        for uid, data in self.top(users, marcas):
+            u = bot.get_user(int(uid))
+            url = str(u.display_avatar.url) if u else None
+            filas.append((uid, u.name[:14] if u else "Usuario", data.get("level", 1),
+                          self.xp_visible(data.get("xp", 0)), url))
+
+        firma = (theme, tuple(filas))
+        if firma != self._firma:
+            self._firma = firma
+            self.version += 1
+
+        politica = repr(politicas.para(guild_id))
+        guardada = self._tarjetas.get(politica)
+        if guardada is not None and guardada[0] == self.version:
+            self.stats["servidas"] += 1
+            return ImagenRender(guardada[1], guardada[2])
+
+        version = self.version
+        avatares = await assets_remotos.obtener_varias([(url, self.AVATAR_PX) for *_, url in filas])
+        imagen = await GlassCard.create_leaderboard_card(
+            [(nombre, nivel, xp) for _, nombre, nivel, xp, _ in filas], theme, guild_id, tuple(avatares)
+        )
+        self._tarjetas[politica] = (version, imagen.getvalue(), imagen.formato)
+        self.stats["renders"] += 1
+        return imagen
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 🎨 CONFIGURACIÓN VISUAL
@@ -435,17 +585,17 @@ class ConfigPanel(ui.View):
         """Actualiza el panel con nuevo banner"""
         theme = self.cog.data["settings"].get("theme", "PINK")
         banner = await GlassCard.create_config_panel(
-            interaction.guild.name, self.cog.data["settings"], theme
+            interaction.guild.name, self.cog.data["settings"], theme, interaction.guild.id
         )
-        file = discord.File(banner, filename='panel.png')
+        file = discord.File(banner, filename=banner.nombre('panel.png'))
         embed = discord.Embed(color=get_theme(theme)['hex'])
-        embed.set_image(url='attachment://panel.png')
+        embed.set_image(url=f'attachment://{file.filename}')
         await interaction.response.edit_message(attachments=[file], embed=embed, view=self)
 
     @ui.button(label="XP", style=discord.ButtonStyle.primary, emoji="💫", row=0)
     async def toggle_xp(self, interaction: discord.Interaction, button: ui.Button):
         self.cog.data["settings"]["levels_enabled"] = not self.cog.data["settings"]["levels_enabled"]
-        DataManager.save(self.cog.data)
+        self.cog.saver.mark()
         await self.update_panel(interaction)
 
     @ui.button(label="Multi", style=discord.ButtonStyle.primary, emoji="🔥", row=0)
@@ -454,7 +604,7 @@ class ConfigPanel(ui.View):
         options = [1.0, 1.5, 2.0, 2.5, 3.0]
         idx = (options.index(current) + 1) % len(options) if current in options else 0
         self.cog.data["settings"]["xp_multiplier"] = options[idx]
-        DataManager.save(self.cog.data)
+        self.cog.saver.mark()
         await self.update_panel(interaction)
 
     @ui.button(label="Cooldown", style=discord.ButtonStyle.primary, emoji="⏱️", row=0)
@@ -463,7 +613,7 @@ class ConfigPanel(ui.View):
         options = [15, 30, 45, 60, 90]
         idx = (options.index(current) + 1) % len(options) if current in options else 0
         self.cog.data["settings"]["xp_cooldown"] = options[idx]
-        DataManager.save(self.cog.data)
+        self.cog.saver.mark()
         await self.update_panel(interaction)
 
     @ui.button(label="Notifs", style=discord.ButtonStyle.secondary, emoji="🔔", row=0)
@@ -472,13 +622,13 @@ class ConfigPanel(ui.View):
         current = self.cog.data["settings"]["levelup_notifs"]
         idx = (options.index(current) + 1) % len(options) if current in options else 0
         self.cog.data["settings"]["levelup_notifs"] = options[idx]
-        DataManager.save(self.cog.data)
+        self.cog.saver.mark()
         await self.update_panel(interaction)
 
     @ui.button(label="Roles", style=discord.ButtonStyle.secondary, emoji="🎭", row=1)
     async def toggle_roles(self, interaction: discord.Interaction, button: ui.Button):
         self.cog.data["settings"]["role_rewards"] = not self.cog.data["settings"].get("role_rewards", True)
-        DataManager.save(self.cog.data)
+        self.cog.saver.mark()
         await self.update_panel(interaction)
 
     @ui.button(label="Tema", style=discord.ButtonStyle.secondary, emoji="🎨", row=1)
@@ -487,7 +637,7 @@ class ConfigPanel(ui.View):
         current = self.cog.data["settings"].get("theme", "PINK")
         idx = (themes.index(current) + 1) % len(themes) if current in themes else 0
         self.cog.data["settings"]["theme"] = themes[idx]
-        DataManager.save(self.cog.data)
+        self.cog.saver.mark()
         await self.update_panel(interaction)
 
     @ui.button(label="XP Range", style=discord.ButtonStyle.secondary, emoji="📊", row=1)
@@ -505,7 +655,7 @@ class ConfigPanel(ui.View):
                 if xp_min > 0 and xp_max >= xp_min:
                     self.cog.data["settings"]["xp_min"] = xp_min
                     self.cog.data["settings"]["xp_max"] = xp_max
-                    DataManager.save(self.cog.data)
+                    self.cog.saver.mark()
                     await self.update_panel(it)
                 else:
                     await it.response.send_message('`❌` Valores inválidos', ephemeral=True)
@@ -535,7 +685,7 @@ class ConfigPanel(ui.View):
         
         async def confirm_callback(it: discord.Interaction):
             self.cog.data["users"] = {}
-            DataManager.save(self.cog.data)
+            self.cog.saver.mark()
             await it.response.send_message('`✅` Todos los datos de usuarios han sido eliminados', ephemeral=True)
         
         async def cancel_callback(it: discord.Interaction):
@@ -561,16 +711,20 @@ class AjustesPro(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.data = DataManager.load()
+        self.saver = WriteBehind(self.data)
+        self.ranking = RankingCache()
         self.xp_cooldowns = {}
+        self.auto_save.change_interval(seconds=self.saver.flush_interval)
         self.auto_save.start()
 
     def cog_unload(self):
-        DataManager.save(self.data)
+        # Se llama también al cerrar el bot (bot.close quita los cogs)
         self.auto_save.cancel()
+        self.saver.flush_sync()
 
-    @tasks.loop(minutes=5.0)
+    @tasks.loop(seconds=WriteBehind.FLUSH_INTERVAL)
     async def auto_save(self):
-        DataManager.save(self.data)
+        await self.saver.flush()
 
     def get_user(self, user_id: int) -> Dict[str, Any]:
         uid = str(user_id)
@@ -581,7 +735,7 @@ class AjustesPro(commands.Cog):
                 "messages": 0, 
                 "partner": None
             }
-            DataManager.save(self.data)
+            self.saver.mark(uid)
         return self.data["users"][uid]
 
     async def sync_roles(self, member: discord.Member, level: int):
@@ -667,7 +821,7 @@ class AjustesPro(commands.Cog):
             
             await self.sync_roles(message.author, user["level"])
         
-        DataManager.save(self.data)
+        self.saver.mark(uid)
 
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # 📊 COMANDOS DE NIVELES
@@ -682,22 +836,19 @@ class AjustesPro(commands.Cog):
         
         async with ctx.typing():
             img_buffer = await GlassCard.create_profile_card(member, user, theme)
-            file = discord.File(img_buffer, filename="perfil.png")
+            file = discord.File(img_buffer, filename=img_buffer.nombre("perfil.png"))
             await ctx.send(file=file)
 
     @commands.command(name="ranking", aliases=["top", "lb"])
     async def leaderboard(self, ctx):
         """Ver ranking del servidor (Alias: top, lb)"""
-        sorted_users = sorted(
-            self.data["users"].items(), 
-            key=lambda x: (x[1]["level"], x[1]["xp"]), 
-            reverse=True
-        )[:10]
         theme = self.data["settings"].get("theme", "GOLD")
         
         async with ctx.typing():
-            img_buffer = await GlassCard.create_leaderboard_card(sorted_users, self.bot, theme)
-            file = discord.File(img_buffer, filename="ranking.png")
+            img_buffer = await self.ranking.tarjeta(
+                self.data["users"], self.saver.stats["marks"], self.bot, theme, ctx.guild.id
+            )
+            file = discord.File(img_buffer, filename=img_buffer.nombre("ranking.png"))
             await ctx.send(file=file)
 
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -716,8 +867,8 @@ class AjustesPro(commands.Cog):
         ]
         
         message = random.choice(fortunes)
-        img_buffer = await GlassCard.create_oracle_card(message)
-        file = discord.File(img_buffer, filename="oraculo.png")
+        img_buffer = await GlassCard.create_oracle_card(message, ctx.guild.id if ctx.guild else None)
+        file = discord.File(img_buffer, filename=img_buffer.nombre("oraculo.png"))
         
         await ctx.send(file=file)
 
@@ -752,7 +903,7 @@ class AjustesPro(commands.Cog):
             return await ctx.send("❌ No puedes vincularte contigo mismo")
         
         user["partner"] = member.id
-        DataManager.save(self.data)
+        self.saver.mark()
         
         embed = discord.Embed(
             title="✨ VÍNCULO CREADO",
@@ -774,7 +925,7 @@ class AjustesPro(commands.Cog):
         
         partner_id = user["partner"]
         user["partner"] = None
-        DataManager.save(self.data)
+        self.saver.mark()
         
         await ctx.send(f"💔 Vínculo con <@{partner_id}> eliminado")
 
@@ -789,10 +940,10 @@ class AjustesPro(commands.Cog):
         theme = self.data["settings"].get("theme", "PURPLE")
         
         async with ctx.typing():
-            banner = await GlassCard.create_config_panel(ctx.guild.name, self.data["settings"], theme)
-            file = discord.File(banner, filename='panel.png')
+            banner = await GlassCard.create_config_panel(ctx.guild.name, self.data["settings"], theme, ctx.guild.id)
+            file = discord.File(banner, filename=banner.nombre('panel.png'))
             embed = discord.Embed(color=get_theme(theme)['hex'])
-            embed.set_image(url='attachment://panel.png')
+            embed.set_image(url=f'attachment://{file.filename}')
             await ctx.send(file=file, embed=embed, view=ConfigPanel(self))
 
     @commands.command(name="dar-xp", aliases=["addxp", "givexp"])
@@ -801,7 +952,7 @@ class AjustesPro(commands.Cog):
         """Dar XP a un usuario (Alias: addxp, givexp)"""
         user = self.get_user(member.id)
         user["xp"] += amount
-        DataManager.save(self.data)
+        self.saver.mark()
         
         embed = discord.Embed(
             title="✨ XP OTORGADO",
@@ -817,7 +968,7 @@ class AjustesPro(commands.Cog):
         user = self.get_user(member.id)
         user["level"] = max(1, level)
         user["xp"] = 0
-        DataManager.save(self.data)
+        self.saver.mark()
         
         await self.sync_roles(member, user["level"])
         
@@ -835,7 +986,7 @@ class AjustesPro(commands.Cog):
         uid = str(member.id)
         if uid in self.data["users"]:
             del self.data["users"][uid]
-            DataManager.save(self.data)
+            self.saver.mark()
             await ctx.send(f"✅ Progreso de {member.mention} reseteado")
         else:
             await ctx.send(f"❌ {member.mention} no tiene datos guardados")
@@ -938,6 +1089,26 @@ class AjustesPro(commands.Cog):
         
         await ctx.send(embed=embed)
 
+    @commands.command(name="guardado-niveles")
+    @commands.is_owner()
+    async def saver_stats(self, ctx):
+        """Estadísticas del guardado diferido de niveles y de la tarjeta de ranking"""
+        s = self.saver.stats
+        r = self.ranking.stats
+        embed = discord.Embed(title="💾 Guardado de Niveles", color=Style.C_PURPLE)
+        embed.add_field(name="Guardados", value=f"`{s['flushes']}`", inline=True)
+        embed.add_field(name="Cambios", value=f"`{s['marks']}`", inline=True)
+        embed.add_field(name="Agrupados", value=f"`{s['coalesced']}`", inline=True)
+        embed.add_field(name="Errores", value=f"`{s['errors']}`", inline=True)
+        embed.add_field(name="Descartados (viejos)", value=f"`{s['stale']}`", inline=True)
+        embed.add_field(name="Pendientes", value=f"`{len(self.saver.dirty)}` usuarios", inline=True)
+        embed.add_field(
+            name="Ranking",
+            value=f"Renders: `{r['renders']}` • Servidas: `{r['servidas']}` • Ordenaciones: `{r['ordenaciones']}`",
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # 🎁 COMANDOS EXTRA/DIVERTIDOS
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -958,7 +1129,7 @@ class AjustesPro(commands.Cog):
         
         user["xp"] += total_bonus
         user["last_daily"] = datetime.now().isoformat()
-        DataManager.save(self.data)
+        self.saver.mark()
         
         embed = discord.Embed(
             title="🎁 RECOMPENSA DIARIA",
@@ -994,7 +1165,7 @@ class AjustesPro(commands.Cog):
         receiver = self.get_user(member.id)
         sender["xp"] -= amount
         receiver["xp"] += amount
-        DataManager.save(self.data)
+        self.saver.mark()
         
         embed = discord.Embed(
             title="💸 TRANSFERENCIA EXITOSA",
@@ -1012,7 +1183,7 @@ class AjustesPro(commands.Cog):
         """Regalar 1 nivel a alguien (1 vez por semana) (Alias: gift, regalar)"""
         receiver = self.get_user(member.id)
         receiver["level"] += 1
-        DataManager.save(self.data)
+        self.saver.mark()
         
         await self.sync_roles(member, receiver["level"])
         
@@ -1067,7 +1238,7 @@ class AjustesPro(commands.Cog):
                 break
         
         user["xp"] = max(0, user["xp"] + result["xp"])
-        DataManager.save(self.data)
+        self.saver.mark()
         
         embed = discord.Embed(
             title="🎰 RULETA DE XP",
@@ -1110,7 +1281,7 @@ class AjustesPro(commands.Cog):
                 if guess == number:
                     user = self.get_user(ctx.author.id)
                     user["xp"] += 30
-                    DataManager.save(self.data)
+                    self.saver.mark()
                     
                     await ctx.send(
                         f"🎉 ¡CORRECTO! Era **{number}**\n"
@@ -7,16 +7,23 @@ from datetime import datetime, timedelta
 import re
 import json
 import os
+import asyncio
+import threading
 from typing import Optional, List, Dict, Any, Union
 from dataclasses import dataclass, asdict, fields
 from enum import Enum
-from functools import lru_cache
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from collections import OrderedDict
+from PIL import Image, ImageDraw
 import io
-import aiohttp
-import textwrap
 import random
 
+from utils.render_service import ImagenRender, RenderSpec, render_service
+from utils.image_effects import downscaled_blur, factor_verificado, fast_blur, linear_gradient, vignette, sparkle_field, glass_tint
+from utils.quality_tiers import COMPLETA, REDUCIDA, calidad_actual, decorativos, escalar
+from utils.font_registry import obtener_fuente
+from utils.text_layout import Bloque, maquetador
+from utils.remote_assets import assets_remotos, decodificar, imagen_rgba
+
 
 class ConfigImagenes:
     ANCHO_BASE = 1200
@@ -42,60 +49,126 @@ class ConfigImagenes:
     # Rutas relativas para portabilidad
     FUENTE_TITULO = "./fonts/classic.ttf"
     FUENTE_BODY = "./fonts/classic.ttf"
-    # Fallbacks del sistema (se intentarán si las anteriores fallan)
-    FALLBACKS_SISTEMA = [
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
-        "arial.ttf"
-    ]
+    # Los fallbacks del sistema viven en utils.font_registry.FALLBACKS_SISTEMA
     FUENTE_EMOJI = "./fonts/emojis.ttf"
 
     TAMAÑO_TITULO = 70
     TAMAÑO_BODY = 40
 
+    # Maquetación del texto: ancho útil (px), separación entre bloques y
+    # alto redondeado a PASO_ALTO para que la caché de fondos siga acertando
+    ANCHO_TEXTO = 1000
+    Y_TEXTO = MARGEN + 180
+    SEPARACION_BLOQUES = 40
+    ESPACIO_INFERIOR = 140
+    PASO_ALTO = 40
+
+    # Caché de capas de fondo (por proceso de render)
+    CACHE_FONDOS_MB = 64
+    VARIANTES_FONDO = 3
+    PRECALENTAR_COLORES = ("cyan", "dorado", "morado")
+    PRECALENTAR_ESTILOS = ("moderno", "cyberpunk", "elegante")
+
+    # Anuncios animados: "GIF", "WEBP" o "PNG" (APNG)
+    FORMATO_ANIMADO = "GIF"
+    FRAMES_BRILLO = 10
+    DURACION_FRAME = 100
+    ANCHO_BANDA = 150
+    BLUR_BANDA = 10
+    ALFA_BANDA = 40
+
     BLUR_RADIUS = 30
     RADIO_ESQUINAS = 50
     ICONO_TAMAÑO = 140
     LOGO_BOT_URL = "https://cdn.discordapp.com/embed/avatars/0.png" # Placeholder
 
 
+class CacheFondos:
+    """
+    LRU de capas de fondo ya renderizadas, limitado por memoria.
+    
+    Las capas se comparten entre peticiones: quien las use debe componer
+    encima (alpha_composite devuelve una imagen nueva) y nunca dibujar sobre ellas.
+    """
+
+    def __init__(self, max_mb: float = 64):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._capas: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evicciones": 0}
+
+    @staticmethod
+    def _peso(img: Image.Image) -> int:
+        return img.width * img.height * len(img.getbands())
+
+    def obtener(self, clave: tuple, crear) -> Image.Image:
+        capa = self._capas.get(clave)
+        if capa is not None:
+            self._capas.move_to_end(clave)
+            self.stats["hits"] += 1
+            return capa
+
+        self.stats["misses"] += 1
+        capa = crear()
+        self.guardar(clave, capa)
+        return capa
+
+    def buscar(self, clave: tuple) -> Optional[Image.Image]:
+        """Capa ya renderizada o None, sin crearla"""
+        capa = self._capas.get(clave)
+        if capa is not None:
+            self._capas.move_to_end(clave)
+            self.stats["hits"] += 1
+        return capa
+
+    def guardar(self, clave: tuple, capa: Image.Image) -> bool:
+        peso = self._peso(capa)
+        if peso > self.max_bytes:
+            return False
+        if clave in self._capas:
+            self._bytes -= self._peso(self._capas.pop(clave))
+        while self._capas and self._bytes + peso > self.max_bytes:
+            _, vieja = self._capas.popitem(last=False)
+            self._bytes -= self._peso(vieja)
+            self.stats["evicciones"] += 1
+        self._capas[clave] = capa
+        self._bytes += peso
+        return True
+
+    def cabe(self, ancho: int, alto: int) -> bool:
+        return self._bytes + ancho * alto * 4 <= self.max_bytes
+
+    def info(self) -> dict:
+        total = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "capas": len(self._capas),
+            "mb": round(self._bytes / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "hit_rate": round(self.stats["hits"] / total, 3) if total else 0.0
+        }
+
+
 class GeneradorImagenes:
     """Clase encargada de la generación de contenido visual con efectos de cristal (glass-morphism)."""
     
     def __init__(self):
         self.config = ConfigImagenes()
-        self._cache_iconos = {}
+        self._fondos = CacheFondos(self.config.CACHE_FONDOS_MB)
+        self._bandas: Dict[int, Image.Image] = {}
 
-    @lru_cache(maxsize=32)
-    def _obtener_fuente_cache(self, ruta: Optional[str], tamaño: int):
+    def _obtener_fuente(self, ruta: Optional[str], tamaño: int):
         """
-        💎 MOTOR DE CARGA DE FUENTES INTELIGENTE
+        💎 MOTOR DE CARGA DE FUENTES
         
-        Optimiza el uso de memoria RAM y velocidad de renderizado mediante 
-        un sistema de cache de último nivel (LRU).
+        Delega en el registro compartido del proceso (utils.font_registry),
+        que carga cada (cara, tamaño) una sola vez y aplica los fallbacks del sistema.
         
         Args:
-            ruta: Ruta al archivo .ttf (puede ser None para usar fallbacks).
+            ruta: Ruta al archivo .ttf (None = fuente principal).
             tamaño: Tamaño de la fuente en píxeles.
-            
-        Returns:
-            ImageFont: Objeto de fuente listo para dibujar en el lienzo.
         """
-        if ruta:
-            try:
-                return ImageFont.truetype(ruta, tamaño)
-            except:
-                pass
-        
-        for fallback in self.config.FALLBACKS_SISTEMA:
-            try:
-                return ImageFont.truetype(fallback, tamaño)
-            except:
-                continue
-        return ImageFont.load_default()
-
-    def _obtener_fuente(self, ruta: Optional[str], tamaño: int):
-        return self._obtener_fuente_cache(ruta, tamaño)
+        return obtener_fuente(ruta or "classic", tamaño)
 
     def _parsear_variables(self, texto: str, guild: discord.Guild, member: Optional[discord.Member] = None) -> str:
         """
@@ -140,166 +213,273 @@ class GeneradorImagenes:
                                    guild_name: str = "Servidor",
                                    es_3d: bool = False,
                                    context_guild: Optional[discord.Guild] = None,
-                                   context_member: Optional[discord.Member] = None) -> io.BytesIO:
+                                   context_member: Optional[discord.Member] = None,
+                                   guild_id: Optional[int] = None) -> ImagenRender:
+        datos = await self._preparar_anuncio(
+            tipo, titulo, contenido, guild_icon_url, color_personalizado, fondo_url,
+            estilo, guild_name, es_3d, context_guild, context_member
+        )
+        if guild_id is None and context_guild:
+            guild_id = context_guild.id
+        return await render_service.render_io(
+            RenderSpec("módulos.anuncios:GeneradorImagenes.renderizar_anuncio", kwargs=datos, guild_id=guild_id)
+        )
 
+    async def _preparar_anuncio(self, tipo: str, titulo: str, contenido: str,
+                                guild_icon_url: Optional[str] = None,
+                                color_personalizado: Optional[str] = None,
+                                fondo_url: Optional[str] = None,
+                                estilo: str = "moderno",
+                                guild_name: str = "Servidor",
+                                es_3d: bool = False,
+                                context_guild: Optional[discord.Guild] = None,
+                                context_member: Optional[discord.Member] = None) -> dict:
+        """Resolver variables y descargas en el loop; el render solo recibe datos planos"""
         # Procesar variables si el contexto está disponible
         if context_guild:
             titulo = self._parsear_variables(titulo, context_guild, context_member)
             contenido = self._parsear_variables(contenido, context_guild, context_member)
 
-        alto = self._calcular_altura(titulo, contenido)
+        return {
+            "tipo": tipo,
+            "titulo": titulo,
+            "contenido": contenido,
+            "icono_bytes": await self._descargar_imagen(guild_icon_url, self.config.ICONO_TAMAÑO) if guild_icon_url else None,
+            "color_personalizado": color_personalizado,
+            "fondo_bytes": await self._descargar_fondo(fondo_url) if fondo_url else None,
+            "estilo": estilo,
+            "guild_name": guild_name,
+            "es_3d": es_3d,
+            "variante": random.randrange(self.config.VARIANTES_FONDO)
+        }
+
+    def renderizar_anuncio(self, tipo: str, titulo: str, contenido: str,
+                           icono_bytes: Optional[bytes] = None,
+                           color_personalizado: Optional[str] = None,
+                           fondo_bytes: Optional[bytes] = None,
+                           estilo: str = "moderno",
+                           guild_name: str = "Servidor",
+                           es_3d: bool = False,
+                           variante: int = 0) -> Image.Image:
+        """Render síncrono del anuncio (se ejecuta en el render service)"""
+        # Maquetar antes de nada: el alto de la imagen sale de los bloques ya medidos
+        tamaño_titulo = self._auto_ajustar_fuente(titulo, self.config.TAMAÑO_TITULO, 20)
+        bloque_titulo = maquetador.maquetar(titulo, self.config.ANCHO_TEXTO, self.config.FUENTE_TITULO,
+                                            tamaño_titulo, interlineado=10)
+        bloque_contenido = maquetador.maquetar(contenido, self.config.ANCHO_TEXTO, self.config.FUENTE_BODY,
+                                               self.config.TAMAÑO_BODY, interlineado=8)
+        alto = self._calcular_altura(bloque_titulo, bloque_contenido)
         color_base = self.config.PALETA_COLORES.get(color_personalizado or tipo, (0, 191, 255))
 
-        if fondo_url:
-            img = await self._crear_fondo_personalizado(self.config.ANCHO_BASE, alto, fondo_url, color_base)
+        # Fondo + partículas + borde: cacheado salvo fondo personalizado
+        if fondo_bytes:
+            img = self._componer_capa_fondo(
+                self._crear_fondo_personalizado(self.config.ANCHO_BASE, alto, fondo_bytes, color_base),
+                estilo, color_base, random.Random()
+            )
         else:
-            img = self._crear_fondo_glass_iphone(self.config.ANCHO_BASE, alto, color_base, estilo)
-
-        # Agregar partículas según estilo
-        img = self._agregar_particulas(img, estilo, color_base)
+            img = self._capa_fondo(self.config.ANCHO_BASE, alto, color_base, estilo, variante)
 
         overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
         draw = ImageDraw.Draw(overlay)
 
-        # Ajuste automático de fuentes
-        tamaño_titulo = self._auto_ajustar_fuente(titulo, self.config.TAMAÑO_TITULO, 20)
-        font_titulo = self._obtener_fuente(self.config.FUENTE_TITULO, tamaño_titulo)
-        font_body = self._obtener_fuente(self.config.FUENTE_BODY, self.config.TAMAÑO_BODY)
-
-        if guild_icon_url:
-            overlay = await self._agregar_icono_servidor(overlay, guild_icon_url)
-
-        y_offset = self.config.MARGEN + 180
-
-        # Renderizar Título
-        titulo_lines = textwrap.wrap(titulo, width=int(25 * (70/tamaño_titulo)))
-        for line in titulo_lines:
-            bbox = draw.textbbox((0, 0), line, font=font_titulo)
-            w = bbox[2] - bbox[0]
-            x = (self.config.ANCHO_BASE - w) // 2
-            self._renderizar_texto_con_sombra(draw, (x, y_offset), line, font_titulo, (255, 255, 255, 255))
-            y_offset += (bbox[3] - bbox[1]) + 20
-
-        y_offset += 40
-
-        # Renderizar Contenido
-        contenido_lines = textwrap.wrap(contenido, width=40)
-        for line in contenido_lines:
-            bbox = draw.textbbox((0, 0), line, font=font_body)
-            w = bbox[2] - bbox[0]
-            x = (self.config.ANCHO_BASE - w) // 2
-            self._renderizar_texto_con_sombra(draw, (x, y_offset), line, font_body, (240, 240, 240, 255), offset=2)
-            y_offset += (bbox[3] - bbox[1]) + 15
+        if icono_bytes:
+            overlay = self._agregar_icono_servidor(overlay, icono_bytes)
+
+        # Título y contenido centrados, una sola pasada de dibujo
+        x_caja = (self.config.ANCHO_BASE - self.config.ANCHO_TEXTO) // 2
+        y_offset = maquetador.dibujar(
+            draw, bloque_titulo, (x_caja, self.config.Y_TEXTO), self.config.ANCHO_TEXTO,
+            alinear="centro", sombra=((0, 0, 0, 120), 4), fill=(255, 255, 255, 255)
+        )
+        maquetador.dibujar(
+            draw, bloque_contenido, (x_caja, y_offset + self.config.SEPARACION_BLOQUES), self.config.ANCHO_TEXTO,
+            alinear="centro", sombra=((0, 0, 0, 120), 2), fill=(240, 240, 240, 255)
+        )
 
         img = Image.alpha_composite(img, overlay)
-        img = self._agregar_borde_glass(img, color_base)
         
         # Footer branding
-        img = await self._renderizar_footer_imagen(img, guild_name)
+        img = self._renderizar_footer_imagen(img, guild_name)
 
         # Motor 3D Simulator
         if es_3d:
             img = self._aplicar_efecto_3d(img, color_base)
 
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG', quality=95)
-        buffer.seek(0)
-
-        return buffer
+        return img
 
-    async def crear_gif_anuncio(self, **kwargs) -> io.BytesIO:
+    async def crear_gif_anuncio(self, guild_id: Optional[int] = None, **kwargs) -> ImagenRender:
         """
-        Crea un anuncio animado (GIF) con efectos de brillo desplazándose.
+        Crea un anuncio animado (GIF, WebP o APNG según FORMATO_ANIMADO) con un brillo desplazándose.
         Requiere los mismos argumentos que crear_imagen_anuncio.
         """
         # Desactivar 3D temporalmente para GIFs por rendimiento
         kwargs["es_3d"] = False 
-        
-        frames = []
-        num_frames = 10
-        
-        # Generar imagen base estática (sin overlay de brillo)
-        # Para optimizar, generamos la base una vez y luego pegamos el brillo
-        img_base_buffer = await self.crear_imagen_anuncio(**kwargs)
-        img_base = Image.open(img_base_buffer).convert('RGBA')
-        
+        datos = await self._preparar_anuncio(**kwargs)
+        return await render_service.render_io(
+            RenderSpec("módulos.anuncios:GeneradorImagenes.renderizar_gif_anuncio", kwargs=datos, guild_id=guild_id)
+        )
+
+    def _banda_brillo(self, alto: int) -> Image.Image:
+        """
+        Rayo de luz diagonal ya desenfocado, como capa RGBA ajustada a su bounding box.
+        Solo depende del alto: se calcula una vez y en cada frame solo se desplaza.
+        """
+        banda = self._bandas.get(alto)
+        if banda is None:
+            margen = self.config.BLUR_BANDA * 3
+            ancho_banda = self.config.ANCHO_BANDA
+            mascara = Image.new('L', (ancho_banda + alto + 2 * margen, alto), 0)
+            ImageDraw.Draw(mascara).polygon([
+                (margen, 0),
+                (margen + ancho_banda, 0),
+                (margen + ancho_banda + alto, alto),
+                (margen + alto, alto)
+            ], fill=self.config.ALFA_BANDA)
+            mascara = fast_blur(mascara, self.config.BLUR_BANDA)
+
+            banda = Image.new('RGBA', mascara.size, (255, 255, 255, 0))
+            banda.putalpha(mascara)
+            if len(self._bandas) >= 8:
+                self._bandas.pop(next(iter(self._bandas)))
+            self._bandas[alto] = banda
+        return banda
+
+    def _frames_brillo(self, img_base: Image.Image) -> List[Image.Image]:
+        """Frames RGBA con el rayo desplazándose; solo se compone la zona de la banda"""
         ancho, alto = img_base.size
-        
+        banda = self._banda_brillo(alto)
+        margen = self.config.BLUR_BANDA * 3
+        num_frames = self.config.FRAMES_BRILLO
+
+        frames = []
         for i in range(num_frames):
             frame = img_base.copy()
-            draw = ImageDraw.Draw(frame)
-            
-            # Dibujar un rayo de luz diagonal desplazándose
-            offset = (i / num_frames) * (ancho + alto) - alto
-            # Coordenadas: una banda diagonal
-            puntos = [
-                (offset, 0),
-                (offset + 150, 0),
-                (offset + 150 + alto, alto),
-                (offset + alto, alto)
-            ]
-            
-            # Capa de brillo
-            overlay = Image.new('RGBA', frame.size, (0, 0, 0, 0))
-            o_draw = ImageDraw.Draw(overlay)
-            o_draw.polygon(puntos, fill=(255, 255, 255, 40))
-            overlay = overlay.filter(ImageFilter.GaussianBlur(10))
-            
-            frame = Image.alpha_composite(frame, overlay)
+            # Misma trayectoria que antes: de fuera por la izquierda a fuera por la derecha
+            offset = round((i / num_frames) * (ancho + alto) - alto) - margen
+            origen_x = max(0, -offset)
+            destino_x = max(0, offset)
+            visible = min(banda.width - origen_x, ancho - destino_x)
+            if visible > 0:
+                frame.alpha_composite(banda, dest=(destino_x, 0), source=(origen_x, 0, origen_x + visible, alto))
             frames.append(frame)
+        return frames
+
+    def renderizar_gif_anuncio(self, **datos) -> io.BytesIO:
+        """Render síncrono del anuncio animado a partir de los datos de _preparar_anuncio"""
+        # Imagen base estática en memoria: los frames solo le suman el brillo
+        img_base = self.renderizar_anuncio(**datos).convert('RGBA')
+        frames = self._frames_brillo(img_base)
+        formato = self.config.FORMATO_ANIMADO.upper()
+        duracion = self.config.DURACION_FRAME
 
         buffer = io.BytesIO()
-        # Guardar como GIF animado optimizado
-        frames[0].save(
-            buffer, 
-            format='GIF', 
-            append_images=frames[1:], 
-            save_all=True, 
-            duration=100, 
-            loop=0,
-            optimize=True
-        )
+        if formato == "WEBP":
+            frames[0].save(
+                buffer, format='WEBP', append_images=frames[1:], save_all=True,
+                duration=duracion, loop=0, quality=80, method=4
+            )
+        else:
+            # Una sola paleta para todos los frames, sacada del frame central (con brillo)
+            muestra = frames[len(frames) // 2].convert('RGB')
+            paleta = muestra.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+            # Sin dithering: las zonas estáticas quedan idénticas entre frames
+            # y el encoder solo guarda el rectángulo que cambia
+            indexados = [
+                f.convert('RGB').quantize(palette=paleta, dither=Image.Dither.NONE) for f in frames
+            ]
+            if formato == "PNG":
+                indexados[0].save(
+                    buffer, format='PNG', append_images=indexados[1:], save_all=True,
+                    duration=duracion, loop=0, optimize=False
+                )
+            else:
+                indexados[0].save(
+                    buffer, format='GIF', append_images=indexados[1:], save_all=True,
+                    duration=duracion, loop=0, optimize=False
+                )
         buffer.seek(0)
         return buffer
 
-    def _calcular_altura(self, titulo: str, contenido: str) -> int:
-        titulo_lines = len(textwrap.wrap(titulo, width=25))
-        contenido_lines = len(textwrap.wrap(contenido, width=35))
-
-        altura_base = 500
-        altura_titulo = titulo_lines * 90
-        altura_contenido = contenido_lines * 60
+    def _clave_fondo(self, clave: tuple):
+        """
+        Bajo carga se prefiere la capa completa si ya está en caché; si no,
+        la capa degradada se guarda aparte para no mezclar niveles.
+        """
+        nivel = calidad_actual()
+        if nivel == COMPLETA:
+            return clave, None
+        return clave + (nivel,), self._fondos.buscar(clave)
+
+    def _capa_fondo(self, ancho: int, alto: int, color_base: tuple, estilo: str, variante: int = 0) -> Image.Image:
+        """Capa de fondo completa (glass + partículas + borde) desde la caché LRU"""
+        def crear():
+            rnd = random.Random(f"{ancho}x{alto}-{tuple(color_base)}-{estilo}-{variante}")
+            fondo = self._crear_fondo_glass_iphone(ancho, alto, color_base, estilo, rnd)
+            return self._componer_capa_fondo(fondo, estilo, color_base, rnd)
+        clave, completa = self._clave_fondo(("anuncio", ancho, alto, tuple(color_base), estilo, variante))
+        return completa if completa is not None else self._fondos.obtener(clave, crear)
+
+    def _componer_capa_fondo(self, fondo: Image.Image, estilo: str, color_base: tuple, rnd: random.Random) -> Image.Image:
+        img = self._agregar_particulas(fondo, estilo, color_base, rnd)
+        return self._agregar_borde_glass(img, color_base)
 
-        return max(self.config.ALTO_BASE, altura_base + altura_titulo + altura_contenido)
+    def _fondo_glass_cacheado(self, ancho: int, alto: int, color_base: tuple, estilo: str = "moderno") -> Image.Image:
+        """Solo la capa glass (gráficas y emblemas), también desde la caché"""
+        clave, completa = self._clave_fondo(("glass", ancho, alto, tuple(color_base), estilo, 0))
+        if completa is not None:
+            return completa
+        return self._fondos.obtener(
+            clave, lambda: self._crear_fondo_glass_iphone(ancho, alto, color_base, estilo, random.Random(0))
+        )
 
-    async def _crear_fondo_personalizado(self, ancho: int, alto: int, url: str, color_base: tuple) -> Image.Image:
+    def precalentar_fondos(self, colores=None, estilos=None) -> int:
+        """Renderizar de antemano las combinaciones habituales (tamaño base, variante 0)"""
+        creadas = 0
+        for color in colores or self.config.PRECALENTAR_COLORES:
+            color_base = self.config.PALETA_COLORES.get(color, (0, 191, 255))
+            for estilo in estilos or self.config.PRECALENTAR_ESTILOS:
+                if not self._fondos.cabe(self.config.ANCHO_BASE, self.config.ALTO_BASE):
+                    return creadas
+                self._capa_fondo(self.config.ANCHO_BASE, self.config.ALTO_BASE, color_base, estilo, 0)
+                creadas += 1
+        return creadas
+
+    def estadisticas_fondos(self) -> dict:
+        return self._fondos.info()
+
+    def _calcular_altura(self, titulo: Bloque, contenido: Bloque) -> int:
+        """Alto justo para el texto maquetado, redondeado hacia arriba a PASO_ALTO"""
+        cfg = self.config
+        necesario = cfg.Y_TEXTO + titulo.alto + cfg.SEPARACION_BLOQUES + contenido.alto + cfg.ESPACIO_INFERIOR
+        alto = -(-necesario // cfg.PASO_ALTO) * cfg.PASO_ALTO
+        return max(cfg.ALTO_BASE, int(alto))
+
+    async def _descargar_fondo(self, url: str) -> Optional[bytes]:
+        return await assets_remotos.obtener(url)
+
+    def _crear_fondo_personalizado(self, ancho: int, alto: int, data: bytes, color_base: tuple) -> Image.Image:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as resp:
-                    if resp.status == 200:
-                        data = await resp.read()
-                        bg = Image.open(io.BytesIO(data)).convert('RGBA')
-                        bg = bg.resize((ancho, alto), Image.Resampling.LANCZOS)
-                        bg = bg.filter(ImageFilter.GaussianBlur(15))
-                        
-                        # Capa de tinte color base
-                        tinte = Image.new('RGBA', (ancho, alto), color_base + (100,))
-                        bg = Image.alpha_composite(bg, tinte)
-                        return bg
+            bg = fast_blur(imagen_rgba(data, (ancho, alto)), 15)
+            
+            # Capa de tinte color base
+            tinte = Image.new('RGBA', (ancho, alto), color_base + (100,))
+            bg = Image.alpha_composite(bg, tinte)
+            return bg
         except:
             pass
         return self._crear_fondo_glass_iphone(ancho, alto, color_base)
 
-    def _renderizar_texto_con_sombra(self, draw, pos, texto, font, fill, shadow_fill=(0, 0, 0, 120), offset=4):
-        x, y = pos
-        draw.text((x + offset, y + offset), texto, fill=shadow_fill, font=font)
-        draw.text((x, y), texto, fill=fill, font=font)
-
     def _auto_ajustar_fuente(self, texto: str, tamaño_max: int, largo_umbral: int) -> int:
         if len(texto) <= largo_umbral: return tamaño_max
         return max(30, tamaño_max - (len(texto) - largo_umbral) // 2)
 
-    def _agregar_particulas(self, img: Image.Image, estilo: str, color_base: tuple) -> Image.Image:
+    def _agregar_particulas(self, img: Image.Image, estilo: str, color_base: tuple,
+                            rnd: Optional[random.Random] = None) -> Image.Image:
+        if not decorativos():
+            return img
+
+        rnd = rnd or random
         overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
         draw = ImageDraw.Draw(overlay)
         ancho, alto = img.size
@@ -308,22 +488,22 @@ class GeneradorImagenes:
             # Líneas de escaneo y circuitos neón
             for i in range(0, alto, 15):
                 draw.line([(0, i), (ancho, i)], fill=(color_base[0], color_base[1], color_base[2], 30), width=1)
-            for _ in range(15):
-                x = random.randint(0, ancho)
-                y = random.randint(0, alto)
-                l = random.randint(50, 200)
+            for _ in range(escalar(15)):
+                x = rnd.randint(0, ancho)
+                y = rnd.randint(0, alto)
+                l = rnd.randint(50, 200)
                 draw.line([(x, y), (x + l, y)], fill=(255, 0, 255, 80), width=2)
         
         elif estilo == "elegante":
             # Estrellas/Destellos suaves
-            for _ in range(40):
-                x, y = random.randint(0, ancho), random.randint(0, alto)
-                r = random.randint(1, 3)
+            for _ in range(escalar(40)):
+                x, y = rnd.randint(0, ancho), rnd.randint(0, alto)
+                r = rnd.randint(1, 3)
                 draw.ellipse([x-r, y-r, x+r, y+r], fill=(255, 215, 0, 150))
         
         return Image.alpha_composite(img, overlay)
 
-    async def _renderizar_footer_imagen(self, img: Image.Image, guild_name: str) -> Image.Image:
+    def _renderizar_footer_imagen(self, img: Image.Image, guild_name: str) -> Image.Image:
         draw = ImageDraw.Draw(img)
         ancho, alto = img.size
         font_footer = self._obtener_fuente(self.config.FUENTE_BODY, 25)
@@ -355,6 +535,11 @@ class GeneradorImagenes:
             img: La imagen 2D ya renderizada.
             color_base: Color para las sombras y el grosor del cristal.
         """
+        # Bajo carga máxima el 3D (el paso más caro del anuncio) se omite
+        nivel = calidad_actual()
+        if not decorativos():
+            return img
+
         ancho, alto = img.size
         # Crear lienzo expandido para la sombra y perspectiva
         lienzo = Image.new('RGBA', (ancho + 100, alto + 100), (0, 0, 0, 0))
@@ -363,7 +548,10 @@ class GeneradorImagenes:
         sombra = Image.new('RGBA', (ancho, alto), (0, 0, 0, 0))
         s_draw = ImageDraw.Draw(sombra)
         s_draw.rectangle([0, 0, ancho, alto], fill=(0, 0, 0, 150))
-        sombra = sombra.filter(ImageFilter.GaussianBlur(radius=20))
+        if nivel == REDUCIDA:
+            sombra = downscaled_blur(sombra, 20, max(2, factor_verificado(20, sombra.mode)) * 2)
+        else:
+            sombra = fast_blur(sombra, 20)
         
         # Rotación leve para efecto isométrico (Simulado con transform)
         coeffs = (1, 0.05, -20, 0, 1, 0)
@@ -383,11 +571,13 @@ class GeneradorImagenes:
 
     async def analizar_branding_servidor(self, url: str) -> List[str]:
         """Analiza los colores predominantes del icono del servidor."""
-        data = await self._descargar_imagen(url)
+        data = await self._descargar_imagen(url, 64)
         if not data: return ["cyan", "dorado"]
         
-        img = Image.open(io.BytesIO(data)).convert('RGB')
-        img = img.resize((50, 50))
+        try:
+            img = decodificar(data, (50, 50)).convert('RGB')
+        except Exception:
+            return ["cyan", "dorado"]
         img = img.quantize(colors=8).convert('RGB')
         colores = img.getcolors(50*50)
         if not colores: return ["cyan", "dorado"]
@@ -409,7 +599,7 @@ class GeneradorImagenes:
         - Etiquetas auto-truncadas para evitar desbordamiento.
         - Bordes suaves y sombras internas para un acabado premium.
         """
-        img = self._crear_fondo_glass_iphone(ancho, alto, color_base, "elegante")
+        img = self._fondo_glass_cacheado(ancho, alto, color_base, "elegante").copy()
         draw = ImageDraw.Draw(img)
         font_titulo = self._obtener_fuente(self.config.FUENTE_TITULO, 50)
         font_texto = self._obtener_fuente(self.config.FUENTE_BODY, 30)
@@ -436,9 +626,9 @@ class GeneradorImagenes:
             
         return self._agregar_borde_glass(img, color_base)
 
-    def _crear_fondo_glass_iphone(self, ancho: int, alto: int, color_base: tuple, estilo: str = "moderno") -> Image.Image:
-        img = Image.new('RGBA', (ancho, alto))
-        draw = ImageDraw.Draw(img)
+    def _crear_fondo_glass_iphone(self, ancho: int, alto: int, color_base: tuple, estilo: str = "moderno",
+                                  rnd: Optional[random.Random] = None) -> Image.Image:
+        rnd = rnd or random.Random()
 
         # Gradiente base según estilo
         if estilo == "cyberpunk":
@@ -448,60 +638,40 @@ class GeneradorImagenes:
         else: # moderno
             c1, c2 = color_base, (int(color_base[0]*0.6), int(color_base[1]*0.6), int(color_base[2]*0.6))
 
-        for y in range(alto):
-            f = y / alto
-            r = int(c1[0]*(1-f) + c2[0]*f)
-            g = int(c1[1]*(1-f) + c2[1]*f)
-            b = int(c1[2]*(1-f) + c2[2]*f)
-            draw.rectangle([(0, y), (ancho, y + 1)], fill=(r, g, b, 220))
+        img = linear_gradient(ancho, alto, (*c1, 220), (*c2, 220))
 
         # Gradiente radial (Vignette)
-        vignette = Image.new('RGBA', (ancho, alto), (0, 0, 0, 0))
-        v_draw = ImageDraw.Draw(vignette)
-        cx, cy = ancho // 2, alto // 2
-        max_dist = (cx**2 + cy**2)**0.5
-        for y in range(0, alto, 5):
-            for x in range(0, ancho, 5):
-                dist = ((x - cx)**2 + (y - cy)**2)**0.5
-                factor = dist / max_dist
-                alpha = int(100 * factor)
-                v_draw.rectangle([x, y, x + 5, y + 5], fill=(0, 0, 0, alpha))
-        
-        img = Image.alpha_composite(img, vignette)
-        img = self._agregar_burbujas_glass(img, color_base)
-        img = img.filter(ImageFilter.GaussianBlur(radius=self.config.BLUR_RADIUS))
-
-        overlay = Image.new('RGBA', img.size, (255, 255, 255, 30))
-        img = Image.alpha_composite(img, overlay)
+        img = Image.alpha_composite(img, vignette(ancho, alto, 100))
+        img = self._agregar_burbujas_glass(img, color_base, rnd)
+        img = glass_tint(img, (255, 255, 255), 30, blur=self.config.BLUR_RADIUS)
 
         # Ruido y destellos
-        noise_overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        noise_draw = ImageDraw.Draw(noise_overlay)
-        for _ in range(700):
-            x = random.randint(0, ancho)
-            y = random.randint(0, alto)
-            size = random.randint(1, 3)
-            alpha = random.randint(10, 50)
-            noise_draw.ellipse([x, y, x + size, y + size], fill=(255, 255, 255, alpha))
-
-        img = Image.alpha_composite(img, noise_overlay)
+        semilla = rnd.randrange(2 ** 32)
+        destellos = escalar(700)
+        if destellos:
+            img = Image.alpha_composite(img, sparkle_field(ancho, alto, destellos, (255, 255, 255), (10, 50), (1, 3),
+                                                            seed=semilla))
         return img
 
-    def _agregar_burbujas_glass(self, img: Image.Image, color_base: tuple) -> Image.Image:
+    def _agregar_burbujas_glass(self, img: Image.Image, color_base: tuple,
+                                rnd: Optional[random.Random] = None) -> Image.Image:
+        rnd = rnd or random
+        num_burbujas = escalar(rnd.randint(8, 15))
+        if not num_burbujas:
+            return img
+
         overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
         draw = ImageDraw.Draw(overlay)
 
-        num_burbujas = random.randint(8, 15)
-
         for _ in range(num_burbujas):
-            x = random.randint(0, img.size[0])
-            y = random.randint(0, img.size[1])
-            radio = random.randint(80, 250)
+            x = rnd.randint(0, img.size[0])
+            y = rnd.randint(0, img.size[1])
+            radio = rnd.randint(80, 250)
 
             r = min(255, int(color_base[0] * 1.3))
             g = min(255, int(color_base[1] * 1.3))
             b = min(255, int(color_base[2] * 1.3))
-            alpha = random.randint(30, 70)
+            alpha = rnd.randint(30, 70)
 
             draw.ellipse([x - radio, y - radio, x + radio, y + radio],
                         fill=(r, g, b, alpha))
@@ -513,39 +683,21 @@ class GeneradorImagenes:
 
         return Image.alpha_composite(img, overlay)
 
-    async def _descargar_imagen(self, url: str) -> Optional[bytes]:
-        """Descarga una imagen con sistema de cache simple para evitar peticiones redundantes."""
-        if url in self._cache_iconos:
-            return self._cache_iconos[url]
-            
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=5) as resp:
-                    if resp.status == 200:
-                        data = await resp.read()
-                        self._cache_iconos[url] = data
-                        # Limpiar cache si es muy grande
-                        if len(self._cache_iconos) > 50:
-                            self._cache_iconos.pop(next(iter(self._cache_iconos)))
-                        return data
-        except:
-            pass
-        return None
+    async def _descargar_imagen(self, url: str, tamaño: Optional[int] = None) -> Optional[bytes]:
+        """Descarga un icono en la variante del CDN justa para `tamaño` (caché de assets remotos)."""
+        return await assets_remotos.obtener(url, tamaño, timeout=5)
 
-    async def _agregar_icono_servidor(self, img: Image.Image, icon_url: str) -> Image.Image:
+    def _agregar_icono_servidor(self, img: Image.Image, icon_data: bytes) -> Image.Image:
         """
         Añade el icono del servidor con efecto de resplandor al overlay de la imagen.
         
         Args:
             img: Imagen base.
-            icon_url: URL del icono del servidor.
+            icon_data: Bytes del icono del servidor (ya descargado).
         """
-        icon_data = await self._descargar_imagen(icon_url)
         if icon_data:
             try:
-                icon = Image.open(io.BytesIO(icon_data)).convert('RGBA')
-                icon = icon.resize((self.config.ICONO_TAMAÑO, self.config.ICONO_TAMAÑO),
-                                 Image.Resampling.LANCZOS)
+                icon = imagen_rgba(icon_data, (self.config.ICONO_TAMAÑO, self.config.ICONO_TAMAÑO))
 
                 mask = Image.new('L', (self.config.ICONO_TAMAÑO, self.config.ICONO_TAMAÑO), 0)
                 draw_mask = ImageDraw.Draw(mask)
@@ -560,7 +712,7 @@ class GeneradorImagenes:
                 glow_draw.ellipse((0, 0, self.config.ICONO_TAMAÑO + 20,
                                   self.config.ICONO_TAMAÑO + 20),
                                  fill=(255, 255, 255, 60))
-                glow = glow.filter(ImageFilter.GaussianBlur(10))
+                glow = fast_blur(glow, 10)
 
                 x_pos = (img.size[0] - self.config.ICONO_TAMAÑO) // 2
                 y_pos = 40
@@ -613,7 +765,17 @@ class GeneradorImagenes:
         return img
 
     async def crear_imagen_emblema(self, tipo: str, titulo: str, icon_url: Optional[str] = None, 
-                                   color_personalizado: str = "dorado", es_3d: bool = False) -> io.BytesIO:
+                                   color_personalizado: str = "dorado", es_3d: bool = False,
+                                   guild_id: Optional[int] = None) -> ImagenRender:
+        icon_bytes = await self._descargar_imagen(icon_url, 200) if icon_url else None
+        return await render_service.render_io(RenderSpec(
+            "módulos.anuncios:GeneradorImagenes.renderizar_emblema",
+            (tipo, titulo, icon_bytes, color_personalizado, es_3d),
+            guild_id=guild_id
+        ))
+
+    def renderizar_emblema(self, tipo: str, titulo: str, icon_bytes: Optional[bytes] = None,
+                           color_personalizado: str = "dorado", es_3d: bool = False) -> Image.Image:
         ancho, alto = 600, 600
         color_base = self.config.PALETA_COLORES.get(color_personalizado, (255, 215, 0))
         
@@ -622,7 +784,7 @@ class GeneradorImagenes:
         draw = ImageDraw.Draw(img)
         
         # Fondo glass circular
-        fondo = self._crear_fondo_glass_iphone(ancho, alto, color_base)
+        fondo = self._fondo_glass_cacheado(ancho, alto, color_base)
         mask = Image.new('L', (ancho, alto), 0)
         mask_draw = ImageDraw.Draw(mask)
         mask_draw.ellipse((20, 20, ancho-20, alto-20), fill=255)
@@ -644,20 +806,15 @@ class GeneradorImagenes:
             y = centro[1] + radio * math.sin(angulo) - 15
             draw_emblema.text((x, y), letras[i%2], fill=(255, 255, 255, 200), font=font_emoji)
 
-        if icon_url:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(icon_url) as resp:
-                    if resp.status == 200:
-                        icon_data = await resp.read()
-                        icon = Image.open(io.BytesIO(icon_data)).convert('RGBA')
-                        icon = icon.resize((200, 200), Image.Resampling.LANCZOS)
-                        
-                        # Mascara circular para el icono
-                        icon_mask = Image.new('L', (200, 200), 0)
-                        ImageDraw.Draw(icon_mask).ellipse((0, 0, 200, 200), fill=255)
-                        icon.putalpha(icon_mask)
-                        
-                        emblema.paste(icon, (ancho//2 - 100, alto//2 - 140), icon)
+        if icon_bytes:
+            icon = imagen_rgba(icon_bytes, (200, 200))
+            
+            # Mascara circular para el icono
+            icon_mask = Image.new('L', (200, 200), 0)
+            ImageDraw.Draw(icon_mask).ellipse((0, 0, 200, 200), fill=255)
+            icon.putalpha(icon_mask)
+            
+            emblema.paste(icon, (ancho//2 - 100, alto//2 - 140), icon)
 
         # Header (Tipo)
         font_header = self._obtener_fuente(self.config.FUENTE_TITULO, 35)
@@ -676,10 +833,7 @@ class GeneradorImagenes:
         if es_3d:
             emblema = self._aplicar_efecto_3d(emblema, color_base)
 
-        buffer = io.BytesIO()
-        emblema.save(buffer, format='PNG')
-        buffer.seek(0)
-        return buffer
+        return emblema
 
 
 class TipoAnuncio(Enum):
@@ -787,9 +941,23 @@ class BaseDatos:
     Utiliza una arquitectura de archivos JSON local con mecanismos de seguridad
     para prevenir la pérdida de datos y permitir migraciones automáticas entre versiones.
     """
+    TIPOS = ["anuncios", "eventos", "encuestas", "noticias", "sorteos"]
+    GUARDADO_DIFERIDO = 2.0     # Segundos en que los cambios seguidos se agrupan en una escritura
+
     def __init__(self, ruta: str = "./data/anuncios_datos.json"):
         self.ruta = ruta
         self._asegurar_archivo()
+        # Modelo residente: el JSON se parsea una vez y las lecturas usan índices
+        self._datos: Dict[str, Any] = self._leer_archivo()
+        self._por_id: Dict[str, tuple] = {}
+        self._por_servidor: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._indices_sucios = True
+        self._sucio = False
+        # Escritura diferida: versión serializada y versión ya en disco (gana siempre la más nueva)
+        self._version = 0
+        self._version_escrita = 0
+        self._lock_escritura = threading.Lock()
+        self._guardado: Optional[asyncio.Task] = None
 
     def _asegurar_archivo(self):
         os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
@@ -805,7 +973,7 @@ class BaseDatos:
             "estadisticas": {"total_creados": 0, "imagenes_generadas": 0}
         }
 
-    def cargar(self) -> Dict[str, Any]:
+    def _leer_archivo(self) -> Dict[str, Any]:
         try:
             if not os.path.exists(self.ruta): return self._default_data()
             with open(self.ruta, 'r', encoding='utf-8') as f:
@@ -818,42 +986,153 @@ class BaseDatos:
         except:
             return self._default_data()
 
-    def guardar(self, datos: Dict[str, Any]):
-        with open(self.ruta, 'w', encoding='utf-8') as f:
-            json.dump(datos, f, indent=2, ensure_ascii=False)
+    # ── Índices ─────────────────────────────────────────────────────────
+
+    def _indexar(self, tipo: str, item: Dict[str, Any]):
+        if tipo in self.TIPOS and "id" in item:
+            self._por_id[item["id"]] = (tipo, item)
+        self._por_servidor.setdefault((item.get("guild_id"), tipo), []).append(item)
+
+    def _desindexar(self, tipo: str, item: Dict[str, Any]):
+        if self._por_id.get(item.get("id"), (None, None))[1] is item:
+            del self._por_id[item["id"]]
+        lista = self._por_servidor.get((item.get("guild_id"), tipo), [])
+        for i, existente in enumerate(lista):
+            if existente is item:
+                del lista[i]
+                break
+
+    def _indices(self):
+        """Reconstruir índices solo si alguien cambió la estructura desde fuera"""
+        if self._indices_sucios:
+            self._por_id = {}
+            self._por_servidor = {}
+            for tipo in self.TIPOS + ["plantillas"]:
+                for item in self._datos.get(tipo, []):
+                    self._indexar(tipo, item)
+            self._indices_sucios = False
+
+    # ── Lectura / escritura ─────────────────────────────────────────────
+
+    def cargar(self) -> Dict[str, Any]:
+        """Devuelve el modelo residente (mutarlo y llamar a guardar para persistir)"""
+        return self._datos
+
+    def guardar(self, datos: Dict[str, Any] = None):
+        """
+        Marca el modelo para guardar (se escribe en segundo plano a los
+        GUARDADO_DIFERIDO segundos). Sin argumentos persiste cambios hechos en
+        registros obtenidos con `obtener`; con `datos` se asume que la
+        estructura pudo cambiar y los índices se rehacen en la próxima lectura.
+        """
+        if datos is not None:
+            self._datos = datos
+            self._indices_sucios = True
+        self._sucio = True
+        self._persistir()
+
+    def _persistir(self):
+        """Programar la escritura: un clic en un sorteo no reescribe el JSON entero en el loop"""
+        if not self._sucio: return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.cerrar()
+            return
+        if self._guardado is None or self._guardado.done():
+            self._guardado = loop.create_task(self._volcar_diferido())
+
+    async def _volcar_diferido(self):
+        await asyncio.sleep(self.GUARDADO_DIFERIDO)
+        await self.volcar()
+
+    def _tomar(self) -> Optional[tuple]:
+        """(versión, texto) de lo pendiente; se serializa en el loop, donde nadie muta el modelo a la vez"""
+        if not self._sucio: return None
+        self._sucio = False
+        self._version += 1
+        return self._version, json.dumps(self._datos, indent=2, ensure_ascii=False)
+
+    def _escribir(self, version: int, texto: str):
+        with self._lock_escritura:
+            # Un volcado en hilo que llega tarde no pisa uno más nuevo (p. ej. el de cerrar)
+            if version <= self._version_escrita: return
+            tmp = self.ruta + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(texto)
+            os.replace(tmp, self.ruta)
+            self._version_escrita = version
+
+    async def volcar(self):
+        """Escribir lo pendiente fuera del event loop"""
+        pendiente = self._tomar()
+        if pendiente is None: return
+        try:
+            await asyncio.to_thread(self._escribir, *pendiente)
+        except Exception as e:
+            self._sucio = True
+            print(f"Error guardando anuncios: {e}")
+
+    def cerrar(self):
+        """Escritura síncrona de lo pendiente (al descargar el cog o sin event loop)"""
+        if self._guardado is not None and not self._guardado.done():
+            self._guardado.cancel()
+        pendiente = self._tomar()
+        if pendiente is None: return
+        try:
+            self._escribir(*pendiente)
+        except Exception as e:
+            self._sucio = True
+            print(f"Error guardando anuncios: {e}")
+
+    def obtener(self, anuncio_id: str, tipo: str = None) -> Optional[Dict[str, Any]]:
+        """Registro por id en O(1); `tipo` opcional para validar la colección"""
+        self._indices()
+        tipo_item, item = self._por_id.get(anuncio_id, (None, None))
+        if tipo and tipo_item != tipo: return None
+        return item
+
+    def obtener_con_tipo(self, anuncio_id: str) -> tuple:
+        self._indices()
+        return self._por_id.get(anuncio_id, (None, None))
+
+    def reemplazar(self, tipo: str, registro: Dict[str, Any]):
+        """Sustituir un registro existente por id manteniendo su posición"""
+        self._indices()
+        _, viejo = self._por_id.get(registro.get("id"), (None, None))
+        lista = self._datos.get(tipo, [])
+        for i, a in enumerate(lista):
+            if a is viejo:
+                lista[i] = registro
+                self._desindexar(tipo, viejo)
+                self._indexar(tipo, registro)
+                self._sucio = True
+                break
+        self._persistir()
 
     def agregar(self, tipo: str, anuncio: AnuncioData):
-        datos = self.cargar()
-        if tipo in datos:
-            datos[tipo].append(anuncio.to_dict())
-            datos["estadisticas"]["total_creados"] += 1
-            self.guardar(datos)
+        if tipo in self._datos:
+            self._indices()
+            item = anuncio.to_dict()
+            self._datos[tipo].append(item)
+            self._indexar(tipo, item)
+            self._datos["estadisticas"]["total_creados"] += 1
+            self._sucio = True
+            self._persistir()
 
     def obtener_por_servidor(self, guild_id: int) -> Dict[str, List]:
-        datos = self.cargar()
-        return {
-            "anuncios": [a for a in datos.get("anuncios", []) if a["guild_id"] == guild_id],
-            "eventos": [e for e in datos.get("eventos", []) if e["guild_id"] == guild_id],
-            "encuestas": [e for e in datos.get("encuestas", []) if e["guild_id"] == guild_id],
-            "noticias": [n for n in datos.get("noticias", []) if n["guild_id"] == guild_id],
-            "sorteos": [s for s in datos.get("sorteos", []) if s["guild_id"] == guild_id]
-        }
+        self._indices()
+        return {tipo: list(self._por_servidor.get((guild_id, tipo), [])) for tipo in self.TIPOS}
 
     def obtener_estadisticas_servidor(self, guild_id: int) -> Dict[str, Any]:
         """Obtiene estadísticas detalladas filtradas por servidor."""
-        datos = self.cargar()
-        stats = {
-            "anuncios": len([a for a in datos.get("anuncios", []) if a["guild_id"] == guild_id]),
-            "eventos": len([a for a in datos.get("eventos", []) if a["guild_id"] == guild_id]),
-            "encuestas": len([a for a in datos.get("encuestas", []) if a["guild_id"] == guild_id]),
-            "noticias": len([a for a in datos.get("noticias", []) if a["guild_id"] == guild_id]),
-            "sorteos": len([a for a in datos.get("sorteos", []) if a["guild_id"] == guild_id])
-        }
+        self._indices()
+        stats = {tipo: len(self._por_servidor.get((guild_id, tipo), [])) for tipo in self.TIPOS}
         stats["total"] = sum(stats.values())
         return stats
 
     def obtener_estadisticas(self) -> Dict[str, Any]:
-        datos = self.cargar()
+        datos = self._datos
         return {
             "anuncios": len(datos.get("anuncios", [])),
             "eventos": len(datos.get("eventos", [])),
@@ -864,17 +1143,16 @@ class BaseDatos:
         }
 
     def obtener_config(self, guild_id: int) -> ConfigServidor:
-        datos = self.cargar()
-        conf_dict = datos.get("configuracion", {}).get(str(guild_id), {})
+        conf_dict = dict(self._datos.get("configuracion", {}).get(str(guild_id), {}))
         if not conf_dict: return ConfigServidor(guild_id=guild_id)
         # Quitar guild_id del dict para evitar duplicado en kwargs
         conf_dict.pop("guild_id", None)
         return ConfigServidor(guild_id=guild_id, **conf_dict)
 
     def guardar_config(self, config: ConfigServidor):
-        datos = self.cargar()
-        datos["configuracion"][str(config.guild_id)] = config.to_dict()
-        self.guardar(datos)
+        self._datos["configuracion"][str(config.guild_id)] = config.to_dict()
+        self._sucio = True
+        self._persistir()
 
     def establecer_canal_anuncios(self, guild_id: int, canal_id: int):
         config = self.obtener_config(guild_id)
@@ -885,43 +1163,58 @@ class BaseDatos:
         return self.obtener_config(guild_id).canal_anuncios
 
     def registrar_log(self, guild_id: int, mensaje: str, nivel: str = "INFO"):
-        datos = self.cargar()
         log_entry = {
             "fecha": datetime.now().isoformat(),
             "guild_id": guild_id,
             "mensaje": mensaje,
             "nivel": nivel
         }
-        datos["logs"].append(log_entry)
+        self._datos["logs"].append(log_entry)
         # Mantener solo los últimos 1000 logs
-        if len(datos["logs"]) > 1000: datos["logs"] = datos["logs"][-1000:]
-        self.guardar(datos)
+        if len(self._datos["logs"]) > 1000: self._datos["logs"] = self._datos["logs"][-1000:]
+        self._sucio = True
+        self._persistir()
 
     def guardar_plantilla(self, plantilla: PlantillaData):
-        datos = self.cargar()
-        datos["plantillas"].append(plantilla.to_dict())
-        self.guardar(datos)
+        self._indices()
+        item = plantilla.to_dict()
+        self._datos["plantillas"].append(item)
+        self._indexar("plantillas", item)
+        self._sucio = True
+        self._persistir()
 
     def obtener_plantillas(self, guild_id: int) -> List[Dict[str, Any]]:
-        datos = self.cargar()
-        return [p for p in datos.get("plantillas", []) if p["guild_id"] == guild_id]
+        self._indices()
+        return list(self._por_servidor.get((guild_id, "plantillas"), []))
 
     def eliminar_plantilla(self, plantilla_id: str):
-        datos = self.cargar()
-        datos["plantillas"] = [p for p in datos.get("plantillas", []) if p["id"] != plantilla_id]
-        self.guardar(datos)
+        self._datos["plantillas"] = [p for p in self._datos.get("plantillas", []) if p["id"] != plantilla_id]
+        self._indices_sucios = True
+        self._sucio = True
+        self._persistir()
 
     def eliminar_anuncio(self, tipo: str, anuncio_id: str):
-        datos = self.cargar()
-        if tipo in datos:
-            datos[tipo] = [a for a in datos[tipo] if a["id"] != anuncio_id]
-            self.guardar(datos)
+        if tipo in self._datos:
+            item = self.obtener(anuncio_id, tipo)
+            if item is None: return
+            self._datos[tipo] = [a for a in self._datos[tipo] if a is not item]
+            self._desindexar(tipo, item)
+            self._sucio = True
+            self._persistir()
+
+    def eliminar_servidor(self, guild_id: int):
+        """Borrar todos los registros (y plantillas) de un servidor"""
+        for key in self.TIPOS + ["plantillas"]:
+            self._datos[key] = [a for a in self._datos.get(key, []) if a.get("guild_id") != guild_id]
+        self._indices_sucios = True
+        self._sucio = True
+        self._persistir()
 
     def obtener_todos_anuncios(self, guild_id: int) -> List[Dict[str, Any]]:
-        datos = self.cargar()
+        self._indices()
         todos = []
-        for tipo in ["anuncios", "eventos", "encuestas", "noticias", "sorteos"]:
-            todos.extend([a for a in datos.get(tipo, []) if a["guild_id"] == guild_id])
+        for tipo in self.TIPOS:
+            todos.extend(self._por_servidor.get((guild_id, tipo), []))
         return todos
 
 
@@ -946,8 +1239,7 @@ class VistaParticiparSorteo(ui.View):
 
     @ui.button(label="Participar", style=discord.ButtonStyle.success, emoji="🎉", custom_id="participar_sorteo")
     async def btn_participar(self, interaction: discord.Interaction, button: ui.Button):
-        datos = self.db.cargar()
-        sorteo = next((s for s in datos["sorteos"] if s["id"] == self.sorteo_id), None)
+        sorteo = self.db.obtener(self.sorteo_id, "sorteos")
         
         if not sorteo or sorteo.get("finalizado"):
             return await interaction.response.send_message("❌ Este sorteo ya ha finalizado.", ephemeral=True)
@@ -962,7 +1254,7 @@ class VistaParticiparSorteo(ui.View):
         
         if "participantes" not in sorteo: sorteo["participantes"] = []
         sorteo["participantes"].append(interaction.user.id)
-        self.db.guardar(datos)
+        self.db.guardar()
         
         # Asignar roles de recompensa si existen
         roles_added = []
@@ -984,8 +1276,7 @@ class VistaRSVPEvento(ui.View):
         self.evento_id = evento_id
 
     async def _validar(self, member):
-        datos = self.db.cargar()
-        evento = next((e for e in datos["eventos"] if e["id"] == self.evento_id), None)
+        evento = self.db.obtener(self.evento_id, "eventos")
         if not evento: return False, "Evento no encontrado."
         req = evento.get("requisitos", {})
         if req.get("dias_min", 0) > 0 and member.joined_at:
@@ -995,8 +1286,7 @@ class VistaRSVPEvento(ui.View):
 
     async def _update_rsvp(self, interaction: discord.Interaction, status: str):
         user_id = interaction.user.id
-        datos = self.db.cargar()
-        evento = next((e for e in datos["eventos"] if e["id"] == self.evento_id), None)
+        evento = self.db.obtener(self.evento_id, "eventos")
         if not evento: return False
         
         if "rsvps" not in evento: evento["rsvps"] = {"si": [], "no": [], "quizas": []}
@@ -1004,7 +1294,7 @@ class VistaRSVPEvento(ui.View):
             if user_id in evento["rsvps"][s]: evento["rsvps"][s].remove(user_id)
             
         evento["rsvps"][status].append(user_id)
-        self.db.guardar(datos)
+        self.db.guardar()
 
         # Gestionar roles por RSVP
         for rid in evento.get("roles_recompensa", []):
@@ -1056,8 +1346,7 @@ class VistaVotarEncuesta(ui.View):
 
     def make_callback(self, index):
         async def callback(interaction: discord.Interaction):
-            datos = self.db.cargar()
-            enc = next((e for e in datos["encuestas"] if e["id"] == self.encuesta_id), None)
+            enc = self.db.obtener(self.encuesta_id, "encuestas")
             if not enc: return await interaction.response.send_message("❌ Error", ephemeral=True)
             
             if "votos" not in enc: enc["votos"] = {}
@@ -1071,27 +1360,26 @@ class VistaVotarEncuesta(ui.View):
             if idx_str not in enc["votos"]: enc["votos"][idx_str] = []
             enc["votos"][idx_str].append(user_id)
             
-            self.db.guardar(datos)
+            self.db.guardar()
             await interaction.response.send_message("✅ Voto registrado.", ephemeral=True)
         return callback
 
     @ui.button(label="Ver Resultados", style=discord.ButtonStyle.primary, emoji="📊", custom_id="ver_resultados", row=4)
     async def btn_resultados(self, interaction: discord.Interaction, button: ui.Button):
         await interaction.response.defer(ephemeral=True)
-        datos = self.db.cargar()
-        enc = next((e for e in datos["encuestas"] if e["id"] == self.encuesta_id), None)
+        enc = self.db.obtener(self.encuesta_id, "encuestas")
         
         # Generar imagen de resultados
         votos_final = {enc["contenido"].split("|")[int(k)]: len(v) for k, v in enc.get("votos", {}).items()}
         color_base = ConfigImagenes.PALETA_COLORES.get(enc.get("color_usado", "cyan"), (0, 191, 255))
         
-        generador = GeneradorImagenes()
-        img_buffer = io.BytesIO()
-        img = generador.renderizar_grafica_barras(1000, 700, votos_final, enc["titulo"], color_base)
-        img.save(img_buffer, format="PNG")
-        img_buffer.seek(0)
+        img_buffer = await render_service.render_io(RenderSpec(
+            "módulos.anuncios:GeneradorImagenes.renderizar_grafica_barras",
+            (1000, 700, votos_final, enc["titulo"], color_base),
+            guild_id=interaction.guild_id
+        ))
         
-        file = discord.File(fp=img_buffer, filename="resultados.png")
+        file = discord.File(fp=img_buffer, filename=img_buffer.nombre("resultados"))
         await interaction.followup.send("📊 Aquí tienes los resultados actuales:", file=file, ephemeral=True)
 
 
@@ -1187,9 +1475,10 @@ class SelectorConfig(ui.View):
             titulo="Título de Ejemplo",
             contenido="Este es un contenido de ejemplo para mostrar cómo se verá el estilo seleccionado.",
             color_personalizado=self.color,
-            estilo=self.estilo
+            estilo=self.estilo,
+            guild_id=interaction.guild_id
         )
-        file = discord.File(fp=img_buffer, filename="preview.png")
+        file = discord.File(fp=img_buffer, filename=img_buffer.nombre("preview"))
         await interaction.followup.send("🖼️ Aquí tienes una previsualización de tu diseño:", file=file, ephemeral=True)
 
     @ui.button(label="Continuar", style=discord.ButtonStyle.success, emoji="➡️")
@@ -1449,10 +1738,11 @@ class ModalEmblema(ui.Modal, title="🛡️ Crear Emblema"):
             titulo=self.titulo.value,
             icon_url=icon_url,
             color_personalizado=self.color,
-            es_3d=self.es_3d
+            es_3d=self.es_3d,
+            guild_id=self.ctx.guild.id
         )
 
-        archivo = discord.File(fp=imagen_buffer, filename="emblema_glass.png")
+        archivo = discord.File(fp=imagen_buffer, filename=imagen_buffer.nombre("emblema_glass"))
         await interaction.followup.send(file=archivo, ephemeral=True)
 
 
@@ -1493,17 +1783,16 @@ class ModalAnuncio(ui.Modal, title="📢 Crear Anuncio"):
             "fondo_url": self.fondo_url.value,
             "estilo": self.estilo,
             "guild_name": self.ctx.guild.name,
+            "guild_id": self.ctx.guild.id,
             "es_3d": self.es_3d
         }
 
         if self.animado:
             imagen_buffer = await self.generador.crear_gif_anuncio(**gen_kwargs)
-            ext = "gif"
         else:
             imagen_buffer = await self.generador.crear_imagen_anuncio(**gen_kwargs)
-            ext = "png"
 
-        filename = f"anuncio_glass.{ext}"
+        filename = imagen_buffer.nombre("anuncio_glass")
         
         anuncio_obj = AnuncioData(
             id=str(int(datetime.now().timestamp() * 1000)),
@@ -1590,18 +1879,17 @@ class ModalEvento(ui.Modal, title="🗓️ Crear Evento"):
             "fondo_url": self.fondo_url.value,
             "estilo": self.estilo,
             "guild_name": self.ctx.guild.name,
+            "guild_id": self.ctx.guild.id,
             "es_3d": self.es_3d
         }
 
         if self.animado:
             imagen_buffer = await self.generador.crear_gif_anuncio(**gen_kwargs)
-            ext = "gif"
         else:
             imagen_buffer = await self.generador.crear_imagen_anuncio(**gen_kwargs)
-            ext = "png"
 
         evento_id = str(int(datetime.now().timestamp() * 1000))
-        filename = f"evento_glass.{ext}"
+        filename = imagen_buffer.nombre("evento_glass")
         
         evento_obj = AnuncioData(
             id=evento_id,
@@ -1723,18 +2011,17 @@ class ModalEncuesta(ui.Modal, title="📊 Crear Encuesta"):
             "fondo_url": self.fondo_url.value,
             "estilo": self.estilo,
             "guild_name": self.ctx.guild.name,
+            "guild_id": self.ctx.guild.id,
             "es_3d": self.es_3d
         }
 
         if self.animado:
             imagen_buffer = await self.generador.crear_gif_anuncio(**gen_kwargs)
-            ext = "gif"
         else:
             imagen_buffer = await self.generador.crear_imagen_anuncio(**gen_kwargs)
-            ext = "png"
 
         enc_id = str(int(datetime.now().timestamp() * 1000))
-        filename = f"encuesta_glass.{ext}"
+        filename = imagen_buffer.nombre("encuesta_glass")
         
         encuesta_obj = AnuncioData(
             id=enc_id,
@@ -1811,18 +2098,17 @@ class ModalNoticia(ui.Modal, title="📰 Crear Noticia"):
             "fondo_url": self.fondo_url.value,
             "estilo": self.estilo,
             "guild_name": self.ctx.guild.name,
+            "guild_id": self.ctx.guild.id,
             "es_3d": self.es_3d
         }
 
         if self.animado:
             imagen_buffer = await self.generador.crear_gif_anuncio(**gen_kwargs)
-            ext = "gif"
         else:
             imagen_buffer = await self.generador.crear_imagen_anuncio(**gen_kwargs)
-            ext = "png"
 
         noticia_id = str(int(datetime.now().timestamp() * 1000))
-        filename = f"noticia_glass.{ext}"
+        filename = imagen_buffer.nombre("noticia_glass")
         
         noticia_obj = AnuncioData(
             id=noticia_id,
@@ -1915,18 +2201,17 @@ class ModalSorteo(ui.Modal, title="🎁 Crear Sorteo"):
             "fondo_url": self.fondo_url.value,
             "estilo": self.estilo,
             "guild_name": self.ctx.guild.name,
+            "guild_id": self.ctx.guild.id,
             "es_3d": self.es_3d
         }
 
         if self.animado:
             imagen_buffer = await self.generador.crear_gif_anuncio(**gen_kwargs)
-            ext = "gif"
         else:
             imagen_buffer = await self.generador.crear_imagen_anuncio(**gen_kwargs)
-            ext = "png"
 
         sorteo_id = str(int(datetime.now().timestamp() * 1000))
-        filename = f"sorteo_glass.{ext}"
+        filename = imagen_buffer.nombre("sorteo_glass")
         
         sorteo_obj = AnuncioData(
             id=sorteo_id,
@@ -2003,7 +2288,9 @@ class PanelAnuncios(commands.Cog):
                 count += 1
         
     def cog_unload(self):
+        # También al cerrar el bot: lo que quede pendiente se escribe ya
         self.verificar_expiraciones.cancel()
+        self.db.cerrar()
 
     @tasks.loop(minutes=5)
     async def verificar_expiraciones(self):
@@ -2137,10 +2424,7 @@ class PanelAnuncios(commands.Cog):
         def check(m): return m.author == ctx.author and m.channel == ctx.channel and m.content.lower() == 'si'
         try:
             await self.bot.wait_for('message', check=check, timeout=15)
-            datos = self.db.cargar()
-            for key in ["anuncios", "eventos", "encuestas", "noticias", "sorteos", "plantillas"]:
-                datos[key] = [a for a in datos[key] if a.get("guild_id") != ctx.guild.id]
-            self.db.guardar(datos)
+            self.db.eliminar_servidor(ctx.guild.id)
             await ctx.send("✅ Todos los datos han sido eliminados.")
         except:
             await ctx.send("❌ Operación cancelada.")
@@ -2190,15 +2474,7 @@ class PanelAnuncios(commands.Cog):
         El bot regenerará la imagen (incluyendo animaciones y 3D) y actualizará el mensaje
         original, manteniendo el mismo ID y estadísticas de interacción.
         """
-        datos = self.db.cargar()
-        anuncio_dict = None
-        tipo_encontrado = None
-        for tipo in ["anuncios", "eventos", "encuestas", "noticias", "sorteos"]:
-            for a in datos.get(tipo, []):
-                if a["id"] == anuncio_id:
-                    anuncio_dict = a
-                    tipo_encontrado = tipo
-                    break
+        tipo_encontrado, anuncio_dict = self.db.obtener_con_tipo(anuncio_id)
         
         if not anuncio_dict:
             return await ctx.send("❌ No se encontró ningún anuncio con ese ID.")
@@ -2234,15 +2510,15 @@ class PanelAnuncios(commands.Cog):
                     "estilo": self.obj.estilo,
                     "es_3d": self.obj.es_3d,
                     "guild_name": inter.guild.name,
+                    "guild_id": inter.guild.id,
                     "guild_icon_url": inter.guild.icon.url if inter.guild.icon else None
                 }
                 
                 if self.obj.animado:
                     img_buffer = await self.cog.generador.crear_gif_anuncio(**gen_kwargs)
-                    filename = f"edited_{self.obj.id}.gif"
                 else:
                     img_buffer = await self.cog.generador.crear_imagen_anuncio(**gen_kwargs)
-                    filename = f"edited_{self.obj.id}.png"
+                filename = img_buffer.nombre(f"edited_{self.obj.id}")
                 
                 # Intentar editar el mensaje original
                 canal = inter.guild.get_channel(self.obj.canal_id)
@@ -2265,13 +2541,7 @@ class PanelAnuncios(commands.Cog):
                         return await inter.followup.send("⚠️ No pude editar el mensaje original. ¿Fue borrado?", ephemeral=True)
                 
                 # Guardar cambios en DB
-                datos_db = self.db.cargar()
-                lista = datos_db[self.tipo_p]
-                for i, a in enumerate(lista):
-                    if a["id"] == self.obj.id:
-                        lista[i] = self.obj.to_dict()
-                        break
-                self.db.guardar(datos_db)
+                self.db.reemplazar(self.tipo_p, self.obj.to_dict())
                 await inter.followup.send("✅ Anuncio actualizado correctamente.", ephemeral=True)
 
         # Manejar si ctx es Context o Interaction
@@ -2305,17 +2575,13 @@ class PanelAnuncios(commands.Cog):
         if color_hex in self.generador.config.PALETA_COLORES:
             color_rgb = self.generador.config.PALETA_COLORES[color_hex]
 
-        img = self.generador.renderizar_grafica_barras(
-            1200, 800, datos_grafica, 
-            f"Reporte de Actividad: {ctx.guild.name}", 
-            color_rgb
-        )
-        
-        img_buffer = io.BytesIO()
-        img.save(img_buffer, format="PNG")
-        img_buffer.seek(0)
+        img_buffer = await render_service.render_io(RenderSpec(
+            "módulos.anuncios:GeneradorImagenes.renderizar_grafica_barras",
+            (1200, 800, datos_grafica, f"Reporte de Actividad: {ctx.guild.name}", color_rgb),
+            guild_id=ctx.guild.id
+        ))
         
-        file = discord.File(fp=img_buffer, filename="stats_pro_visual.png")
+        file = discord.File(fp=img_buffer, filename=img_buffer.nombre("stats_pro_visual"))
         await ctx.send("🖼️ Aquí tienes el resumen visual de actividad de tu servidor:", file=file)
 
     @commands.command(name="stats-pro")
@@ -2344,6 +2610,19 @@ class PanelAnuncios(commands.Cog):
         embed.add_field(name="Actividad Hoy", value=f"`{hoy_count}` anuncios", inline=False)
         await ctx.send(embed=embed)
 
+    @commands.command(name="cache-fondos")
+    @commands.is_owner()
+    async def cache_fondos(self, ctx):
+        """Estadísticas de la caché de fondos del worker de render que atiende la consulta."""
+        info = await render_service.consultar("módulos.anuncios:GeneradorImagenes.estadisticas_fondos")
+        embed = discord.Embed(title="🖼️ Caché de Fondos", color=discord.Color.blurple())
+        embed.add_field(name="Hits / Misses", value=f"`{info['hits']}` / `{info['misses']}`", inline=True)
+        embed.add_field(name="Hit Rate", value=f"`{info['hit_rate'] * 100:.1f}%`", inline=True)
+        embed.add_field(name="Evicciones", value=f"`{info['evicciones']}`", inline=True)
+        embed.add_field(name="Capas", value=f"`{info['capas']}`", inline=True)
+        embed.add_field(name="Memoria", value=f"`{info['mb']} / {info['max_mb']} MB`", inline=True)
+        await ctx.send(embed=embed)
+
     @commands.command(name="history")
     @is_admin()
     async def history(self, ctx):
@@ -2381,7 +2660,7 @@ class PanelAnuncios(commands.Cog):
                 context_guild=ctx.guild,
                 context_member=ctx.author
             )
-            file = discord.File(fp=img_buffer, filename="preview_diamond.png")
+            file = discord.File(fp=img_buffer, filename=img_buffer.nombre("preview_diamond"))
             await ctx.send("🖼️ Aquí tienes el resultado final de tu configuración:", file=file)
 
     @commands.command(name="help-anuncios")
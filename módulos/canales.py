@@ -4,17 +4,25 @@ from discord.ext import commands
 from discord import ui
 import json
 import os
-import io
+import random
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageDraw, ImageFilter
 from rich.console import Console
 from rich.panel import Panel
 import aiohttp
+from utils.render_service import RenderSpec, render_service
+from utils.image_effects import linear_gradient
+from utils.font_registry import fuentes, obtener_fuente
+from utils.remote_assets import assets_remotos, imagen_rgba
 
 # ──────────────────────────────
 # CONSTANTES
 # ──────────────────────────────
 
+# Archivo legacy: antes se compartía con la config del bot; se importa una vez al storage
 DATA_PATH = "data/config.json"
 EMBED_COLOR = 0xff79c6  # ROSA PROTAGONISTA
 EMBED_DARK = 0x1a0a1f   # MORADO OSCURO
@@ -26,42 +34,101 @@ console = Console()
 # CONFIG
 # ──────────────────────────────
 
+# La config de cada servidor es una entrada (id del servidor) de bot.config, en el storage SQLite
+_bot = None
+
 def load_config():
-    if not os.path.exists(DATA_PATH):
-        os.makedirs(os.path.dirname(DATA_PATH), exist_ok=True)
-        with open(DATA_PATH, "w") as f:
-            json.dump({}, f, indent=4)
-    with open(DATA_PATH, "r") as f:
-        return json.load(f)
+    """Config de todos los servidores (residente en memoria, sin leer disco)"""
+    return _bot.config
+
+def save_config(data, gid):
+    """Persistir solo la entrada del servidor que cambió"""
+    _bot.save_config(data, gid)
 
-def save_config(data):
-    with open(DATA_PATH, "w") as f:
-        json.dump(data, f, indent=4)
+def importar_config_legacy(bot):
+    """Pasar al storage lo que se siguió escribiendo en config.json y retirarlo"""
+    if not os.path.exists(DATA_PATH):
+        return
+    try:
+        with open(DATA_PATH, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+        servidores = {k: v for k, v in legacy.items() if k.isdigit() and isinstance(v, dict)}
+        bot.config.update(servidores)
+        bot.save_config(bot.config, *servidores)
+        os.replace(DATA_PATH, DATA_PATH + ".migrado")
+    except Exception as e:
+        print(f"Error migrando {DATA_PATH}: {e}")
 
 # ──────────────────────────────
 # BANNER GENERATOR (ULTRA MEJORADO CON FUENTES GRANDES)
 # ──────────────────────────────
 
-async def generate_banner(member: discord.Member, mode: str, custom_bg=None):
-    W, H = 900, 400
+async def generate_banner(member: discord.Member, mode: str, custom_bg: bytes = None):
+    """Reúne los datos del miembro y delega el dibujo al render service"""
+    try:
+        avatar_bytes = await assets_remotos.obtener(str(member.display_avatar.url), AVATAR_SIZE)
+    except:
+        avatar_bytes = None
+    spec = RenderSpec("módulos.canales:render_banner", kwargs={
+        "mode": mode,
+        "display_name": member.display_name,
+        "member_count": member.guild.member_count,
+        "joined": datetime.utcnow().strftime('%d/%m/%Y - %H:%M UTC'),
+        "avatar_bytes": avatar_bytes,
+        "custom_bg": custom_bg,
+    }, guild_id=member.guild.id)
+    return await render_service.render_io(spec)
+
+BANNER_W, BANNER_H = 900, 400
+AVATAR_SIZE = 140
+AVATAR_POS = (60, BANNER_H // 2 - AVATAR_SIZE // 2)
+TEXT_X = 240
+
+BANNER_TEXTOS = {
+    "welcome": ("WELCOME TO NODEX", "a new soul has arrived", "@"),
+    "leave": ("GOODBYE, SWEET SOUL", "your echo will remain", ":C"),
+}
+
+# Plantillas ya dibujadas por (modo, hash del fondo personalizado)
+_plantillas = OrderedDict()
+PLANTILLAS_MAX = 16
+
+# Tamaños del banner: título grande, subtítulo, usuario, info extra
+TAMAÑOS_FUENTE = (40, 20, 30, 20)
+
+def _fuentes():
+    """Fuentes del banner: (título, subtítulo, usuario, info) del registro compartido"""
+    return tuple(obtener_fuente("classic", t) for t in TAMAÑOS_FUENTE)
+
+@lru_cache(maxsize=1)
+def _mascara_avatar():
+    mask = Image.new("L", (AVATAR_SIZE, AVATAR_SIZE), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, AVATAR_SIZE, AVATAR_SIZE), fill=255)
+    return mask
+
+def _dibujar_plantilla(mode: str, custom_bg: bytes = None):
+    """Todo lo que no depende del miembro: fondo, estrellas, marco, glow y textos fijos"""
+    W, H = BANNER_W, BANNER_H
     
-    # Fondo con gradiente
-    base = Image.new("RGBA", (W, H), "#0a0a0f")
+    # Gradiente oscuro elegante (o fondo personalizado del servidor oscurecido)
+    base = None
+    if custom_bg:
+        try:
+            fondo = imagen_rgba(custom_bg, (W, H), recortar=True)
+            base = Image.alpha_composite(fondo, Image.new("RGBA", (W, H), (10, 10, 15, 150)))
+        except:
+            base = None
+    if base is None:
+        base = linear_gradient(W, H, (0, 10, 10), (30, 10, 40))
     draw = ImageDraw.Draw(base)
     
-    # Gradiente oscuro elegante
-    for y in range(H):
-        alpha = int(30 * (y / H))
-        draw.rectangle([(0, y), (W, y+1)], fill=f"#{alpha:02x}0a{alpha+10:02x}")
-    
-    # Efectos de partículas (estrellas)
-    import random
-    random.seed(member.id)
+    # Efectos de partículas (estrellas), fijas por modo
+    rnd = random.Random(mode)
     for _ in range(50):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        size = random.randint(1, 3)
-        alpha = random.randint(100, 255)
+        x = rnd.randint(0, W)
+        y = rnd.randint(0, H)
+        size = rnd.randint(1, 3)
+        alpha = rnd.randint(100, 255)
         draw.ellipse((x, y, x+size, y+size), fill=(255, 121, 198, alpha))
     
     # Marco rosa elegante con brillo
@@ -79,99 +146,82 @@ async def generate_banner(member: discord.Member, mode: str, custom_bg=None):
         width=4
     )
     
-    # Avatar con efecto glow
-    avatar_size = 140
-    try:
-        avatar_bytes = await member.display_avatar.read()
-        avatar = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA").resize((avatar_size, avatar_size))
-        
-        # Crear máscara circular
-        mask = Image.new("L", (avatar_size, avatar_size), 0)
-        ImageDraw.Draw(mask).ellipse((0, 0, avatar_size, avatar_size), fill=255)
-        
-        # Efecto glow alrededor del avatar
-        glow = Image.new("RGBA", (avatar_size+20, avatar_size+20), (0, 0, 0, 0))
-        glow_draw = ImageDraw.Draw(glow)
-        for i in range(10, 0, -1):
-            alpha = int(50 - i*4)
-            glow_draw.ellipse(
-                (10-i, 10-i, avatar_size+10+i, avatar_size+10+i),
-                fill=(255, 121, 198, alpha)
-            )
-        
-        base.paste(glow, (60-10, H//2 - avatar_size//2-10), glow)
-        avatar.putalpha(mask)
-        
-        # Borde del avatar
-        avatar_border = Image.new("RGBA", (avatar_size+8, avatar_size+8), (0, 0, 0, 0))
-        ImageDraw.Draw(avatar_border).ellipse((0, 0, avatar_size+8, avatar_size+8), outline="#ff79c6", width=4)
-        base.paste(avatar_border, (60-4, H//2 - avatar_size//2-4), avatar_border)
-        base.paste(avatar, (60, H//2 - avatar_size//2), avatar)
-    except:
-        pass
+    # Efecto glow alrededor del avatar
+    ax, ay = AVATAR_POS
+    glow = Image.new("RGBA", (AVATAR_SIZE+20, AVATAR_SIZE+20), (0, 0, 0, 0))
+    glow_draw = ImageDraw.Draw(glow)
+    for i in range(10, 0, -1):
+        alpha = int(50 - i*4)
+        glow_draw.ellipse(
+            (10-i, 10-i, AVATAR_SIZE+10+i, AVATAR_SIZE+10+i),
+            fill=(255, 121, 198, alpha)
+        )
+    base.paste(glow, (ax-10, ay-10), glow)
     
-    # ──────────────────────────────
-    # CARGAR FUENTES PERSONALIZADAS (DESDE CARPETA fonts/)
-    # ──────────────────────────────
-    try:
-        # Busca la fuente en la carpeta fonts/ en el directorio raíz
-        font_title = ImageFont.truetype("fonts/classic.ttf", 40)  # Título grande
-        font_subtitle = ImageFont.truetype("fonts/classic.ttf", 20)  # Subtítulo
-        font_username = ImageFont.truetype("fonts/classic.ttf", 30)  # Usuario
-        font_info = ImageFont.truetype("fonts/classic.ttf", 20)  # Info extra
-    except:
-        # Fuentes por defecto más grandes
-        try:
-            font_title = ImageFont.truetype("arial.ttf", 48)
-            font_subtitle = ImageFont.truetype("arial.ttf", 28)
-            font_username = ImageFont.truetype("arial.ttf", 38)
-            font_info = ImageFont.truetype("arial.ttf", 24)
-        except:
-            font_title = None
-            font_subtitle = None
-            font_username = None
-            font_info = None
+    # Borde del avatar
+    avatar_border = Image.new("RGBA", (AVATAR_SIZE+8, AVATAR_SIZE+8), (0, 0, 0, 0))
+    ImageDraw.Draw(avatar_border).ellipse((0, 0, AVATAR_SIZE+8, AVATAR_SIZE+8), outline="#ff79c6", width=4)
+    base.paste(avatar_border, (ax-4, ay-4), avatar_border)
+    
+    font_title, font_subtitle, _, font_info = _fuentes()
+    title, subtitle, _ = BANNER_TEXTOS.get(mode, BANNER_TEXTOS["leave"])
+    
+    # Título (GRANDE Y VISIBLE)
+    draw.text((TEXT_X, 60), title, fill="#ff79c6", font=font_title)
+    
+    # Subtítulo
+    draw.text((TEXT_X, 120), subtitle, fill="#d1d1d1", font=font_subtitle)
+    
+    # Decoraciones finales
+    draw.text((W-120, H-50), "<3", fill="#ff79c6", font=font_info)
     
-    if mode == "welcome":
-        title = "WELCOME TO NODEX"
-        subtitle = "a new soul has arrived"
-        icon = "@"
+    return base
+
+def plantilla_banner(mode: str, custom_bg: bytes = None):
+    """Plantilla cacheada por modo y fondo personalizado (no dibujar sobre ella: copiar)"""
+    clave = (mode, hashlib.sha1(custom_bg).hexdigest() if custom_bg else None)
+    plantilla = _plantillas.get(clave)
+    if plantilla is None:
+        plantilla = _dibujar_plantilla(mode, custom_bg)
+        _plantillas[clave] = plantilla
+        while len(_plantillas) > PLANTILLAS_MAX:
+            _plantillas.popitem(last=False)
     else:
-        title = "GOODBYE, SWEET SOUL"
-        subtitle = "your echo will remain"
-        icon = ":C"
+        _plantillas.move_to_end(clave)
+    return plantilla
+
+def render_banner(mode: str, display_name: str, member_count: int, joined: str,
+                  avatar_bytes: bytes = None, custom_bg: bytes = None):
+    """Dibujo del banner (se ejecuta en un worker del render service)"""
+    base = plantilla_banner(mode, custom_bg).copy()
+    draw = ImageDraw.Draw(base)
     
-    username = member.display_name[:20]
-    count = f"Soul #{member.guild.member_count}"
-    joined = f"{datetime.utcnow().strftime('%d/%m/%Y - %H:%M UTC')}"
+    # Avatar sobre el hueco de la plantilla
+    try:
+        avatar = imagen_rgba(avatar_bytes, (AVATAR_SIZE, AVATAR_SIZE))
+        base.paste(avatar, AVATAR_POS, _mascara_avatar())
+    except:
+        pass
     
     # ──────────────────────────────
-    # TEXTOS CON FUENTES GRANDES Y LEGIBLES
+    # TEXTOS DEL MIEMBRO
     # ──────────────────────────────
-    text_x = 240
+    _, _, _, font_info = _fuentes()
+    _, _, icon = BANNER_TEXTOS.get(mode, BANNER_TEXTOS["leave"])
     
-    # Título (GRANDE Y VISIBLE)
-    draw.text((text_x, 60), title, fill="#ff79c6", font=font_title)
+    username = display_name[:20]
+    count = f"Soul #{member_count}"
     
-    # Subtítulo
-    draw.text((text_x, 120), subtitle, fill="#d1d1d1", font=font_subtitle)
-    
-    # Usuario con icono
-    draw.text((text_x, 180), f"{icon} {username}", fill="#ffffff", font=font_username)
+    # Usuario con icono (emojis del nombre con la fuente de emojis)
+    fuentes.dibujar(draw, (TEXT_X, 180), f"{icon} {username}", "classic", TAMAÑOS_FUENTE[2], fill="#ffffff")
     
     # Contador de miembros
-    draw.text((text_x, 240), count, fill="#ff79c6", font=font_info)
+    draw.text((TEXT_X, 240), count, fill="#ff79c6", font=font_info)
     
     # Fecha/hora
-    draw.text((text_x, 280), joined, fill="#a0a0a0", font=font_info)
-    
-    # Decoraciones finales
-    draw.text((W-120, H-50), "<3", fill="#ff79c6", font=font_info)
+    draw.text((TEXT_X, 280), joined, fill="#a0a0a0", font=font_info)
     
-    buffer = io.BytesIO()
-    base.save(buffer, format="PNG")
-    buffer.seek(0)
-    return buffer
+    return base
 
 # ──────────────────────────────
 # MODAL MEJORADO
@@ -195,7 +245,7 @@ class IDModal(ui.Modal):
             gid = str(interaction.guild.id)
             data.setdefault(gid, {})
             data[gid][self.key] = int(self.input.value)
-            save_config(data)
+            save_config(data, gid)
 
             embed = discord.Embed(
                 title="✧ Configuración Exitosa",
@@ -227,7 +277,7 @@ class MessageModal(ui.Modal):
         gid = str(interaction.guild.id)
         data.setdefault(gid, {})
         data[gid][self.key] = self.input.value
-        save_config(data)
+        save_config(data, gid)
 
         embed = discord.Embed(
             title="✧ Mensaje Personalizado",
@@ -318,7 +368,7 @@ class PanelView(ui.View):
     async def reset(self, interaction, _):
         data = load_config()
         data.pop(str(interaction.guild.id), None)
-        save_config(data)
+        save_config(data, str(interaction.guild.id))
         
         embed = discord.Embed(
             title="✧ Reset Completo",
@@ -382,7 +432,7 @@ class Canales(commands.Cog):
             return
 
         banner = await generate_banner(member, "welcome")
-        file = discord.File(banner, filename="welcome.png")
+        file = discord.File(banner, filename=banner.nombre("welcome.png"))
 
         # Mensaje personalizado o por defecto
         if custom_msg:
@@ -401,7 +451,7 @@ class Canales(commands.Cog):
             description=description,
             color=EMBED_COLOR
         )
-        embed.set_image(url="attachment://welcome.png")
+        embed.set_image(url=f"attachment://{file.filename}")
         embed.set_footer(
             text=f"{member.guild.name} • {datetime.utcnow().strftime('%d/%m/%Y')}",
             icon_url=member.guild.icon.url if member.guild.icon else None
@@ -423,7 +473,7 @@ class Canales(commands.Cog):
             return
 
         banner = await generate_banner(member, "leave")
-        file = discord.File(banner, filename="leave.png")
+        file = discord.File(banner, filename=banner.nombre("leave.png"))
 
         # Mensaje personalizado o por defecto
         if custom_msg:
@@ -441,7 +491,7 @@ class Canales(commands.Cog):
             description=description,
             color=EMBED_DARK
         )
-        embed.set_image(url="attachment://leave.png")
+        embed.set_image(url=f"attachment://{file.filename}")
         embed.set_footer(text=f"Miembros restantes: {member.guild.member_count}")
 
         await channel.send(embed=embed, file=file)
@@ -509,4 +559,7 @@ class Canales(commands.Cog):
         await ctx.send(embed=embed)
 
 async def setup(bot):
+    global _bot
+    _bot = bot
+    importar_config_legacy(bot)
     await bot.add_cog(Canales(bot))
\ No newline at end of file
@@ -5,8 +5,13 @@ from datetime import datetime, timedelta
 import json
 import os
 import asyncio
-from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+from utils.render_service import RenderSpec, render_service
+from utils.image_effects import linear_gradient
+from utils.font_registry import obtener_fuente
+from utils.render_cache import render_cacheable
+from utils.quality_tiers import COMPLETA
+from utils.remote_assets import assets_remotos, imagen_rgba
 
 # =============================================================================
 # ⚙️ CONFIGURACIÓN PERSONALIZABLE - EDITA AQUÍ TUS PREFERENCIAS
@@ -94,29 +99,23 @@ def save_stories(data):
 # =============================================================================
 # 🎨 GENERADOR DE IMAGEN DEL PANEL
 # =============================================================================
-def create_panel_image(guild_icon_url=None):
-    """Crea una imagen personalizada estilo glassmorphism para el panel de confesiones"""
+@render_cacheable()
+def create_panel_image(icon_bytes=None):
+    """
+    Crea una imagen personalizada estilo glassmorphism para el panel de confesiones.
+    icon_bytes: icono ya descargado en el loop (PANEL_ICON_URL o icono del servidor).
+    """
     # Fondo degradado oscuro (dark purple/pink)
-    img = Image.new('RGB', (Config.PANEL_IMAGE_WIDTH, Config.PANEL_IMAGE_HEIGHT), (0, 0, 0))
+    # Degradado de morado oscuro (40, 20, 60) a rosa oscuro (100, 50, 120)
+    img = linear_gradient(
+        Config.PANEL_IMAGE_WIDTH, Config.PANEL_IMAGE_HEIGHT, (40, 20, 60), (100, 50, 120)
+    ).convert('RGB')
     draw = ImageDraw.Draw(img)
     
-    # Crear degradado de fondo dark
-    for y in range(Config.PANEL_IMAGE_HEIGHT):
-        # Degradado de morado oscuro a rosa oscuro
-        r = int(40 + (y / Config.PANEL_IMAGE_HEIGHT) * 60)   # 40 -> 100
-        g = int(20 + (y / Config.PANEL_IMAGE_HEIGHT) * 30)   # 20 -> 50
-        b = int(60 + (y / Config.PANEL_IMAGE_HEIGHT) * 60)   # 60 -> 120
-        draw.rectangle([(0, y), (Config.PANEL_IMAGE_WIDTH, y + 1)], fill=(r, g, b))
-    
-    # Intentar cargar la fuente personalizada
-    try:
-        font_title = ImageFont.truetype(FONT_PATH, 65)
-        font_subtitle = ImageFont.truetype(FONT_PATH, 28)
-        font_small = ImageFont.truetype(FONT_PATH, 22)
-    except:
-        font_title = ImageFont.load_default()
-        font_subtitle = ImageFont.load_default()
-        font_small = ImageFont.load_default()
+    # Fuentes del registro compartido (con fallback propio)
+    font_title = obtener_fuente(FONT_PATH, 65)
+    font_subtitle = obtener_fuente(FONT_PATH, 28)
+    font_small = obtener_fuente(FONT_PATH, 22)
     
     # Efecto glass - Rectángulo semitransparente (simulado con alpha blend)
     glass_overlay = Image.new('RGBA', (Config.PANEL_IMAGE_WIDTH, Config.PANEL_IMAGE_HEIGHT), (0, 0, 0, 0))
@@ -180,28 +179,17 @@ def create_panel_image(guild_icon_url=None):
     # ICONO CENTRAL (si está configurado)
     icon_y_position = title_y + 90
     
-    if Config.PANEL_ICON_URL or guild_icon_url:
+    if icon_bytes:
         try:
-            import requests
-            from io import BytesIO as IOBytes
-            
-            icon_url = Config.PANEL_ICON_URL if Config.PANEL_ICON_URL else guild_icon_url
-            response = requests.get(icon_url, timeout=5)
-            icon_img = Image.open(IOBytes(response.content))
-            
-            # Redimensionar el icono
+            # Decodificado ya al tamaño del icono (con tope de píxeles)
             icon_size = Config.PANEL_ICON_SIZE
-            icon_img = icon_img.resize((icon_size, icon_size), Image.Resampling.LANCZOS)
+            icon_img = imagen_rgba(icon_bytes, (icon_size, icon_size))
             
             # Crear máscara circular
             mask = Image.new('L', (icon_size, icon_size), 0)
             mask_draw = ImageDraw.Draw(mask)
             mask_draw.ellipse([(0, 0), (icon_size, icon_size)], fill=255)
             
-            # Convertir a RGBA si es necesario
-            if icon_img.mode != 'RGBA':
-                icon_img = icon_img.convert('RGBA')
-            
             # Aplicar máscara circular
             output = Image.new('RGBA', (icon_size, icon_size), (0, 0, 0, 0))
             output.paste(icon_img, (0, 0))
@@ -270,11 +258,7 @@ def create_panel_image(guild_icon_url=None):
         draw.ellipse([(x - 3, y - 3), (x + 3, y + 3)], fill=(255, 200, 230))
         draw.ellipse([(x - 1, y - 1), (x + 1, y + 1)], fill=(255, 255, 255))
     
-    # Guardar en BytesIO
-    buffer = BytesIO()
-    img.save(buffer, format='PNG')
-    buffer.seek(0)
-    return buffer
+    return img
 
 # =============================================================================
 # 🎭 MODALES
@@ -695,9 +679,13 @@ class Confesiones(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def panel_confesiones(self, ctx):
         """Crea el panel de confesiones con imagen personalizada"""
-        # Crear imagen del panel
-        panel_img = create_panel_image()
-        file = discord.File(fp=panel_img, filename="panel_confesiones.png")
+        # Imagen del panel en calidad completa (de la caché de renders si ya se generó para este servidor)
+        icon_bytes = await assets_remotos.obtener(Config.PANEL_ICON_URL, Config.PANEL_ICON_SIZE, timeout=5) if Config.PANEL_ICON_URL else None
+        imagen = await render_service.render_io(
+            RenderSpec("módulos.confesiones:create_panel_image", kwargs={"icon_bytes": icon_bytes},
+                       guild_id=ctx.guild.id, calidad=COMPLETA)
+        )
+        file = discord.File(imagen, filename=imagen.nombre("panel_confesiones.png"))
         
         # Crear embed
         embed = discord.Embed(
@@ -706,7 +694,7 @@ class Confesiones(commands.Cog):
             color=Config.COLOR_PRIMARY
         )
         
-        embed.set_image(url="attachment://panel_confesiones.png")
+        embed.set_image(url=f"attachment://{file.filename}")
         
         if ctx.guild.icon:
             embed.set_thumbnail(url=ctx.guild.icon.url)
@@ -716,7 +704,7 @@ class Confesiones(commands.Cog):
             icon_url=ctx.guild.icon.url if ctx.guild.icon else None
         )
         
-        await ctx.send(file=file, embed=embed, view=ConfesionPanelView(self.bot))
+        await ctx.send(embed=embed, view=ConfesionPanelView(self.bot), file=file)
     
     @commands.command(name="confesiones-stats")
     @commands.has_permissions(administrator=True)
@@ -3,12 +3,12 @@ from discord.ext import commands
 from discord import ui
 from datetime import datetime
 from PIL import Image
-import io
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.country_image_builder import CountryImageBuilder
+from utils.render_service import RenderSpec, render_service
 
 async def setup(bot):
     await bot.add_cog(Paises(bot))
@@ -125,19 +125,22 @@ class Paises(commands.Cog):
             """Mostrar galería visual"""
             async with ctx.typing():
                 try:
-                    gallery = self.image_builder.create_countries_grid(self.PAISES_LATAM)
-                    
-                    img_bytes = io.BytesIO()
-                    gallery.save(img_bytes, format='PNG')
-                    img_bytes.seek(0)
+                    # Un tile por país y la composición, en una sola ida y vuelta al worker
+                    # (cada panel cuesta ~3 ms: repartirlos entre workers sale más caro)
+                    img_bytes = await render_service.render_hoja(
+                        [RenderSpec("utils.country_image_builder:CountryImageBuilder.create_country_panel", (pais,))
+                         for pais in self.PAISES_LATAM.values()],
+                        RenderSpec("utils.country_image_builder:CountryImageBuilder.compose_countries_grid",
+                                   kwargs={"cols": 2}, guild_id=ctx.guild.id)
+                    )
                     
-                    file = discord.File(img_bytes, filename="galeria.png")
+                    file = discord.File(img_bytes, filename=img_bytes.nombre("galeria.png"))
                     embed = discord.Embed(
                         title="🌍 Galería de Naciones",
                         description="Todos los países disponibles",
                         color=self.Colors.PINK
                     )
-                    embed.set_image(url="attachment://galeria.png")
+                    embed.set_image(url=f"attachment://{file.filename}")
                     await ctx.send(embed=embed, file=file)
                 except Exception as e:
                     await ctx.send(f"❌ Error: {str(e)[:80]}")
@@ -146,18 +149,14 @@ class Paises(commands.Cog):
             """Mostrar banner"""
             async with ctx.typing():
                 try:
-                    banner = self.image_builder.create_welcome_banner(
-                        ctx.guild.name,
-                        len(self.PAISES_LATAM)
-                    )
+                    img_bytes = await render_service.render_io(RenderSpec(
+                        "utils.country_image_builder:CountryImageBuilder.create_welcome_banner",
+                        (ctx.guild.name, len(self.PAISES_LATAM)), guild_id=ctx.guild.id
+                    ))
                     
-                    img_bytes = io.BytesIO()
-                    banner.save(img_bytes, format='PNG')
-                    img_bytes.seek(0)
-                    
-                    file = discord.File(img_bytes, filename="banner.png")
+                    file = discord.File(img_bytes, filename=img_bytes.nombre("banner.png"))
                     embed = discord.Embed(color=self.Colors.PINK)
-                    embed.set_image(url="attachment://banner.png")
+                    embed.set_image(url=f"attachment://{file.filename}")
                     await ctx.send(embed=embed, file=file)
                 except Exception as e:
                     await ctx.send(f"❌ Error: {str(e)[:80]}")
@@ -230,20 +229,18 @@ class PaisView(ui.View):
         if current_country:
             try:
                 # Generar tarjeta visual
-                image_builder = CountryImageBuilder()
-                card = image_builder.create_profile_card(current_country, user.name)
-                
-                img_bytes = io.BytesIO()
-                card.save(img_bytes, format='PNG')
-                img_bytes.seek(0)
+                img_bytes = await render_service.render_io(RenderSpec(
+                    "utils.country_image_builder:CountryImageBuilder.create_profile_card",
+                    (current_country, user.name), guild_id=interaction.guild_id
+                ))
                 
-                file = discord.File(img_bytes, filename="perfil.png")
+                file = discord.File(img_bytes, filename=img_bytes.nombre("perfil.png"))
                 embed = discord.Embed(
                     title="✨ Tu Perfil",
                     description=f"{current_country['bandera']} **{current_country['nombre']}**",
                     color=discord.Color(current_country.get("color", 0xFF69B4))
                 )
-                embed.set_image(url="attachment://perfil.png")
+                embed.set_image(url=f"attachment://{file.filename}")
                 await interaction.response.send_message(embed=embed, file=file, ephemeral=True)
             except:
                 # Fallback
@@ -5,13 +5,21 @@ import aiohttp
 import json
 import os
 from datetime import datetime
-import io
+from typing import Optional
 import traceback
 from dotenv import load_dotenv
 import asyncio
 import logging
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from PIL import Image, ImageDraw
 import aiohttp as aio
+from utils.render_service import RenderSpec, render_service
+from utils.image_effects import fast_blur, linear_gradient
+from utils.font_registry import obtener_fuente
+from utils.asset_registry import assets
+from utils.render_cache import render_cacheable
+from utils.quality_tiers import COMPLETA
+from utils.http_client import ROBLOX, cliente_http
+from utils.remote_assets import assets_remotos, imagen_rgba
 
 load_dotenv()
 
@@ -57,30 +65,7 @@ PANEL_SIZES = {
 
 def create_gradient_bg(width: int, height: int, color1: tuple, color2: tuple) -> Image.Image:
     """Crear fondo con gradiente"""
-    img = Image.new('RGBA', (width, height))
-    pixels = img.load()
-    
-    for y in range(height):
-        ratio = y / height
-        r = int(color1[0] + (color2[0] - color1[0]) * ratio)
-        g = int(color1[1] + (color2[1] - color1[1]) * ratio)
-        b = int(color1[2] + (color2[2] - color1[2]) * ratio)
-        
-        for x in range(width):
-            pixels[x, y] = (r, g, b, 255)
-    
-    return img
-
-def download_image_bytes(url: str) -> Image.Image:
-    """Descargar imagen desde URL y retornar como PIL Image"""
-    try:
-        import requests
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            return Image.open(io.BytesIO(response.content))
-    except:
-        pass
-    return None
+    return linear_gradient(width, height, color1, color2)
 
 def create_circular_image(image: Image.Image, size: int) -> Image.Image:
     """Crear imagen circular con máscara y borde"""
@@ -129,7 +114,7 @@ def apply_shadow(image: Image.Image, offset: int = 10, blur: int = 15) -> Image.
     shadow_draw.rectangle([offset, offset, image.width + offset, image.height + offset],
                          fill=(0, 0, 0, 40))
     
-    shadow_layer = shadow_layer.filter(ImageFilter.GaussianBlur(radius=blur))
+    shadow_layer = fast_blur(shadow_layer, blur)
     shadow = Image.alpha_composite(shadow, shadow_layer)
     shadow.paste(image, (offset//2, offset//2), image)
     
@@ -155,15 +140,11 @@ def create_rounded_rectangle(draw, xy, radius=20, fill=None, outline=None, width
         draw.rectangle([x1 + width, y1 + width, x2 - width, y2 - width], fill=fill)
 
 def load_font(size: int):
-    """Cargar font classic.ttf con fallback a default"""
-    try:
-        if os.path.exists(FONT_CLASSIC):
-            return ImageFont.truetype(FONT_CLASSIC, size)
-    except:
-        pass
-    return ImageFont.load_default()
+    """Font classic.ttf del registro compartido (con fallback a default)"""
+    return obtener_fuente(FONT_CLASSIC, size)
 
-def create_roblox_verification_panel(group_id: int, server_name: str) -> io.BytesIO:
+@render_cacheable()
+def create_roblox_verification_panel(group_id: int, server_name: str) -> Image.Image:
     """Crear imagen del panel de verificación Roblox con estilo mejorado"""
     
     try:
@@ -253,22 +234,177 @@ def create_roblox_verification_panel(group_id: int, server_name: str) -> io.Byte
         except:
             pass
         
-        # Guardar imagen
-        img_bytes = io.BytesIO()
-        bg.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
-        
-        return img_bytes
+        return bg
     
     except:
         pass
         
         # Imagen de fallback
         blank = Image.new('RGBA', (PANEL_SIZES["width"], PANEL_SIZES["height"]), PANEL_COLORS["bg_primary"])
-        img_bytes = io.BytesIO()
-        blank.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
-        return img_bytes
+        return blank
+
+def render_clan_profile(author_name: str, avatar_bytes: Optional[bytes], roles: list, roblox_username: str,
+                        verified: bool, clan_name: str, descripcion: str, color_principal: str,
+                        color_secundario: str, fondo_bytes: Optional[bytes], opacidad_fondo: int) -> Image.Image:
+    """Panel visual de -mi-clan con efecto glass tipo iPhone (worker del render service)"""
+    w, h = 1800, 800  # Aumentado de 1600x700
+    # Colores personalizados
+    try:
+        color_hex_principal = tuple(int(color_principal[i:i+2], 16) for i in (0, 2, 4))
+        color_hex_secundario = tuple(int(color_secundario[i:i+2], 16) for i in (0, 2, 4))
+    except:
+        color_hex_principal = (255, 20, 147)
+        color_hex_secundario = (0, 191, 255)
+
+    # Fondo con gradiente mejorado
+    inicio = (10, 10, 30)
+    fin = tuple(c + (p - c) * 0.25 for c, p in zip(inicio, color_hex_principal))
+    panel = linear_gradient(w, h, inicio, fin)
+    draw = ImageDraw.Draw(panel, 'RGBA')
+
+    # Aplicar fondo personalizado si existe
+    if fondo_bytes:
+        try:
+            # Ya decodificado al tamaño del panel (caché de variantes del worker)
+            fondo_img = imagen_rgba(fondo_bytes, (w, h))
+            if fondo_img:
+
+                # Ajustar opacidad eficientemente (sin loops)
+                r, g, b, alpha_channel = fondo_img.split()
+                alpha_channel = alpha_channel.point(lambda p: int(p * opacidad_fondo / 100))
+                fondo_img.putalpha(alpha_channel)
+
+                # Combinar fondos (operación optimizada en C)
+                panel = Image.alpha_composite(panel, fondo_img)
+        except:
+            pass  # Si falla, continúa con el fondo gradiente
+
+    # ═══ SECCIÓN IZQUIERDA (DISCORD) ═══
+    glass_x1, glass_y1 = 40, 40
+    glass_x2, glass_y2 = 580, 760
+
+    # Crear glass rect y aplicar
+    glass_discord = create_glass_rect(glass_x2 - glass_x1, glass_y2 - glass_y1, 
+                                      color_hex_principal, opacity=18)
+    panel.paste(glass_discord, (glass_x1, glass_y1), glass_discord)
+    draw = ImageDraw.Draw(panel)
+
+    # Avatar de Discord - ARRIBA
+    discord_avatar = imagen_rgba(avatar_bytes, (200, 200))
+    if discord_avatar:
+        discord_avatar = create_circular_image(discord_avatar, 200)
+        avatar_x = glass_x1 + (glass_x2 - glass_x1 - 200) // 2
+        panel.paste(discord_avatar, (avatar_x, glass_y1 + 40), discord_avatar)
+
+    # Nombre Discord - DEBAJO DEL AVATAR
+    try:
+        font_name = load_font(40)
+        font_label = load_font(20)
+        font_roles = load_font(18)   # Nuevo: más grande para roles
+
+        # Nombre centrado debajo del avatar
+        draw.text((glass_x1 + 30, glass_y1 + 270), author_name, font=font_name, 
+                 fill=(255, 255, 255))
+
+        # Label "Discord" debajo del nombre
+        draw.text((glass_x1 + 30, glass_y1 + 320), "Discord", font=font_label, 
+                 fill=color_hex_secundario)
+
+        # Roles - TODOS (sin limite) pero máximo 8 para no saturar
+        roles_list = roles[:8]
+
+        if roles_list:
+            # Título de roles
+            draw.text((glass_x1 + 30, glass_y1 + 370), "🎭 Roles", font=font_label, 
+                     fill=color_hex_secundario)
+
+            # Mostrar cada rol en su propia línea con separación
+            y_offset = glass_y1 + 420
+            for idx, role in enumerate(roles_list):
+                truncated_role = role[:20] if len(role) > 20 else role
+                draw.text((glass_x1 + 40, y_offset + (idx * 30)), 
+                         f"• {truncated_role}", font=font_roles, 
+                         fill=(200, 200, 220))
+        else:
+            draw.text((glass_x1 + 30, glass_y1 + 370), "🎭 Miembro", font=font_label, 
+                     fill=color_hex_secundario)
+    except:
+        pass
+
+    # ═══ SECCIÓN DERECHA (CLAN) ═══
+    clan_x1, clan_y1 = 620, 40
+    clan_x2, clan_y2 = 1760, 760
+
+    glass_clan = create_glass_rect(clan_x2 - clan_x1, clan_y2 - clan_y1, 
+                                   color_hex_secundario, opacity=15)
+    panel.paste(glass_clan, (clan_x1, clan_y1), glass_clan)
+    draw = ImageDraw.Draw(panel, 'RGBA')
+
+    # Icono Roblox (PNG)
+    try:
+        if assets.existe("roblox_icon"):
+            # Variante 160x160 decodificada una vez por worker (solo se pega, no se copia)
+            roblox_icon = assets.obtener("roblox_icon", (160, 160))
+            icon_x = clan_x1 + (clan_x2 - clan_x1 - 160) // 2
+            panel.paste(roblox_icon, (icon_x, clan_y1 + 30), roblox_icon)
+        else:
+            # Fallback: emoji
+            try:
+                emoji_font = load_font(120)
+                draw.text((clan_x1 + 400, clan_y1 + 30), "🎮", font=emoji_font)
+            except:
+                pass
+    except:
+        pass
+
+    # Información del clan
+    try:
+        font_title = load_font(48)   # Aumentado de 34
+        font_text = load_font(24)    # Aumentado de 17
+        font_label = load_font(20)   # Aumentado de 14
+
+    
+        draw.text((clan_x1 + 40, clan_y1 + 220), "🎯 TU CLAN", font=font_label, 
+                 fill=color_hex_secundario)
+        draw.text((clan_x1 + 40, clan_y1 + 260), clan_name, font=font_title, 
+                 fill=(255, 255, 255))
+
+        # Separador
+        draw.line([(clan_x1 + 40, clan_y1 + 330), (clan_x2 - 40, clan_y1 + 330)],
+                 fill=color_hex_secundario + (80,), width=2)
+
+        # Usuario Roblox
+        draw.text((clan_x1 + 40, clan_y1 + 360), "🎮 Usuario", font=font_label, 
+                 fill=color_hex_secundario)
+        draw.text((clan_x1 + 40, clan_y1 + 410), roblox_username, 
+                 font=font_title, fill=(255, 255, 255))
+
+        # Separador
+        draw.line([(clan_x1 + 40, clan_y1 + 480), (clan_x2 - 40, clan_y1 + 480)],
+                 fill=color_hex_secundario + (80,), width=2)
+
+        # Estado
+        if verified:
+            draw.text((clan_x1 + 40, clan_y1 + 510), "✅ Vinculado", font=font_text, 
+                     fill=(100, 255, 150))
+        else:
+            draw.text((clan_x1 + 40, clan_y1 + 510), "⏳ Pendiente", font=font_text, 
+                     fill=(255, 200, 80))
+
+        # Descripción
+        draw.text((clan_x1 + 40, clan_y1 + 580), f"✨ {descripcion}", font=font_label, 
+                 fill=(200, 200, 220))
+
+    except:
+        pass
+
+    # Línea decorativa superior
+    draw.line([(40, 20), (1760, 20)], fill=color_hex_principal + (100,), width=3)
+
+    # Línea decorativa inferior
+    draw.line([(40, 775), (1760, 775)], fill=color_hex_secundario + (100,), width=3)
+    
+    return panel
 
 # ════════════════════════════════════════════════════════════════
 # 📦 FUNCIONES DE CACHÉ
@@ -539,7 +675,6 @@ class Roblox(commands.Cog):
         self.bot = bot
         self.cache = load_cache()
         self.config = load_config()
-        self.session = None
         self.sync_cache.start()
     
     def cog_unload(self):
@@ -548,10 +683,8 @@ class Roblox(commands.Cog):
             self.sync_cache.cancel()
     
     async def get_session(self) -> aiohttp.ClientSession:
-        """Obtener o crear sesión HTTP"""
-        if not self.session or self.session.closed:
-            self.session = aiohttp.ClientSession()
-        return self.session
+        """Sesión compartida de las APIs de Roblox (la cierra bot.py al apagar)"""
+        return cliente_http.sesion(ROBLOX)
     
     @tasks.loop(minutes=5)
     async def sync_cache(self):
@@ -775,9 +908,12 @@ class Roblox(commands.Cog):
             group_id = guild_config.get("group_id")
             
             async with ctx.typing():
-                # Crear imagen del panel
-                panel_image = create_roblox_verification_panel(group_id, ctx.guild.name)
-                file = discord.File(panel_image, filename="roblox_panel.png")
+                # Imagen del panel en calidad completa (de la caché de renders si ya se generó para este servidor)
+                imagen = await render_service.render_io(
+                    RenderSpec("módulos.roblox:create_roblox_verification_panel", (group_id, ctx.guild.name),
+                               guild_id=ctx.guild.id, calidad=COMPLETA)
+                )
+                file = discord.File(imagen, filename=imagen.nombre("roblox_panel.png"))
                 
                 # Crear embed
                 embed = discord.Embed(
@@ -804,13 +940,13 @@ class Roblox(commands.Cog):
                     inline=True
                 )
                 
-                embed.set_image(url="attachment://roblox_panel.png")
+                embed.set_image(url=f"attachment://{file.filename}")
                 embed.set_footer(text="Sistema automático de verificación")
                 
                 # Vista con botones
                 view = VerificationView(self)
                 
-                await ctx.send(embed=embed, file=file, view=view)
+                await ctx.send(embed=embed, view=view, file=file)
         
         except Exception as e:
             logging.error(f"Error mostrando panel: {e}")
@@ -852,183 +988,31 @@ class Roblox(commands.Cog):
                 
                 # Crear panel visual con efecto glass tipo iPhone - ULTRA ALTA RESOLUCIÓN
                 try:
-                    w, h = 1800, 800  # Aumentado de 1600x700
-                    panel = Image.new('RGBA', (w, h), (15, 15, 35, 255))
-                    draw = ImageDraw.Draw(panel, 'RGBA')
-                    
-                    # Colores personalizados
-                    try:
-                        color_hex_principal = tuple(int(color_principal[i:i+2], 16) for i in (0, 2, 4))
-                        color_hex_secundario = tuple(int(color_secundario[i:i+2], 16) for i in (0, 2, 4))
-                    except:
-                        color_hex_principal = (255, 20, 147)
-                        color_hex_secundario = (0, 191, 255)
-                    
-                    # Fondo con gradiente mejorado
-                    for y in range(h):
-                        ratio = y / h
-                        r = int(10 + (color_hex_principal[0] - 10) * ratio * 0.25)
-                        g = int(10 + (color_hex_principal[1] - 10) * ratio * 0.25)
-                        b = int(30 + (color_hex_principal[2] - 30) * ratio * 0.25)
-                        draw.line([(0, y), (w, y)], fill=(r, g, b, 255))
-                    
-                    # Aplicar fondo personalizado si existe
-                    if url_fondo:
-                        try:
-                            fondo_img = download_image_bytes(url_fondo)
-                            if fondo_img:
-                                # Redimensionar al tamaño del panel (rápido)
-                                fondo_img = fondo_img.resize((w, h), Image.Resampling.BILINEAR)
-                                fondo_img = fondo_img.convert('RGBA')
-                                
-                                # Ajustar opacidad eficientemente (sin loops)
-                                r, g, b, alpha_channel = fondo_img.split()
-                                alpha_channel = alpha_channel.point(lambda p: int(p * opacidad_fondo / 100))
-                                fondo_img.putalpha(alpha_channel)
-                                
-                                # Combinar fondos (operación optimizada en C)
-                                panel = Image.alpha_composite(panel, fondo_img)
-                        except:
-                            pass  # Si falla, continúa con el fondo gradiente
-                    
-                    # ═══ SECCIÓN IZQUIERDA (DISCORD) ═══
-                    glass_x1, glass_y1 = 40, 40
-                    glass_x2, glass_y2 = 580, 760
-                    
-                    # Crear glass rect y aplicar
-                    glass_discord = create_glass_rect(glass_x2 - glass_x1, glass_y2 - glass_y1, 
-                                                      color_hex_principal, opacity=18)
-                    panel.paste(glass_discord, (glass_x1, glass_y1), glass_discord)
-                    draw = ImageDraw.Draw(panel)
-                    
-                    # Avatar de Discord - ARRIBA
-                    discord_avatar = download_image_bytes(str(ctx.author.display_avatar.url))
-                    if discord_avatar:
-                        discord_avatar = create_circular_image(discord_avatar, 200)
-                        avatar_x = glass_x1 + (glass_x2 - glass_x1 - 200) // 2
-                        panel.paste(discord_avatar, (avatar_x, glass_y1 + 40), discord_avatar)
-                    
-                    # Nombre Discord - DEBAJO DEL AVATAR
-                    try:
-                        font_name = load_font(40)
-                        font_label = load_font(20)
-                        font_roles = load_font(18)   # Nuevo: más grande para roles
-                        
-                        # Nombre centrado debajo del avatar
-                        draw.text((glass_x1 + 30, glass_y1 + 270), ctx.author.name, font=font_name, 
-                                 fill=(255, 255, 255))
-                        
-                        # Label "Discord" debajo del nombre
-                        draw.text((glass_x1 + 30, glass_y1 + 320), "Discord", font=font_label, 
-                                 fill=color_hex_secundario)
-                        
-                        # Roles - TODOS (sin limite) pero máximo 8 para no saturar
-                        roles_list = [role.name for role in ctx.author.roles if role.name != "@everyone"][:8]
-                        
-                        if roles_list:
-                            # Título de roles
-                            draw.text((glass_x1 + 30, glass_y1 + 370), "🎭 Roles", font=font_label, 
-                                     fill=color_hex_secundario)
-                            
-                            # Mostrar cada rol en su propia línea con separación
-                            y_offset = glass_y1 + 420
-                            for idx, role in enumerate(roles_list):
-                                truncated_role = role[:20] if len(role) > 20 else role
-                                draw.text((glass_x1 + 40, y_offset + (idx * 30)), 
-                                         f"• {truncated_role}", font=font_roles, 
-                                         fill=(200, 200, 220))
-                        else:
-                            draw.text((glass_x1 + 30, glass_y1 + 370), "🎭 Miembro", font=font_label, 
-                                     fill=color_hex_secundario)
-                    except:
-                        pass
-                    
-                    # ═══ SECCIÓN DERECHA (CLAN) ═══
-                    clan_x1, clan_y1 = 620, 40
-                    clan_x2, clan_y2 = 1760, 760
-                    
-                    glass_clan = create_glass_rect(clan_x2 - clan_x1, clan_y2 - clan_y1, 
-                                                   color_hex_secundario, opacity=15)
-                    panel.paste(glass_clan, (clan_x1, clan_y1), glass_clan)
-                    draw = ImageDraw.Draw(panel, 'RGBA')
-                    
-                    # Icono Roblox (PNG)
-                    try:
-                        roblox_icon_path = "fonts/roblox_icon.png"
-                        if os.path.exists(roblox_icon_path):
-                            roblox_icon = Image.open(roblox_icon_path).convert('RGBA')
-                            roblox_icon = roblox_icon.resize((160, 160), Image.Resampling.LANCZOS)
-                            icon_x = clan_x1 + (clan_x2 - clan_x1 - 160) // 2
-                            panel.paste(roblox_icon, (icon_x, clan_y1 + 30), roblox_icon)
-                        else:
-                            # Fallback: emoji
-                            try:
-                                emoji_font = load_font(120)
-                                draw.text((clan_x1 + 400, clan_y1 + 30), "🎮", font=emoji_font)
-                            except:
-                                pass
-                    except:
-                        pass
-                    
-                    # Información del clan
-                    try:
-                        font_title = load_font(48)   # Aumentado de 34
-                        font_text = load_font(24)    # Aumentado de 17
-                        font_label = load_font(20)   # Aumentado de 14
-                        
-                        clan_name = guild_config.get('group_name', 'Tu Clan')
-                        
-                        draw.text((clan_x1 + 40, clan_y1 + 220), "🎯 TU CLAN", font=font_label, 
-                                 fill=color_hex_secundario)
-                        draw.text((clan_x1 + 40, clan_y1 + 260), clan_name, font=font_title, 
-                                 fill=(255, 255, 255))
-                        
-                        # Separador
-                        draw.line([(clan_x1 + 40, clan_y1 + 330), (clan_x2 - 40, clan_y1 + 330)],
-                                 fill=color_hex_secundario + (80,), width=2)
-                        
-                        # Usuario Roblox
-                        draw.text((clan_x1 + 40, clan_y1 + 360), "🎮 Usuario", font=font_label, 
-                                 fill=color_hex_secundario)
-                        draw.text((clan_x1 + 40, clan_y1 + 410), user_data.get('roblox_username'), 
-                                 font=font_title, fill=(255, 255, 255))
-                        
-                        # Separador
-                        draw.line([(clan_x1 + 40, clan_y1 + 480), (clan_x2 - 40, clan_y1 + 480)],
-                                 fill=color_hex_secundario + (80,), width=2)
-                        
-                        # Estado
-                        if user_data.get('verified'):
-                            draw.text((clan_x1 + 40, clan_y1 + 510), "✅ Vinculado", font=font_text, 
-                                     fill=(100, 255, 150))
-                        else:
-                            draw.text((clan_x1 + 40, clan_y1 + 510), "⏳ Pendiente", font=font_text, 
-                                     fill=(255, 200, 80))
-                        
-                        # Descripción
-                        draw.text((clan_x1 + 40, clan_y1 + 580), f"✨ {descripcion}", font=font_label, 
-                                 fill=(200, 200, 220))
-                        
-                    except:
-                        pass
-                    
-                    # Línea decorativa superior
-                    draw.line([(40, 20), (1760, 20)], fill=color_hex_principal + (100,), width=3)
-                    
-                    # Línea decorativa inferior
-                    draw.line([(40, 775), (1760, 775)], fill=color_hex_secundario + (100,), width=3)
+                    # Descargas en el loop (async, acotadas); el worker solo recibe bytes
+                    avatar_bytes, fondo_bytes = await assets_remotos.obtener_varias(
+                        [(str(ctx.author.display_avatar.url), 200), (url_fondo, None)], timeout=5
+                    )
+                    panel_bytes = await render_service.render_io(RenderSpec("módulos.roblox:render_clan_profile", kwargs={
+                        "author_name": ctx.author.name,
+                        "avatar_bytes": avatar_bytes,
+                        "roles": [role.name for role in ctx.author.roles if role.name != "@everyone"],
+                        "roblox_username": user_data.get('roblox_username'),
+                        "verified": bool(user_data.get('verified')),
+                        "clan_name": guild_config.get('group_name', 'Tu Clan'),
+                        "descripcion": descripcion,
+                        "color_principal": color_principal,
+                        "color_secundario": color_secundario,
+                        "fondo_bytes": fondo_bytes,
+                        "opacidad_fondo": opacidad_fondo,
+                    }, guild_id=ctx.guild.id))
                     
-                    # Guardar imagen
-                    panel_bytes = io.BytesIO()
-                    panel.save(panel_bytes, format='PNG')
-                    panel_bytes.seek(0)
                     
-                    file = discord.File(panel_bytes, filename="perfil_clan.png")
+                    file = discord.File(panel_bytes, filename=panel_bytes.nombre("perfil_clan.png"))
                     embed = discord.Embed(
                         title="🎮 Tu Perfil en el Clan",
                         color=discord.Color.blue()
                     )
-                    embed.set_image(url="attachment://perfil_clan.png")
+                    embed.set_image(url=f"attachment://{file.filename}")
                     embed.add_field(name="🔢 Roblox ID", value=f"`{user_data.get('roblox_user_id')}`", inline=False)
                     
                     if user_data.get('verified_at'):
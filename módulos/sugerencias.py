@@ -13,6 +13,8 @@ load_dotenv()
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.glass_image_builder import GlassImageBuilder
+from utils.render_service import RenderSpec, render_service
+from utils.quality_tiers import COMPLETA
 
 # ════════════════════════════════════════════════════════════════
 # 🎨 CONFIGURACIÓN GLOBAL
@@ -560,7 +562,7 @@ class Sugerencias(commands.Cog):
         colors = self.get_colors(ctx.guild.id)
         
         async with ctx.typing():
-            panel_file = None
+            file = None
             try:
                 panel_data = {
                     "titulo": custom['titulo'],
@@ -572,8 +574,12 @@ class Sugerencias(commands.Cog):
                     "emoji_like": custom['emoji_like'],
                     "emoji_dislike": custom['emoji_dislike'],
                 }
-                panel_img = self.glass_builder.create_suggestion_panel(panel_data)
-                panel_file = discord.File(panel_img, filename="panel.png")
+                # Calidad completa: sale de la caché de renders si ya se generó igual
+                imagen = await render_service.render_io(RenderSpec(
+                    "utils.glass_image_builder:GlassImageBuilder.create_suggestion_panel",
+                    (panel_data,), guild_id=ctx.guild.id, calidad=COMPLETA
+                ))
+                file = discord.File(imagen, filename=imagen.nombre("panel.png"))
             except:
                 pass
             
@@ -583,8 +589,8 @@ class Sugerencias(commands.Cog):
                 color=colors["color_principal"]
             )
             
-            if panel_file:
-                embed.set_image(url="attachment://panel.png")
+            if file:
+                embed.set_image(url=f"attachment://{file.filename}")
             else:
                 embed.add_field(
                     name="📝 Cómo Participar",
@@ -602,8 +608,8 @@ class Sugerencias(commands.Cog):
             embed.set_thumbnail(url=ctx.guild.icon.url if ctx.guild.icon else None)
             
             view = SugerenciasView(self, ctx.guild.id)
-            if panel_file:
-                await ctx.send(embed=embed, file=panel_file, view=view)
+            if file:
+                await ctx.send(embed=embed, view=view, file=file)
             else:
                 await ctx.send(embed=embed, view=view)
     
@@ -6,26 +6,43 @@ from datetime import datetime
 import os
 import asyncio
 import io
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import random
+from utils.render_service import RenderSpec, render_service
+from utils.image_effects import linear_gradient
+from utils.font_registry import fuentes, obtener_fuente
+from utils.render_cache import render_cacheable
+from utils.remote_assets import assets_remotos, imagen_rgba
+from utils.quality_tiers import COMPLETA
 
 # ──────────────────────────────
 # GENERADOR DE BANNERS PARA TICKETS
 # ──────────────────────────────
 
+async def ticket_panel_spec(guild: discord.Guild, calidad: str = None) -> RenderSpec:
+    """Spec del banner del panel (el icono del servidor forma parte del hash)"""
+    icon_bytes = None
+    if guild.icon:
+        try:
+            icon_bytes = await assets_remotos.obtener(str(guild.icon.url), 180)
+        except:
+            pass
+    return RenderSpec("módulos.tickets:render_ticket_panel_banner", kwargs={"icon_bytes": icon_bytes},
+                      guild_id=guild.id, calidad=calidad)
+
 async def generate_ticket_panel_banner(guild: discord.Guild):
     """Banner principal para el panel de tickets"""
+    return await render_service.render_io(await ticket_panel_spec(guild))
+
+@render_cacheable()
+def render_ticket_panel_banner(icon_bytes: bytes = None):
+    """Dibujo del banner del panel (worker del render service)"""
     W, H = 1100, 400
     
-    # Fondo con gradiente oscuro
-    base = Image.new("RGBA", (W, H), "#0a0a0f")
+    # Fondo con gradiente oscuro vertical
+    base = linear_gradient(W, H, (0, 10, 15), (25, 10, 40))
     draw = ImageDraw.Draw(base)
     
-    # Gradiente vertical
-    for y in range(H):
-        alpha = int(25 * (y / H))
-        draw.rectangle([(0, y), (W, y+1)], fill=f"#{alpha:02x}0a{alpha+15:02x}")
-    
     # Partículas decorativas
     for _ in range(60):
         x = random.randint(0, W)
@@ -45,12 +62,9 @@ async def generate_ticket_panel_banner(guild: discord.Guild):
     draw.rounded_rectangle((10, 10, W-10, H-10), radius=25, outline="#ff69b4", width=4)
     
     # Cargar fuentes
-    try:
-        font_title = ImageFont.truetype("fonts/classic.ttf", 38)
-        font_subtitle = ImageFont.truetype("fonts/classic.ttf", 22)
-        font_text = ImageFont.truetype("fonts/classic.ttf", 18)
-    except:
-        font_title = font_subtitle = font_text = None
+    font_title = obtener_fuente("classic", 38)
+    font_subtitle = obtener_fuente("classic", 22)
+    font_text = obtener_fuente("classic", 18)
     
     # Textos
     title = "CENTRO DE SOPORTE DE NODEX"
@@ -75,10 +89,9 @@ async def generate_ticket_panel_banner(guild: discord.Guild):
     draw.text((W//2 - 100, H-50), f"--- Sistema de Tickets ---", fill="#ff69b4", font=font_text)
     
     # Icono del servidor si existe
-    if guild.icon:
+    if icon_bytes:
         try:
-            icon_bytes = await guild.icon.read()
-            icon = Image.open(io.BytesIO(icon_bytes)).convert("RGBA").resize((180, 180))
+            icon = imagen_rgba(icon_bytes, (180, 180))
             
             mask = Image.new("L", (180, 180), 0)
             ImageDraw.Draw(mask).ellipse((0, 0, 180, 180), fill=255)
@@ -88,25 +101,34 @@ async def generate_ticket_panel_banner(guild: discord.Guild):
         except:
             pass
     
-    buffer = io.BytesIO()
-    base.save(buffer, format="PNG")
-    buffer.seek(0)
-    return buffer
+    return base
 
 async def generate_ticket_created_banner(user: discord.Member, ticket_type: str, ticket_num: int):
     """Banner cuando se crea un ticket"""
+    try:
+        avatar_bytes = await assets_remotos.obtener(str(user.display_avatar.url), 100)
+    except:
+        avatar_bytes = None
+    spec = RenderSpec("módulos.tickets:render_ticket_created_banner", kwargs={
+        "seed": user.id,
+        "display_name": user.display_name,
+        "ticket_type": ticket_type,
+        "ticket_num": ticket_num,
+        "created": datetime.now().strftime('%d/%m/%Y %H:%M'),
+        "avatar_bytes": avatar_bytes,
+    }, guild_id=user.guild.id)
+    return await render_service.render_io(spec)
+
+def render_ticket_created_banner(seed: int, display_name: str, ticket_type: str, ticket_num: int, created: str, avatar_bytes: bytes = None):
+    """Dibujo del banner de ticket creado (worker del render service)"""
     W, H = 800, 300
     
-    base = Image.new("RGBA", (W, H), "#0f0a14")
-    draw = ImageDraw.Draw(base)
-    
     # Gradiente
-    for y in range(H):
-        alpha = int(20 * (y / H))
-        draw.rectangle([(0, y), (W, y+1)], fill=f"#{alpha:02x}0a{alpha+12:02x}")
+    base = linear_gradient(W, H, (0, 10, 12), (20, 10, 32))
+    draw = ImageDraw.Draw(base)
     
     # Partículas
-    random.seed(user.id)
+    random.seed(seed)
     for _ in range(40):
         x = random.randint(0, W)
         y = random.randint(0, H)
@@ -119,8 +141,7 @@ async def generate_ticket_created_banner(user: discord.Member, ticket_type: str,
     # Avatar del usuario
     avatar_size = 100
     try:
-        avatar_bytes = await user.display_avatar.read()
-        avatar = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA").resize((avatar_size, avatar_size))
+        avatar = imagen_rgba(avatar_bytes, (avatar_size, avatar_size))
         
         mask = Image.new("L", (avatar_size, avatar_size), 0)
         ImageDraw.Draw(mask).ellipse((0, 0, avatar_size, avatar_size), fill=255)
@@ -142,11 +163,8 @@ async def generate_ticket_created_banner(user: discord.Member, ticket_type: str,
         pass
     
     # Fuentes
-    try:
-        font_title = ImageFont.truetype("fonts/classic.ttf", 40)
-        font_info = ImageFont.truetype("fonts/classic.ttf", 24)
-    except:
-        font_title = font_info = None
+    font_title = obtener_fuente("classic", 40)
+    font_info = obtener_fuente("classic", 24)
     
     # Iconos por tipo
     icons = {
@@ -160,16 +178,13 @@ async def generate_ticket_created_banner(user: discord.Member, ticket_type: str,
     text_x = 200
     draw.text((text_x, 60), f"{icon} TICKET #{ticket_num}", fill="#ff69b4", font=font_title)
     draw.text((text_x, 115), f"Tipo: {ticket_type}", fill="#ffffff", font=font_info)
-    draw.text((text_x, 150), f"Usuario: {user.display_name[:20]}", fill="#d1d1d1", font=font_info)
-    draw.text((text_x, 185), f"Creado: {datetime.now().strftime('%d/%m/%Y %H:%M')}", fill="#a0a0a0", font=font_info)
+    fuentes.dibujar(draw, (text_x, 150), f"Usuario: {display_name[:20]}", "classic", 24, fill="#d1d1d1")
+    draw.text((text_x, 185), f"Creado: {created}", fill="#a0a0a0", font=font_info)
     
     # Footer
     draw.text((text_x, H-60), "NODEX♥", fill="#ff69b4", font=font_info)
     
-    buffer = io.BytesIO()
-    base.save(buffer, format="PNG")
-    buffer.seek(0)
-    return buffer
+    return base
 
 # ──────────────────────────────
 # UTILIDADES
@@ -345,11 +360,11 @@ class TicketView(ui.View):
             "closed": False,
             "ticket_number": t_num
         }
-        main_bot.save_tickets(main_bot.tickets_data)
+        main_bot.save_tickets(main_bot.tickets_data, guild_id)
         
         # Generar banner del ticket
         banner = await generate_ticket_created_banner(interaction.user, ticket_type, t_num)
-        banner_file = discord.File(banner, filename="ticket_banner.png")
+        banner_file = discord.File(banner, filename=banner.nombre("ticket_banner.png"))
         
         # Embed de bienvenida
         embed = discord.Embed(color=discord.Color.from_rgb(255, 105, 180))
@@ -368,7 +383,7 @@ class TicketView(ui.View):
             f"Por favor, explica detalladamente tu {ticket_type.lower()} y un miembro del Staff te atenderá pronto.\n\n"
             f"⊱ ────── {'.⋅ Usa los botones de abajo para gestionar ⋅.'} ────── ⊰"
         )
-        embed.set_image(url="attachment://ticket_banner.png")
+        embed.set_image(url=f"attachment://{banner_file.filename}")
         embed.set_thumbnail(url=interaction.user.display_avatar.url)
         embed.set_footer(
             text=f"ID: {user_id} • {interaction.guild.name}", 
@@ -556,7 +571,7 @@ class TicketConfirmCloseView(ui.View):
                     tinfo["closed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M")
                     tinfo["closed_by"] = str(interaction.user.id)
                     break
-            main_bot.save_tickets(main_bot.tickets_data)
+            main_bot.save_tickets(main_bot.tickets_data, guild_id)
         
         # 3. Enviar a logs
         log_channel_id = self.bot.config.get("ticket_log_channel")
@@ -628,9 +643,9 @@ class Tickets(commands.Cog):
         """Crea el panel principal de tickets con banner personalizado"""
         channel = channel or ctx.channel
         
-        # Generar banner
-        banner = await generate_ticket_panel_banner(ctx.guild)
-        banner_file = discord.File(banner, filename="ticket_panel.png")
+        # Banner en calidad completa: sale de la caché de renders si ya se generó para este servidor
+        imagen = await render_service.render_io(await ticket_panel_spec(ctx.guild, COMPLETA))
+        banner_file = discord.File(imagen, filename=imagen.nombre("ticket_panel.png"))
         
         embed = discord.Embed(color=discord.Color.from_rgb(255, 105, 180))
         embed.title = "🛡️ CENTRO DE ASISTENCIA Y SOPORTE"
@@ -654,13 +669,13 @@ class Tickets(commands.Cog):
             "> ✦ Solo puedes tener 1 ticket abierto a la vez\n\n"
             "⊱ ─ {.⋅ Haz clic en un botón para comenzar ⋅.} ─ ⊰"
         )
-        embed.set_image(url="attachment://ticket_panel.png")
+        embed.set_image(url=f"attachment://{banner_file.filename}")
         embed.set_footer(
             text=f"{ctx.guild.name}  Sistema de Tickets", 
             icon_url=ctx.guild.icon.url if ctx.guild.icon else None
         )
         
-        await channel.send(embed=embed, file=banner_file, view=TicketView(self.bot))
+        await channel.send(embed=embed, view=TicketView(self.bot), file=banner_file)
         
         success_embed = discord.Embed(
             title="✧ Panel Creado",
@@ -676,7 +691,7 @@ class Tickets(commands.Cog):
         self.bot.config["ticket_log_channel"] = channel.id
         import bot as main_bot
         if hasattr(main_bot, 'save_config'):
-            main_bot.save_config(self.bot.config)
+            main_bot.save_config(self.bot.config, "ticket_log_channel")
         
         embed = discord.Embed(
             title="✧ Canal de Logs Configurado",
@@ -1,8 +1,13 @@
-import discord, json, os, asyncio, random, aiohttp, io
+import discord, json, os, asyncio, random, io
 from discord.ext import commands
 from discord import ui
 from datetime import datetime
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from utils.render_service import ImagenRender, RenderSpec, render_service
+from utils.image_effects import fast_blur, linear_gradient
+from utils.font_registry import obtener_fuente
+from utils.asset_registry import assets
+from utils.remote_assets import assets_remotos, imagen_rgba
 
 TIKTOKERS_FILE = 'data/tiktokers.json'
 BANNERS_PATH = 'banner'
@@ -20,8 +25,7 @@ def save_tiktokers(data):
         json.dump(data, f, indent=4, ensure_ascii=False)
 
 def get_font(size: int):
-    try: return ImageFont.truetype(f'{FONTS_PATH}/classic.ttf', size)
-    except: return ImageFont.load_default()
+    return obtener_fuente('classic', size)
 
 def pretty_number(n: int) -> str:
     if n < 1_000: return str(n)
@@ -43,23 +47,21 @@ def hex_color(name: str) -> int:
 def rgb_color(name: str) -> tuple:
     return COLORS.get(name, COLORS['PINK'])[1]
 
-async def fetch_avatar(url: str) -> Image.Image:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            data = await resp.read()
-            return Image.open(io.BytesIO(data)).convert('RGBA')
+async def fetch_avatar_bytes(url: str, size: int = None) -> bytes:
+    return await assets_remotos.obtener(url, size)
+
+async def fetch_avatar(url: str, size: int = 256) -> Image.Image:
+    return imagen_rgba(await fetch_avatar_bytes(url, size), (size, size))
+
+async def _avatar_or_none(url: str, size: int = None):
+    try: return await fetch_avatar_bytes(url, size)
+    except: return None
 
 def create_glass_panel(width: int, height: int, bg_rgb: tuple, blur: int = 20) -> Image.Image:
-    base = Image.new('RGBA', (width, height))
+    inicio = tuple(c * 0.3 for c in bg_rgb)
+    base = linear_gradient(width, height, inicio, (inicio[0] + 20, inicio[1] + 15, inicio[2] + 25))
     draw = ImageDraw.Draw(base)
     
-    for i in range(height):
-        ratio = i / height
-        r = int(bg_rgb[0] * 0.3 + 20 * ratio)
-        g = int(bg_rgb[1] * 0.3 + 15 * ratio)
-        b = int(bg_rgb[2] * 0.3 + 25 * ratio)
-        draw.line([(0, i), (width, i)], fill=(r, g, b, 255))
-    
     for _ in range(15):
         x, y = random.randint(0, width), random.randint(0, height)
         size = random.randint(2, 6)
@@ -80,7 +82,13 @@ def create_circular_avatar(avatar: Image.Image, size: int) -> Image.Image:
     output.paste(avatar, (0, 0), mask)
     return output
 
-async def generate_creator_banner(tiktok_user: str, avatar_url: str, color_name: str = 'PINK') -> io.BytesIO:
+async def generate_creator_banner(tiktok_user: str, avatar_url: str, color_name: str = 'PINK',
+                                  guild_id: int = None) -> ImagenRender:
+    spec = RenderSpec('módulos.tiktokers:render_creator_banner',
+                      (tiktok_user, await _avatar_or_none(avatar_url, 120), color_name), guild_id=guild_id)
+    return await render_service.render_io(spec)
+
+def render_creator_banner(tiktok_user: str, avatar_bytes: bytes, color_name: str = 'PINK') -> Image.Image:
     W, H = 800, 280
     bg_rgb = rgb_color(color_name)
     
@@ -95,13 +103,12 @@ async def generate_creator_banner(tiktok_user: str, avatar_url: str, color_name:
     draw.rounded_rectangle((15, 15, W - 15, H - 15), radius=35, outline=(*bg_rgb, 150), width=3)
     
     try:
-        avatar = await fetch_avatar(avatar_url)
-        avatar = create_circular_avatar(avatar, 120)
+        avatar = create_circular_avatar(imagen_rgba(avatar_bytes, (120, 120)), 120)
         
         glow = Image.new('RGBA', (140, 140), (0, 0, 0, 0))
         glow_draw = ImageDraw.Draw(glow)
         glow_draw.ellipse((0, 0, 140, 140), fill=(*bg_rgb, 100))
-        glow = glow.filter(ImageFilter.GaussianBlur(10))
+        glow = fast_blur(glow, 10)
         img.paste(glow, (50, 70), glow)
         
         img.paste(avatar, (60, 80), avatar)
@@ -127,13 +134,17 @@ async def generate_creator_banner(tiktok_user: str, avatar_url: str, color_name:
     draw.polygon([(W-80, H-60), (W-50, H-40), (W-80, H-20)], fill=(*bg_rgb, 150))
     draw.polygon([(W-100, H-50), (W-75, H-35), (W-100, H-20)], fill=(255, 255, 255, 80))
     
-    buffer = io.BytesIO()
-    img.save(buffer, 'PNG', quality=95)
-    buffer.seek(0)
-    return buffer
+    return img
 
 async def generate_tools_banner(user_name: str, tiktok_user: str, avatar_url: str, 
-                                 color_name: str, stats: dict) -> io.BytesIO:
+                                 color_name: str, stats: dict, guild_id: int = None) -> ImagenRender:
+    spec = RenderSpec('módulos.tiktokers:render_tools_banner',
+                      (user_name, tiktok_user, await _avatar_or_none(avatar_url, 100), color_name, dict(stats)),
+                      guild_id=guild_id)
+    return await render_service.render_io(spec)
+
+def render_tools_banner(user_name: str, tiktok_user: str, avatar_bytes: bytes, 
+                        color_name: str, stats: dict) -> Image.Image:
     W, H = 800, 320
     bg_rgb = rgb_color(color_name)
     
@@ -148,13 +159,12 @@ async def generate_tools_banner(user_name: str, tiktok_user: str, avatar_url: st
     draw.rounded_rectangle((10, 10, W - 10, H - 10), radius=30, outline=(*bg_rgb, 180), width=3)
     
     try:
-        avatar = await fetch_avatar(avatar_url)
-        avatar = create_circular_avatar(avatar, 100)
+        avatar = create_circular_avatar(imagen_rgba(avatar_bytes, (100, 100)), 100)
         
         glow = Image.new('RGBA', (120, 120), (0, 0, 0, 0))
         glow_draw = ImageDraw.Draw(glow)
         glow_draw.ellipse((0, 0, 120, 120), fill=(*bg_rgb, 80))
-        glow = glow.filter(ImageFilter.GaussianBlur(8))
+        glow = fast_blur(glow, 8)
         img.paste(glow, (35, 35), glow)
         
         img.paste(avatar, (45, 45), avatar)
@@ -211,10 +221,7 @@ async def generate_tools_banner(user_name: str, tiktok_user: str, avatar_url: st
         draw.text((bar_x, bar_y - 20), f'🎯 {pretty_number(current)} / {pretty_number(goal)}', 
                   font=font_label, fill=(255, 255, 255, 200))
     
-    buffer = io.BytesIO()
-    img.save(buffer, 'PNG', quality=95)
-    buffer.seek(0)
-    return buffer
+    return img
 
 class TiktokerRegisterView(ui.View):
     def __init__(self, cog):
@@ -322,8 +329,8 @@ class TiktokerApprovalView(ui.View):
         }
         save_tiktokers(self.cog.tiktokers_data)
         
-        banner = await generate_creator_banner(tiktok_user, str(member.display_avatar.url), color)
-        file = discord.File(banner, filename='welcome.png')
+        banner = await generate_creator_banner(tiktok_user, str(member.display_avatar.url), color, member.guild.id)
+        file = discord.File(banner, filename=banner.nombre('welcome.png'))
         
         embed = discord.Embed(color=hex_color(color))
         embed.set_author(name=f'Bienvenida {member.name}', icon_url=member.display_avatar.url)
@@ -336,7 +343,7 @@ class TiktokerApprovalView(ui.View):
 ➤ Panel de control: `-tools`
 
 *¡Muéstrale al mundo tu contenido!*"""
-        embed.set_image(url='attachment://welcome.png')
+        embed.set_image(url=f'attachment://{file.filename}')
         await channel.send(file=file, embed=embed)
 
     @ui.button(label='Aprobar', style=discord.ButtonStyle.success, emoji='✅')
@@ -539,8 +546,9 @@ class CreatorToolsPanel(ui.View):
     async def regen_banner(self, inter: discord.Interaction, _):
         await inter.response.defer(ephemeral=True)
         data = self.cog.tiktokers_data[self.uid]
-        banner = await generate_creator_banner(data['tiktok'], str(inter.user.display_avatar.url), data.get('color', 'PINK'))
-        file = discord.File(banner, filename='banner.png')
+        banner = await generate_creator_banner(data['tiktok'], str(inter.user.display_avatar.url), data.get('color', 'PINK'),
+                                               inter.guild_id)
+        file = discord.File(banner, filename=banner.nombre('banner.png'))
         await inter.followup.send('`✅` Banner regenerado:', file=file, ephemeral=True)
 
     @ui.button(label='Eliminar', style=discord.ButtonStyle.danger, emoji='🗑️', row=3)
@@ -575,7 +583,7 @@ class Tiktokers(commands.Cog):
 ➤ Banner único con tu estilo
 ➤ Herramientas de creador"""
         try:
-            file = discord.File(f'{BANNERS_PATH}/banner-t.png', filename='banner.png')
+            file = discord.File(io.BytesIO(assets.crudo('banner_tiktok')), filename='banner.png')
             embed.set_image(url='attachment://banner.png')
             await ctx.send(file=file, embed=embed, view=TiktokerRegisterView(self))
         except:
@@ -591,13 +599,13 @@ class Tiktokers(commands.Cog):
         async with ctx.typing():
             banner = await generate_tools_banner(
                 ctx.author.name, data['tiktok'], str(ctx.author.display_avatar.url),
-                data.get('color', 'PINK'), data
+                data.get('color', 'PINK'), data, ctx.guild.id
             )
-            file = discord.File(banner, filename='panel.png')
+            file = discord.File(banner, filename=banner.nombre('panel.png'))
             
             embed = discord.Embed(color=hex_color(data.get('color', 'PINK')))
             embed.set_author(name=f'Panel de {ctx.author.name}', icon_url=ctx.author.display_avatar.url)
-            embed.set_image(url='attachment://panel.png')
+            embed.set_image(url=f'attachment://{file.filename}')
             
             await ctx.send(file=file, embed=embed, view=CreatorToolsPanel(self, uid))
 
@@ -654,15 +662,15 @@ class Tiktokers(commands.Cog):
         async with ctx.typing():
             banner = await generate_tools_banner(
                 member.name, data['tiktok'], str(member.display_avatar.url),
-                data.get('color', 'PINK'), data
+                data.get('color', 'PINK'), data, member.guild.id
             )
-            file = discord.File(banner, filename='profile.png')
+            file = discord.File(banner, filename=banner.nombre('profile.png'))
             
             bio = data.get('bio', 'Sin biografía')
             embed = discord.Embed(color=hex_color(data.get('color', 'PINK')))
             embed.set_author(name=f'Perfil de {member.name}', icon_url=member.display_avatar.url)
             embed.description = f'*{bio}*'
-            embed.set_image(url='attachment://profile.png')
+            embed.set_image(url=f'attachment://{file.filename}')
             
             socials = data.get('socials', {})
             if any(socials.values()):
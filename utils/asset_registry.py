@@ -0,0 +1,126 @@
+"""
+🗂️ Asset Registry - Imágenes del repo decodificadas una sola vez
+Cada asset (fonts/roblox_icon.png, banner/banner-t.png...) se decodifica
+una vez por proceso y guarda variantes ya redimensionadas por (tamaño, modo).
+El render recibe referencias copy-on-write: leer/pegar desde ellas es
+gratis y cualquier escritura hace una copia privada sin tocar la caché.
+"""
+
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+from PIL import Image
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Nombre lógico -> ruta relativa a la raíz del repo
+ASSETS = {
+    "roblox_icon": "fonts/roblox_icon.png",
+    "banner_tiktok": "banner/banner-t.png",
+}
+
+# Variantes (nombre, tamaño, modo) que usan los builders: se preparan al arrancar cada worker
+PRECARGA = [
+    ("roblox_icon", (160, 160), "RGBA"),
+]
+
+Tamaño = Optional[Tuple[int, int]]
+
+
+class RegistroAssets:
+    """Assets decodificados de este proceso, con variantes por (tamaño, modo)"""
+
+    def __init__(self, base_dir: str = BASE_DIR):
+        self.base_dir = base_dir
+        self._originales: Dict[str, Image.Image] = {}
+        self._variantes: Dict[Tuple[str, Tamaño, str], Image.Image] = {}
+        self._crudos: Dict[str, bytes] = {}
+        # Cuántas veces se decodificó cada asset: en régimen estable debe ser 1
+        self.decodificaciones: Dict[str, int] = {}
+        self.stats = {"hits": 0, "variantes": 0, "copias": 0}
+
+    def ruta(self, nombre: str) -> str:
+        return os.path.join(self.base_dir, ASSETS.get(nombre, nombre))
+
+    def existe(self, nombre: str) -> bool:
+        return nombre in self._originales or os.path.exists(self.ruta(nombre))
+
+    def _original(self, nombre: str) -> Image.Image:
+        if nombre not in self._originales:
+            img = Image.open(self.ruta(nombre))
+            img.load()
+            self._originales[nombre] = img
+            self.decodificaciones[nombre] = self.decodificaciones.get(nombre, 0) + 1
+        return self._originales[nombre]
+
+    def _referencia(self, img: Image.Image) -> Image.Image:
+        """
+        Imagen nueva que comparte los píxeles de la cacheada. Con readonly,
+        Pillow copia antes de cualquier escritura (paste, ImageDraw...), así
+        que la variante compartida nunca se modifica.
+        """
+        ref = img._new(img.im)
+        ref.readonly = 1
+        return ref
+
+    def obtener(self, nombre: str, tamaño: Tamaño = None, modo: str = "RGBA") -> Image.Image:
+        """Referencia copy-on-write al asset en el tamaño y modo pedidos"""
+        clave = (nombre, tuple(tamaño) if tamaño else None, modo)
+        variante = self._variantes.get(clave)
+        if variante is None:
+            variante = self._original(nombre)
+            if variante.mode != modo:
+                variante = variante.convert(modo)
+            if tamaño and variante.size != tuple(tamaño):
+                variante = variante.resize(tuple(tamaño), Image.Resampling.LANCZOS)
+            self._variantes[clave] = variante
+            self.stats["variantes"] += 1
+        else:
+            self.stats["hits"] += 1
+        return self._referencia(variante)
+
+    def copia(self, nombre: str, tamaño: Tamaño = None, modo: str = "RGBA") -> Image.Image:
+        """Copia privada explícita (para quien vaya a dibujar encima de todos modos)"""
+        self.stats["copias"] += 1
+        return self.obtener(nombre, tamaño, modo).copy()
+
+    def crudo(self, nombre: str) -> bytes:
+        """Bytes del archivo tal cual (adjuntos que se envían sin re-renderizar)"""
+        if nombre not in self._crudos:
+            with open(self.ruta(nombre), "rb") as f:
+                self._crudos[nombre] = f.read()
+        return self._crudos[nombre]
+
+    def precargar(self, pares: Sequence[Tuple[str, Tamaño, str]] = PRECARGA) -> int:
+        for nombre, tamaño, modo in pares:
+            try:
+                self.obtener(nombre, tamaño, modo)
+            except Exception as e:
+                print(f"Error precargando asset {nombre}: {e}")
+        return len(self._variantes)
+
+    def estadisticas(self) -> dict:
+        # Las variantes sin cambios comparten objeto con el original: contar cada imagen una vez
+        imagenes = {id(img): img for img in (*self._originales.values(), *self._variantes.values())}
+        kb = sum(img.width * img.height * len(img.getbands()) for img in imagenes.values()) // 1024
+        return {
+            "assets": len(self._originales),
+            "variantes": len(self._variantes),
+            "kb": kb,
+            "decodificaciones": dict(self.decodificaciones),
+            "max_decodificaciones": max(self.decodificaciones.values(), default=0),
+            **self.stats,
+        }
+
+
+# Instancia por proceso (cada worker de render tiene la suya)
+assets = RegistroAssets()
+
+
+def precargar_assets() -> int:
+    return assets.precargar()
+
+
+def estadisticas_assets() -> dict:
+    return assets.estadisticas()
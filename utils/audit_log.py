@@ -0,0 +1,243 @@
+"""
+📜 Audit Log - Registro de acciones append-only en JSONL
+Rotación por tamaño/tiempo, gzip opcional de segmentos y lectura en streaming
+"""
+
+import os
+import io
+import json
+import gzip
+import time
+import asyncio
+from collections import deque
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+
+class AuditLog:
+    """Log de acciones línea a línea: escribir nunca relee lo anterior"""
+
+    def __init__(
+        self,
+        folder: str = "data/audit",
+        max_bytes: int = 5 * 1024 * 1024,
+        max_age: int = 7 * 24 * 3600,
+        comprimir: bool = True,
+        max_segmentos: int = 30
+    ):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.comprimir = comprimir
+        self.max_segmentos = max_segmentos
+        self.activo = os.path.join(folder, "actions.jsonl")
+        # Cuándo se abrió el segmento activo (el ts de la primera línea puede ser de un import)
+        self.marca_apertura = self.activo + ".abierto"
+        os.makedirs(folder, exist_ok=True)
+
+        self._f = None
+        self._abierto_en = 0.0
+        self._tamaño = 0
+        self._compresion: Optional[asyncio.Task] = None
+
+    # ──────────────────────────────────────────────────────────────────────
+    # ✏️ Escritura
+    # ──────────────────────────────────────────────────────────────────────
+
+    def _abrir(self):
+        if self._f is None:
+            self._f = open(self.activo, "a", encoding="utf-8")
+            self._tamaño = self._f.tell()
+            self._abierto_en = self._leer_apertura() if self._tamaño else None
+            if self._abierto_en is None:
+                # Segmento nuevo (o de antes de la marca): cuenta desde ahora
+                self._abierto_en = time.time()
+                self._guardar_apertura()
+        return self._f
+
+    def _leer_apertura(self) -> Optional[float]:
+        try:
+            with open(self.marca_apertura, "r", encoding="utf-8") as f:
+                return float(f.read().strip())
+        except Exception:
+            return None
+
+    def _guardar_apertura(self):
+        try:
+            with open(self.marca_apertura, "w", encoding="utf-8") as f:
+                f.write(repr(self._abierto_en))
+        except Exception:
+            pass
+
+    def registrar(self, action, user_id, guild_id, details=""):
+        """Añadir una acción al final del segmento activo"""
+        ahora = time.time()
+        entry = {
+            "ts": ahora,
+            "timestamp": datetime.fromtimestamp(ahora).strftime("%Y-%m-%d %H:%M:%S"),
+            "action": action,
+            "user_id": user_id,
+            "guild_id": guild_id,
+            "details": details
+        }
+        self._escribir(entry)
+        return entry
+
+    def _escribir(self, entry: dict):
+        f = self._abrir()
+        if self._tamaño >= self.max_bytes or (self._tamaño and time.time() - self._abierto_en >= self.max_age):
+            self.rotar()
+            f = self._abrir()
+        linea = json.dumps(entry, ensure_ascii=False) + "\n"
+        f.write(linea)
+        f.flush()
+        self._tamaño += len(linea.encode("utf-8"))
+
+    def rotar(self):
+        """Cerrar el segmento activo y renombrarlo (el gzip, si se pide, va en un hilo)"""
+        self.cerrar()
+        if not os.path.exists(self.activo) or os.path.getsize(self.activo) == 0:
+            return
+        try:
+            os.remove(self.marca_apertura)
+        except OSError:
+            pass
+        nombre = f"actions-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.jsonl"
+        os.replace(self.activo, os.path.join(self.folder, nombre))
+        if self.comprimir:
+            self._comprimir_pendientes()
+
+        for viejo in self._segmentos_rotados()[:-self.max_segmentos or None]:
+            try:
+                os.remove(viejo)
+            except Exception:
+                pass
+
+    def _comprimir_pendientes(self):
+        """Comprimir los segmentos rotados fuera del event loop (un segmento de 5 MB lo pararía)"""
+        if self._compresion is not None and not self._compresion.done():
+            return  # La siguiente rotación recoge lo que quede sin comprimir
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._comprimir_segmentos()
+            return
+        self._compresion = loop.create_task(asyncio.to_thread(self._comprimir_segmentos))
+
+    def _comprimir_segmentos(self):
+        for ruta in self._segmentos_rotados():
+            if not ruta.endswith(".jsonl"):
+                continue
+            temporal = ruta + ".gz.tmp"
+            try:
+                with open(ruta, "rb") as src, gzip.open(temporal, "wb") as dst:
+                    while True:
+                        bloque = src.read(64 * 1024)
+                        if not bloque:
+                            break
+                        dst.write(bloque)
+                os.replace(temporal, ruta + ".gz")
+                os.remove(ruta)
+            except Exception as e:
+                print(f"Error comprimiendo {ruta}: {e}")
+                try:
+                    os.remove(temporal)
+                except OSError:
+                    pass
+
+    def vaciar(self):
+        """Borrar todos los segmentos"""
+        self.cerrar()
+        restos = [os.path.join(self.folder, n) for n in os.listdir(self.folder) if n.startswith("actions-")]
+        for ruta in restos + [self.activo, self.marca_apertura]:
+            try:
+                os.remove(ruta)
+            except Exception:
+                pass
+
+    def importar(self, entradas: List[dict]):
+        """Volcar registros antiguos (logs.json) al log actual"""
+        for entry in entradas:
+            if not isinstance(entry, dict):
+                continue
+            entry = dict(entry)
+            if "ts" not in entry:
+                try:
+                    entry["ts"] = datetime.strptime(entry.get("timestamp", ""), "%Y-%m-%d %H:%M:%S").timestamp()
+                except Exception:
+                    entry["ts"] = time.time()
+            self._escribir(entry)
+
+    def cerrar(self):
+        if self._f is not None:
+            try:
+                self._f.close()
+            except Exception:
+                pass
+            self._f = None
+
+    # ──────────────────────────────────────────────────────────────────────
+    # 📖 Lectura en streaming
+    # ──────────────────────────────────────────────────────────────────────
+
+    def _segmentos_rotados(self) -> List[str]:
+        nombres = set(n for n in os.listdir(self.folder)
+                      if n.startswith("actions-") and n.endswith((".jsonl", ".jsonl.gz")))
+        # Un segmento ya comprimido cuyo original aún no se borró se lee una sola vez
+        nombres = sorted(n for n in nombres if n + ".gz" not in nombres)
+        return [os.path.join(self.folder, n) for n in nombres]
+
+    def _segmentos(self) -> List[str]:
+        """Segmentos del más antiguo al más reciente"""
+        segmentos = self._segmentos_rotados()
+        if os.path.exists(self.activo):
+            segmentos.append(self.activo)
+        return segmentos
+
+    @staticmethod
+    def _leer_segmento(ruta: str) -> Iterator[dict]:
+        abrir = gzip.open if ruta.endswith(".gz") else open
+        try:
+            with abrir(ruta, "rb") as raw:
+                for linea in io.TextIOWrapper(raw, encoding="utf-8"):
+                    try:
+                        yield json.loads(linea)
+                    except ValueError:
+                        continue  # Línea cortada por un apagado brusco
+        except FileNotFoundError:
+            return
+
+    @staticmethod
+    def _coincide(entry: dict, guild_id, user_id, action) -> bool:
+        if guild_id is not None and str(entry.get("guild_id")) != str(guild_id):
+            return False
+        if user_id is not None and str(entry.get("user_id")) != str(user_id):
+            return False
+        if action is not None and entry.get("action") != action:
+            return False
+        return True
+
+    def iterar(self, guild_id=None, user_id=None, action=None) -> Iterator[dict]:
+        """Recorrer todas las acciones en orden cronológico"""
+        if self._f is not None:
+            self._f.flush()
+        for ruta in self._segmentos():
+            for entry in self._leer_segmento(ruta):
+                if self._coincide(entry, guild_id, user_id, action):
+                    yield entry
+
+    def ultimas(self, n: int = 10, guild_id=None, user_id=None, action=None) -> List[dict]:
+        """Últimas N acciones que coinciden, leyendo de los segmentos más nuevos hacia atrás"""
+        if self._f is not None:
+            self._f.flush()
+        resultado: List[dict] = []
+        for ruta in reversed(self._segmentos()):
+            faltan = n - len(resultado)
+            if faltan <= 0:
+                break
+            ventana = deque(maxlen=faltan)
+            for entry in self._leer_segmento(ruta):
+                if self._coincide(entry, guild_id, user_id, action):
+                    ventana.append(entry)
+            resultado = list(ventana) + resultado
+        return resultado
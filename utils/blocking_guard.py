@@ -0,0 +1,75 @@
+"""
+🚧 Blocking Guard - Detectar HTTP bloqueante en el hilo del event loop
+Un requests.get() dentro de una corrutina congela todo el bot (heartbeats
+incluidos) mientras espera al host remoto. El guard envuelve las llamadas de
+socket que usan los clientes síncronos (requests, urllib, http.client) y,
+si se ejecutan en el hilo que está corriendo el event loop, lo registra con
+la pila de llamadas. aiohttp no pasa por aquí: resuelve DNS en un hilo y
+conecta con sockets no bloqueantes del loop.
+
+    instalar()                 -> solo avisar (bot.py)
+    instalar(estricto=True)    -> lanzar BloqueoEnLoop (tests / desarrollo)
+
+La variable de entorno DESFCITA_BLOQUEOS=error activa el modo estricto.
+"""
+
+import os
+import socket
+import asyncio
+import traceback
+from typing import Dict, Optional
+
+
+class BloqueoEnLoop(RuntimeError):
+    """Llamada de red bloqueante hecha desde el hilo del event loop"""
+
+
+_originales: Dict[str, object] = {}
+_estricto = False
+stats = {"detectados": 0}
+
+
+def _en_hilo_del_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _avisar(operacion: str, destino):
+    stats["detectados"] += 1
+    pila = "".join(traceback.format_stack(limit=8)[:-2])
+    mensaje = f"HTTP bloqueante en el event loop: {operacion}({destino!r})"
+    if _estricto:
+        raise BloqueoEnLoop(mensaje)
+    print(f"⚠️ {mensaje}\n{pila}")
+
+
+def _envolver(nombre: str):
+    original = getattr(socket, nombre)
+    _originales[nombre] = original
+
+    def envuelta(*args, **kwargs):
+        if _en_hilo_del_loop():
+            _avisar(nombre, args[0] if args else kwargs.get("address") or kwargs.get("host"))
+        return original(*args, **kwargs)
+
+    envuelta.__wrapped__ = original
+    setattr(socket, nombre, envuelta)
+
+
+def instalar(estricto: Optional[bool] = None):
+    """Envolver socket.create_connection y socket.getaddrinfo (idempotente)"""
+    global _estricto
+    _estricto = estricto if estricto is not None else os.getenv("DESFCITA_BLOQUEOS", "").lower() == "error"
+    if _originales:
+        return
+    for nombre in ("create_connection", "getaddrinfo"):
+        _envolver(nombre)
+
+
+def desinstalar():
+    for nombre, original in _originales.items():
+        setattr(socket, nombre, original)
+    _originales.clear()
@@ -4,26 +4,23 @@ Crea imágenes hermosas de países usando fonts personalizadas
 """
 
 from PIL import Image, ImageDraw, ImageFont
-import os
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
+
+from utils.font_registry import obtener_fuente
+from utils.render_cache import render_cacheable
 
 class CountryImageBuilder:
     """Constructor de imágenes de países con diseño premium"""
     
     def __init__(self):
-        self.fonts_dir = "fonts"
         self.emoji_font = self._load_font("google-emojis.ttf", 80)
         self.title_font = self._load_font("classic.ttf", 60, bold=True)
         self.text_font = self._load_font("classic.ttf", 35)
         self.small_font = self._load_font("classic.ttf", 25)
         
     def _load_font(self, filename: str, size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
-        """Cargar fuente con fallback"""
-        path = os.path.join(self.fonts_dir, filename)
-        try:
-            return ImageFont.truetype(path, size)
-        except:
-            return ImageFont.load_default()
+        """Fuente del registro compartido (cargada una vez por proceso)"""
+        return obtener_fuente(filename, size)
     
     def _color_to_rgb(self, color) -> Tuple[int, int, int]:
         """Convertir color (int hex o string) a RGB tuple"""
@@ -38,6 +35,7 @@ class CountryImageBuilder:
                 return (200, 100, 200)  # Fallback magenta
         return (200, 100, 200)
     
+    @render_cacheable()
     def create_country_panel(self, country: Dict) -> Image.Image:
         """Crear panel individual de país"""
         try:
@@ -98,14 +96,28 @@ class CountryImageBuilder:
             img = Image.new("RGB", (800, 400), (25, 25, 35))
             return img
     
+    @render_cacheable()
     def create_countries_grid(self, countries: Dict, cols: int = 2) -> Image.Image:
-        """Crear grid de países"""
+        """Crear grid de países (paneles y composición en el mismo proceso)"""
+        paneles = []
+        for country in (countries or {}).values():
+            try:
+                paneles.append(self.create_country_panel(country))
+            except:
+                continue
+        return self.compose_countries_grid(paneles, cols)
+    
+    @render_cacheable()
+    def compose_countries_grid(self, panels: List[Image.Image], cols: int = 2) -> Image.Image:
+        """
+        Componer el grid con los paneles ya renderizados
+        (render_service.render_hoja los renderiza en el mismo worker)
+        """
         try:
-            if not countries:
+            if not panels:
                 return Image.new("RGB", (800, 600), (25, 25, 35))
             
-            country_list = list(countries.items())
-            rows = (len(country_list) + cols - 1) // cols
+            rows = (len(panels) + cols - 1) // cols
             
             panel_w, panel_h = 800, 400
             gap = 30
@@ -129,7 +141,7 @@ class CountryImageBuilder:
                 pass
             
             # Pegar paneles
-            for idx, (key, country) in enumerate(country_list):
+            for idx, panel in enumerate(panels):
                 try:
                     row = idx // cols
                     col = idx % cols
@@ -137,7 +149,6 @@ class CountryImageBuilder:
                     x = 50 + col * (panel_w + gap)
                     y = 120 + row * (panel_h + gap)
                     
-                    panel = self.create_country_panel(country)
                     grid_img.paste(panel, (x, y))
                 except:
                     continue
@@ -211,6 +222,7 @@ class CountryImageBuilder:
             img = Image.new("RGB", (600, 400), (25, 25, 35))
             return img
     
+    @render_cacheable()
     def create_welcome_banner(self, guild_name: str, total_countries: int) -> Image.Image:
         """Crear banner de bienvenida"""
         try:
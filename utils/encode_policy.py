@@ -0,0 +1,191 @@
+"""
+📦 Encode Policy - Política única de codificación para todas las imágenes
+Formato (WebP con/sin pérdida, PNG paletizado, PNG con compress_level),
+presupuesto de bytes con bajada automática de calidad/tamaño,
+overrides por servidor y métricas de tiempo y tamaño.
+"""
+
+import io
+import time
+from dataclasses import dataclass, replace, fields
+from typing import Dict, Iterator, Optional, Tuple
+
+from PIL import Image
+
+
+FORMATOS = ("WEBP", "WEBP_LOSSLESS", "PNG", "PNG_PALETA")
+
+EXTENSIONES = {
+    "WEBP": "webp",
+    "WEBP_LOSSLESS": "webp",
+    "PNG": "png",
+    "PNG_PALETA": "png",
+    "GIF": "gif",
+    "JSON": "json",
+}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 📋 POLÍTICA
+# ══════════════════════════════════════════════════════════════════════════════
+
+@dataclass(frozen=True)
+class PoliticaEncode:
+    """Cómo codificar una imagen (picklable: viaja dentro del RenderSpec)"""
+    formato: str = "WEBP"
+    calidad: int = 85
+    calidad_minima: int = 50
+    compress_level: int = 6
+    colores: int = 256
+    max_bytes: Optional[int] = None
+
+    def con(self, **cambios) -> "PoliticaEncode":
+        validos = {f.name for f in fields(self)}
+        return replace(self, **{k: v for k, v in cambios.items() if k in validos})
+
+
+def _guardar(img: Image.Image, formato: str, politica: PoliticaEncode, calidad: int) -> bytes:
+    buffer = io.BytesIO()
+    if formato == "WEBP":
+        img.save(buffer, format="WEBP", quality=calidad, method=4)
+    elif formato == "WEBP_LOSSLESS":
+        img.save(buffer, format="WEBP", lossless=True, quality=calidad, method=4)
+    elif formato == "PNG_PALETA":
+        # MEDIANCUT no admite RGBA; FASTOCTREE conserva la transparencia
+        metodo = Image.Quantize.FASTOCTREE if img.mode == "RGBA" else Image.Quantize.MEDIANCUT
+        base = img if img.mode in ("RGB", "RGBA") else img.convert("RGBA")
+        base.quantize(colors=politica.colores, method=metodo).save(
+            buffer, format="PNG", optimize=True, compress_level=politica.compress_level
+        )
+    else:
+        img.save(buffer, format="PNG", compress_level=politica.compress_level)
+    return buffer.getvalue()
+
+
+def _escalera(politica: PoliticaEncode) -> Iterator[Tuple[str, int, float]]:
+    """Intentos (formato, calidad, escala) del preferido al más agresivo"""
+    yield politica.formato, politica.calidad, 1.0
+    if politica.formato == "PNG":
+        yield "PNG_PALETA", politica.calidad, 1.0
+    calidad = politica.calidad if politica.formato == "WEBP" else politica.calidad + 10
+    while calidad - 10 >= politica.calidad_minima:
+        calidad -= 10
+        yield "WEBP", calidad, 1.0
+    for escala in (0.85, 0.7, 0.5):
+        yield "WEBP", politica.calidad_minima, escala
+
+
+def codificar_imagen(img: Image.Image, politica: PoliticaEncode) -> Tuple[bytes, dict]:
+    """Codificar según la política bajando calidad/tamaño hasta entrar en max_bytes"""
+    inicio = time.perf_counter()
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+
+    mejor: Optional[Tuple[bytes, str]] = None
+    escalones = 0
+    for formato, calidad, escala in _escalera(politica):
+        im = img
+        if escala < 1.0:
+            im = img.resize((max(1, int(img.width * escala)), max(1, int(img.height * escala))),
+                            Image.Resampling.LANCZOS)
+        data = _guardar(im, formato, politica, calidad)
+        if mejor is None or len(data) < len(mejor[0]):
+            mejor = (data, formato)
+        if not politica.max_bytes or len(data) <= politica.max_bytes:
+            mejor = (data, formato)
+            break
+        escalones += 1
+
+    data, formato = mejor
+    return data, {
+        "formato": formato,
+        "bytes": len(data),
+        "ms": (time.perf_counter() - inicio) * 1000,
+        "escalones": escalones,
+        "excedido": bool(politica.max_bytes and len(data) > politica.max_bytes),
+    }
+
+
+def detectar_formato(data: bytes) -> str:
+    """Formato de unos bytes ya codificados (resultados que no pasan por la política)"""
+    if data[:4] == b"GIF8":
+        return "GIF"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "WEBP"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "PNG"
+    return "JSON"
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🏠 POLÍTICAS POR SERVIDOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+class PoliticasEncode:
+    """Política por defecto + overrides por guild (dicts planos, persistibles en config)"""
+
+    def __init__(self, defecto: Optional[PoliticaEncode] = None):
+        self.defecto = defecto or PoliticaEncode()
+        self.overrides: Dict[str, dict] = {}
+
+    def configurar(self, defecto: Optional[PoliticaEncode] = None, overrides: Optional[Dict[str, dict]] = None):
+        if defecto is not None:
+            self.defecto = defecto
+        if overrides is not None:
+            # Se guarda la referencia: así el dict de config y el registro no se desincronizan
+            self.overrides = overrides
+
+    def para(self, guild_id=None) -> PoliticaEncode:
+        if guild_id is None:
+            return self.defecto
+        return self.defecto.con(**self.overrides.get(str(guild_id), {}))
+
+    def fijar(self, guild_id, **cambios) -> PoliticaEncode:
+        if "formato" in cambios and cambios["formato"] not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {cambios['formato']}")
+        actual = self.overrides.setdefault(str(guild_id), {})
+        actual.update(cambios)
+        return self.para(guild_id)
+
+    def quitar(self, guild_id):
+        self.overrides.pop(str(guild_id), None)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 📊 MÉTRICAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class MetricasEncode:
+    """Tiempo de encode y bytes de salida por formato (se acumulan en el proceso del bot)"""
+
+    def __init__(self):
+        self.por_formato: Dict[str, Dict[str, float]] = {}
+        self.escalones = 0
+        self.excedidos = 0
+
+    def registrar(self, info: dict):
+        f = self.por_formato.setdefault(info["formato"], {"n": 0, "bytes": 0, "ms": 0.0})
+        f["n"] += 1
+        f["bytes"] += info.get("bytes", 0)
+        f["ms"] += info.get("ms", 0.0)
+        self.escalones += info.get("escalones", 0)
+        self.excedidos += 1 if info.get("excedido") else 0
+
+    def resumen(self) -> dict:
+        return {
+            "formatos": {
+                nombre: {
+                    "n": f["n"],
+                    "kb_medio": round(f["bytes"] / f["n"] / 1024, 1),
+                    "ms_medio": round(f["ms"] / f["n"], 2),
+                }
+                for nombre, f in self.por_formato.items() if f["n"]
+            },
+            "escalones": self.escalones,
+            "excedidos": self.excedidos,
+        }
+
+
+# Instancias compartidas: bot.py configura la política; el render service la aplica
+politicas = PoliticasEncode()
+metricas = MetricasEncode()
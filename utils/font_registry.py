@@ -0,0 +1,215 @@
+"""
+🔤 Font Registry - Caché única de fuentes por proceso
+Todas las fuentes se piden por (cara, tamaño): se cargan una sola vez,
+se precargan al arrancar cada worker de render y, si a la cara le falta
+un glifo (emojis en nombres de usuario...), se usa fonts/emojis.ttf.
+"""
+
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+FONTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fonts")
+
+# Caras del proyecto (nombre -> archivo en fonts/)
+CARAS = {
+    "classic": "classic.ttf",
+    "emoji": "emojis.ttf",
+    # Banderas de países: el archivo no viene en el repo y fonts/emojis.ttf no tiene sus glifos
+    "google-emojis": "google-emojis.ttf",
+}
+
+# Nombres antiguos que usaban los builders
+ALIAS = {
+    "emojis": "emoji",
+}
+
+# Caras que, si falta su archivo, usan la fuente por defecto de Pillow (como hacían sus builders)
+SIN_FALLBACK_SISTEMA = {"google-emojis"}
+
+# Si la cara no se puede abrir se prueban estas antes de la fuente por defecto
+FALLBACKS_SISTEMA = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
+    "arial.ttf",
+]
+
+# Pares (cara, tamaño) que usan los builders: se cargan al arrancar cada worker
+PRECARGA = [("classic", t) for t in (
+    14, 16, 18, 20, 22, 24, 25, 26, 28, 30, 32, 35, 36, 38, 40, 42, 45, 48, 50, 52, 60, 65, 70, 80, 120
+)] + [("emoji", t) for t in (30, 40, 60, 80)]
+
+CARA_EMOJI = "emoji"
+
+
+def _rss_kb() -> Optional[int]:
+    """Memoria residente actual del proceso (solo Linux; None si no se puede leer)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except Exception:
+        return None
+
+
+class RegistroFuentes:
+    """Fuentes cargadas en este proceso, indexadas por (cara, tamaño)"""
+
+    def __init__(self, directorio: str = FONTS_DIR):
+        self.directorio = directorio
+        self._fuentes: Dict[Tuple[str, int], ImageFont.ImageFont] = {}
+        self._rutas: Dict[str, Optional[str]] = {}
+        # Glifos comprobados por fuente: (cara, tamaño) -> {caracter: existe}
+        self._glifos: Dict[Tuple[str, int], Dict[str, bool]] = {}
+        self._notdef: Dict[Tuple[str, int], tuple] = {}
+        self._kb_carga = 0
+        self.stats = {"hits": 0, "misses": 0, "fallbacks": 0}
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # 📂 CARGA
+    # ══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def normalizar(cara: str) -> str:
+        """'./fonts/classic.ttf', 'classic.ttf' y 'classic' son la misma cara"""
+        nombre = os.path.splitext(os.path.basename(cara))[0] if cara else "classic"
+        nombre = ALIAS.get(nombre, nombre)
+        return nombre if nombre in CARAS else cara
+
+    def _ruta(self, cara: str) -> Optional[str]:
+        """Primer archivo que se puede abrir para la cara (None = fuente por defecto de Pillow)"""
+        if cara not in self._rutas:
+            candidatas = [os.path.join(self.directorio, CARAS[cara])] if cara in CARAS else [cara]
+            self._rutas[cara] = None
+            fallbacks = [] if cara in SIN_FALLBACK_SISTEMA else FALLBACKS_SISTEMA
+            for ruta in candidatas + fallbacks:
+                try:
+                    ImageFont.truetype(ruta, 10)
+                    self._rutas[cara] = ruta
+                    break
+                except Exception:
+                    continue
+            if self._rutas[cara] != candidatas[0]:
+                self.stats["fallbacks"] += 1
+                print(f"Fuente '{cara}' no disponible, usando {self._rutas[cara] or 'la fuente por defecto'}")
+        return self._rutas[cara]
+
+    def obtener(self, cara: str = "classic", tamaño: int = 20) -> ImageFont.ImageFont:
+        clave = (self.normalizar(cara), int(tamaño))
+        fuente = self._fuentes.get(clave)
+        if fuente is not None:
+            self.stats["hits"] += 1
+            return fuente
+
+        self.stats["misses"] += 1
+        antes = _rss_kb()
+        ruta = self._ruta(clave[0])
+        try:
+            if ruta:
+                fuente = ImageFont.truetype(ruta, clave[1])
+            elif clave[0] in SIN_FALLBACK_SISTEMA:
+                fuente = ImageFont.load_default()
+            else:
+                fuente = ImageFont.load_default(clave[1])
+        except Exception:
+            fuente = ImageFont.load_default()
+        despues = _rss_kb()
+        if antes is not None and despues is not None:
+            self._kb_carga += max(0, despues - antes)
+        self._fuentes[clave] = fuente
+        return fuente
+
+    def precargar(self, pares: Sequence[Tuple[str, int]] = PRECARGA) -> int:
+        for cara, tamaño in pares:
+            self.obtener(cara, tamaño)
+        return len(self._fuentes)
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # 😀 GLIFOS Y FALLBACK A EMOJIS
+    # ══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def _huella(fuente, caracter: str) -> tuple:
+        izq, arr, der, aba = fuente.getbbox(caracter)
+        img = Image.new("L", (max(1, der - izq), max(1, aba - arr)))
+        ImageDraw.Draw(img).text((-izq, -arr), caracter, font=fuente, fill=255)
+        return img.size, img.tobytes()
+
+    def tiene_glifo(self, cara: str, tamaño: int, caracter: str) -> bool:
+        """Un glifo falta si la fuente lo dibuja igual que el carácter .notdef"""
+        clave = (self.normalizar(cara), int(tamaño))
+        glifos = self._glifos.setdefault(clave, {})
+        if caracter not in glifos:
+            fuente = self.obtener(*clave)
+            if caracter.isspace() or not isinstance(fuente, ImageFont.FreeTypeFont):
+                glifos[caracter] = True
+            else:
+                if clave not in self._notdef:
+                    self._notdef[clave] = self._huella(fuente, "\U0010fffd")
+                glifos[caracter] = self._huella(fuente, caracter) != self._notdef[clave]
+        return glifos[caracter]
+
+    def tramos(self, texto: str, cara: str, tamaño: int) -> List[Tuple[str, ImageFont.ImageFont]]:
+        """Partir el texto en tramos consecutivos que usan la misma fuente"""
+        principal = self.obtener(cara, tamaño)
+        emoji = self.obtener(CARA_EMOJI, tamaño)
+        tramos: List[Tuple[str, ImageFont.ImageFont]] = []
+        for caracter in texto:
+            fuente = principal
+            if not self.tiene_glifo(cara, tamaño, caracter) and self.tiene_glifo(CARA_EMOJI, tamaño, caracter):
+                fuente = emoji
+            if tramos and tramos[-1][1] is fuente:
+                tramos[-1] = (tramos[-1][0] + caracter, fuente)
+            else:
+                tramos.append((caracter, fuente))
+        return tramos
+
+    def medir(self, texto: str, cara: str = "classic", tamaño: int = 20) -> float:
+        return sum(fuente.getlength(trozo) for trozo, fuente in self.tramos(texto, cara, tamaño))
+
+    def dibujar(self, draw: ImageDraw.ImageDraw, xy: Tuple[float, float], texto: str,
+                cara: str = "classic", tamaño: int = 20, **kwargs) -> float:
+        """draw.text con fallback a emojis por tramos; devuelve el ancho dibujado"""
+        x, y = xy
+        for trozo, fuente in self.tramos(texto, cara, tamaño):
+            draw.text((x, y), trozo, font=fuente, **kwargs)
+            x += fuente.getlength(trozo)
+        return x - xy[0]
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # 📊 ESTADÍSTICAS
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def estadisticas(self) -> dict:
+        rutas = {r for r in self._rutas.values() if r}
+        kb_archivos = 0
+        for ruta in rutas:
+            try:
+                kb_archivos += os.path.getsize(ruta) // 1024
+            except OSError:
+                pass
+        return {
+            "fuentes": len(self._fuentes),
+            "caras": sorted({cara for cara, _ in self._fuentes}),
+            "kb_archivos": kb_archivos,
+            "kb_memoria": self._kb_carga,
+            "glifos": sum(len(g) for g in self._glifos.values()),
+            **self.stats,
+        }
+
+
+# Instancia por proceso (cada worker de render tiene la suya)
+fuentes = RegistroFuentes()
+
+
+def obtener_fuente(cara: str = "classic", tamaño: int = 20) -> ImageFont.ImageFont:
+    return fuentes.obtener(cara, tamaño)
+
+
+def precargar_fuentes() -> int:
+    return fuentes.precargar()
+
+
+def estadisticas_fuentes() -> dict:
+    return fuentes.estadisticas()
@@ -2,48 +2,46 @@
 🎨 Glass Image Builder - Efectos glassmorphism tipo iPhone + Desfcita Branding
 """
 
-from PIL import Image, ImageDraw, ImageFilter, ImageFont
-import io
-import os
+from PIL import Image, ImageDraw
 from typing import Tuple
 
+from utils.font_registry import obtener_fuente
+from utils.image_effects import downscaled_blur, factor_verificado, fast_blur, linear_gradient
+from utils.render_cache import render_cacheable
+from utils.quality_tiers import COMPLETA, REDUCIDA, calidad_actual
+from utils.text_layout import maquetador
+
 class GlassImageBuilder:
     """Constructor de imágenes con efecto glass iPhone + Desfcita"""
     
     def __init__(self):
-        self.fonts_dir = "fonts"
         self.title_font = self._load_font("classic.ttf", 60, bold=True)
         self.name_font = self._load_font("classic.ttf", 40)
         self.small_font = self._load_font("classic.ttf", 22)
         self.brand_font = self._load_font("classic.ttf", 28)
     
     def _load_font(self, filename: str, size: int, bold: bool = False):
-        """Cargar fuente con fallback"""
-        path = os.path.join(self.fonts_dir, filename)
-        try:
-            return ImageFont.truetype(path, size)
-        except:
-            return ImageFont.load_default()
+        """Fuente del registro compartido (cargada una vez por proceso)"""
+        return obtener_fuente(filename, size)
     
     def _create_gradient_bg(self, width: int, height: int, color1: Tuple[int,int,int], color2: Tuple[int,int,int]) -> Image.Image:
         """Crear fondo con gradiente"""
-        img = Image.new('RGBA', (width, height))
-        draw = ImageDraw.Draw(img)
-        
-        for y in range(height):
-            r = int(color1[0] + (color2[0] - color1[0]) * y / height)
-            g = int(color1[1] + (color2[1] - color1[1]) * y / height)
-            b = int(color1[2] + (color2[2] - color1[2]) * y / height)
-            draw.line([(0, y), (width, y)], fill=(r, g, b, 255))
-        
-        return img
+        return linear_gradient(width, height, color1, color2)
+    
+    def _difuminar_luz(self, light: Image.Image, radius: int) -> Image.Image:
+        """Blur de las capas de luz: verificado en calidad completa y, bajo carga, ese factor x2 / x4"""
+        nivel = calidad_actual()
+        if nivel == COMPLETA:
+            return fast_blur(light, radius)
+        factor = max(2, factor_verificado(radius, light.mode)) * (2 if nivel == REDUCIDA else 4)
+        return downscaled_blur(light, radius, min(factor, max(1, int(radius))))
     
     def _create_glass_panel(self, width: int, height: int, x: int, y: int) -> Image.Image:
         """Crear panel con efecto glass"""
         panel = Image.new('RGBA', (width, height), (255, 255, 255, 25))
         
         # Blur para efecto glass
-        panel = panel.filter(ImageFilter.GaussianBlur(radius=8))
+        panel = fast_blur(panel, 8)
         
         # Borde sutil
         draw = ImageDraw.Draw(panel)
@@ -55,7 +53,7 @@ class GlassImageBuilder:
         
         return panel
     
-    def create_verification_panel(self, roblox_username: str, roblox_id: int, bot_icon: Image.Image = None) -> io.BytesIO:
+    def create_verification_panel(self, roblox_username: str, roblox_id: int, bot_icon: Image.Image = None) -> Image.Image:
         """Crear panel de verificación con efecto glass y banner Desfcita + icono del bot"""
         w, h = 1400, 900
         
@@ -77,7 +75,7 @@ class GlassImageBuilder:
             fill=(200, 100, 255, 25)
         )
         
-        light = light.filter(ImageFilter.GaussianBlur(radius=150))
+        light = self._difuminar_luz(light, 150)
         bg = Image.alpha_composite(bg, light)
         
         draw = ImageDraw.Draw(bg)
@@ -86,13 +84,9 @@ class GlassImageBuilder:
         # BANNER PREMIUM DESFCITA (Superior)
         # ═══════════════════════════════════════════
         banner_height = 120
-        banner = Image.new('RGBA', (w, banner_height), (0, 0, 0, 0))
-        banner_draw = ImageDraw.Draw(banner)
-        
         # Fondo premium del banner
-        for y in range(banner_height):
-            alpha = int(200 - (y / banner_height) * 100)
-            banner_draw.line([(0, y), (w, y)], fill=(50, 20, 90, alpha))
+        banner = linear_gradient(w, banner_height, (50, 20, 90, 200), (50, 20, 90, 100))
+        banner_draw = ImageDraw.Draw(banner)
         
         # Líneas decorativas brillantes
         banner_draw.line([(0, 0), (w, 0)], fill=(150, 200, 255, 255), width=3)
@@ -216,16 +210,9 @@ class GlassImageBuilder:
         # ═══════════════════════════════════════════
         # BANNER INFERIOR DECORATIVO
         # ═══════════════════════════════════════════
-        footer_banner = Image.new('RGBA', (w, 90), (0, 0, 0, 0))
-        footer_draw = ImageDraw.Draw(footer_banner)
-        
         # Gradiente del pie
-        for y in range(90):
-            alpha = int((y / 90) * 180)
-            footer_draw.line(
-                [(0, y), (w, y)],
-                fill=(30, 15, 60, alpha)
-            )
+        footer_banner = linear_gradient(w, 90, (30, 15, 60, 0), (30, 15, 60, 180))
+        footer_draw = ImageDraw.Draw(footer_banner)
         
         # Línea decorativa
         footer_draw.line([(40, 10), (w - 40, 10)], fill=(120, 200, 255, 150), width=2)
@@ -248,14 +235,10 @@ class GlassImageBuilder:
         
         bg.paste(footer_banner, (0, h - 90), footer_banner)
         
-        # Convertir a BytesIO
-        img_bytes = io.BytesIO()
-        bg.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
-        
-        return img_bytes
+        return bg
     
-    def create_roblox_panel(self, group_id: int, server_name: str = "Servidor") -> io.BytesIO:
+    @render_cacheable()
+    def create_roblox_panel(self, group_id: int, server_name: str = "Servidor") -> Image.Image:
         """Crear panel de verificación Roblox mejorado y personalizado"""
         try:
             w, h = 1400, 750
@@ -267,7 +250,7 @@ class GlassImageBuilder:
             light = Image.new('RGBA', (w, h), (0, 0, 0, 0))
             light_draw = ImageDraw.Draw(light)
             light_draw.ellipse([(w//2 - 500, -200), (w//2 + 500, 400)], fill=(150, 200, 255, 50))
-            light = light.filter(ImageFilter.GaussianBlur(radius=200))
+            light = self._difuminar_luz(light, 200)
             bg = Image.alpha_composite(bg, light)
             
             draw = ImageDraw.Draw(bg)
@@ -349,22 +332,17 @@ class GlassImageBuilder:
             
             bg.paste(footer, (0, h - footer_h), footer)
             
-            img_bytes = io.BytesIO()
-            bg.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            return img_bytes
+            return bg
             
         except Exception as e:
             print(f"❌ Error en create_roblox_panel: {e}")
             import traceback
             traceback.print_exc()
             blank = Image.new('RGBA', (1400, 750), (30, 15, 60, 255))
-            img_bytes = io.BytesIO()
-            blank.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            return img_bytes
+            return blank
     
-    def create_intro_panel(self, server_icon: Image.Image = None) -> io.BytesIO:
+    @render_cacheable()
+    def create_intro_panel(self, server_icon: Image.Image = None) -> Image.Image:
         """Crear panel introductorio para el botón de verificación"""
         try:
             w, h = 1400, 650
@@ -387,7 +365,7 @@ class GlassImageBuilder:
                 fill=(200, 100, 255, 30)
             )
             
-            light = light.filter(ImageFilter.GaussianBlur(radius=180))
+            light = self._difuminar_luz(light, 180)
             bg = Image.alpha_composite(bg, light)
             
             draw = ImageDraw.Draw(bg)
@@ -396,18 +374,9 @@ class GlassImageBuilder:
             # BANNER SUPERIOR DECORATIVO
             # ═════════════════════════════════════════
             banner_height = 100
-            banner = Image.new('RGBA', (w, banner_height), (30, 15, 60, 220))
-            banner_draw = ImageDraw.Draw(banner)
-            
-            # Línea superior
-            banner_draw.line([(0, 0), (w, 0)], fill=(120, 200, 255, 150), width=2)
-            # Línea inferior
-            banner_draw.line([(0, banner_height - 2), (w, banner_height - 2)], fill=(120, 200, 255, 220), width=3)
-            
             # Gradiente de fondo del banner
-            for x in range(w):
-                alpha = int(40 + (x / w) * 100)
-                banner_draw.line([(x, 0), (x, banner_height)], fill=(80, 40, 140, alpha))
+            banner = linear_gradient(w, banner_height, (80, 40, 140, 40), (80, 40, 140, 140), horizontal=True)
+            banner_draw = ImageDraw.Draw(banner)
             
             # Icono servidor (izquierda)
             if server_icon:
@@ -472,16 +441,9 @@ class GlassImageBuilder:
             # FOOTER
             # ═════════════════════════════════════════
             footer_h = 50
-            footer = Image.new('RGBA', (w, footer_h), (0, 0, 0, 0))
-            footer_draw = ImageDraw.Draw(footer)
-            
             # Gradiente footer
-            for y in range(footer_h):
-                alpha = int((y / footer_h) * 150)
-                footer_draw.line(
-                    [(0, y), (w, y)],
-                    fill=(30, 15, 60, alpha)
-                )
+            footer = linear_gradient(w, footer_h, (30, 15, 60, 0), (30, 15, 60, 150))
+            footer_draw = ImageDraw.Draw(footer)
             
             try:
                 footer_draw.text(
@@ -495,12 +457,7 @@ class GlassImageBuilder:
             
             bg.paste(footer, (0, h - footer_h), footer)
             
-            # Convertir a BytesIO
-            img_bytes = io.BytesIO()
-            bg.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            
-            return img_bytes
+            return bg
             
         except Exception as e:
             print(f"❌ Error crítico en create_intro_panel: {e}")
@@ -508,10 +465,7 @@ class GlassImageBuilder:
             traceback.print_exc()
             # Retornar imagen mínima
             blank = Image.new('RGBA', (1400, 650), (30, 15, 60, 255))
-            img_bytes = io.BytesIO()
-            blank.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            return img_bytes
+            return blank
     
     def _hex_to_rgb(self, hex_color):
         """Convertir hex a RGB"""
@@ -524,31 +478,8 @@ class GlassImageBuilder:
             return tuple(int(hex_str[i:i+2], 16) for i in (0, 2, 4))
         return (230, 230, 250)
     
-    def _wrap_text_dynamic(self, text: str, font, max_width: int, max_length: int = 80) -> list:
-        """Dividir texto inteligentemente respetando ancho máximo"""
-        words = text.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = (current_line + " " + word).strip() if current_line else word
-            
-            # Si la línea es muy larga, partir
-            if len(test_line) > max_length:
-                if current_line:
-                    lines.append(current_line)
-                    current_line = word
-                else:
-                    lines.append(word)
-            else:
-                current_line = test_line
-        
-        if current_line:
-            lines.append(current_line)
-        
-        return lines
-    
-    def create_suggestion_panel(self, config: dict) -> io.BytesIO:
+    @render_cacheable()
+    def create_suggestion_panel(self, config: dict) -> Image.Image:
         """Crear panel de sugerencias adaptable - VERSIÓN MEJORADA CON TAMAÑOS"""
         try:
             # Obtener tamaños de fuente personalizados
@@ -578,53 +509,58 @@ class GlassImageBuilder:
             mensaje_central = config.get("mensaje_central", "Tu opinión importa")[:150]
             pie_pagina = config.get("pie_pagina", "Sistema de sugerencias")[:100]
             
-            # Crear fondo degradado
-            bg = self._create_gradient_bg(w, 1200, (20, 15, 40), color_rgb)
+            x_padding = 70
+            max_width = w - (2 * x_padding)
+            pasos_font = self._load_font("classic.ttf", pasos_size)
+            
+            emoji_like = config.get("emoji_like", "👍")
+            emoji_dislike = config.get("emoji_dislike", "👎")
+            
+            steps = [
+                f"1️⃣ {emoji_like} Envía tu sugerencia",
+                f"2️⃣ 💬 La comunidad opina",
+                f"3️⃣ {emoji_dislike} Se implementa"
+            ]
+            
+            # ═══════════════════════════════════════════
+            # MAQUETACIÓN (antes de crear el fondo)
+            # ═══════════════════════════════════════════
+            bloque_titulo = maquetador.maquetar(f"💡 {titulo}", max_width, "classic", titulo_size, interlineado=4)
+            bloque_subtitulo = maquetador.maquetar(subtitulo, max_width, "classic", subtitulo_size, interlineado=4)
+            bloque_mensaje = maquetador.maquetar(mensaje_central, max_width, "classic", mensaje_size, interlineado=6)
+            bloque_pie = maquetador.maquetar(pie_pagina, max_width, "classic", footer_size, interlineado=2)
+            
+            alto_pasos = len(steps) * (pasos_size + 10)
+            alto_contenido = (
+                60 + bloque_titulo.alto + 18
+                + bloque_subtitulo.alto + 21 + 25
+                + bloque_mensaje.alto + 23 + 25
+                + alto_pasos + 15
+                + bloque_pie.alto + 30
+            )
+            h = min(alto_contenido + 40, 1500)  # Máximo 1500px
+            
+            # Crear fondo degradado con la altura final
+            bg = self._create_gradient_bg(w, h, (20, 15, 40), color_rgb)
             
             # Efecto de luz
-            light = Image.new('RGBA', (w, 1200), (0, 0, 0, 0))
+            light = Image.new('RGBA', (w, h), (0, 0, 0, 0))
             light_draw = ImageDraw.Draw(light)
             light_draw.ellipse([(w//2 - 400, -150), (w//2 + 400, 300)], fill=(150, 200, 255, 45))
-            light = light.filter(ImageFilter.GaussianBlur(radius=150))
+            light = self._difuminar_luz(light, 150)
             bg = Image.alpha_composite(bg, light)
             
-            draw = ImageDraw.Draw(bg)
-            
             # Panel glass principal
-            panel = self._create_glass_panel(w - 60, 1140, 30, 30)
+            panel = self._create_glass_panel(w - 60, h - 60, 30, 30)
             bg.paste(panel, (30, 30), panel)
             
-            # Cargar fuentes
-            title_font = self._load_font("classic.ttf", titulo_size)
-            subtitle_font = self._load_font("classic.ttf", subtitulo_size)
-            mensaje_font = self._load_font("classic.ttf", mensaje_size)
-            pasos_font = self._load_font("classic.ttf", pasos_size)
-            footer_font = self._load_font("classic.ttf", footer_size)
-            
-            y_offset = 60
-            x_padding = 70
-            max_width = w - (2 * x_padding)
-            
-            # ═══════════════════════════════════════════
-            # TÍTULO
-            # ═══════════════════════════════════════════
-            titulo_text = f"💡 {titulo}"
-            titulo_lines = self._wrap_text_dynamic(titulo_text, title_font, max_width, 50)
-            for line in titulo_lines:
-                draw.text((x_padding, y_offset), line, font=title_font, fill=(150, 220, 255, 255))
-                y_offset += titulo_size + 8
-            
-            y_offset += 10
+            draw = ImageDraw.Draw(bg)
             
             # ═══════════════════════════════════════════
-            # SUBTÍTULO
+            # TÍTULO Y SUBTÍTULO
             # ═══════════════════════════════════════════
-            subtitulo_lines = self._wrap_text_dynamic(subtitulo, subtitle_font, max_width, 70)
-            for line in subtitulo_lines:
-                draw.text((x_padding, y_offset), line, font=subtitle_font, fill=(200, 180, 255, 220))
-                y_offset += subtitulo_size + 6
-            
-            y_offset += 15
+            y_offset = maquetador.dibujar(draw, bloque_titulo, (x_padding, 60), fill=(150, 220, 255, 255)) + 18
+            y_offset = maquetador.dibujar(draw, bloque_subtitulo, (x_padding, y_offset), fill=(200, 180, 255, 220)) + 21
             
             # LÍNEA SEPARADORA
             draw.line([(x_padding, y_offset), (w - x_padding, y_offset)], fill=(150, 150, 200, 120), width=2)
@@ -633,15 +569,7 @@ class GlassImageBuilder:
             # ═══════════════════════════════════════════
             # MENSAJE CENTRAL
             # ═══════════════════════════════════════════
-            msg_lines = mensaje_central.split('\n')
-            for line in msg_lines:
-                wrapped = self._wrap_text_dynamic(line, mensaje_font, max_width, 40)
-                for wline in wrapped:
-                    # Centrar línea
-                    draw.text((x_padding, y_offset), wline, font=mensaje_font, fill=(255, 255, 255, 255))
-                    y_offset += mensaje_size + 8
-            
-            y_offset += 15
+            y_offset = maquetador.dibujar(draw, bloque_mensaje, (x_padding, y_offset), fill=(255, 255, 255, 255)) + 23
             
             # LÍNEA SEPARADORA
             draw.line([(x_padding, y_offset), (w - x_padding, y_offset)], fill=(150, 150, 200, 120), width=2)
@@ -650,15 +578,6 @@ class GlassImageBuilder:
             # ═══════════════════════════════════════════
             # PASOS DE PARTICIPACIÓN
             # ═══════════════════════════════════════════
-            emoji_like = config.get("emoji_like", "👍")
-            emoji_dislike = config.get("emoji_dislike", "👎")
-            
-            steps = [
-                f"1️⃣ {emoji_like} Envía tu sugerencia",
-                f"2️⃣ 💬 La comunidad opina",
-                f"3️⃣ {emoji_dislike} Se implementa"
-            ]
-            
             for step in steps:
                 draw.text((x_padding, y_offset), step, font=pasos_font, fill=(255, 255, 255, 240))
                 y_offset += pasos_size + 10
@@ -668,73 +587,9 @@ class GlassImageBuilder:
             # ═══════════════════════════════════════════
             # PIE DE PÁGINA
             # ═══════════════════════════════════════════
-            pie_lines = self._wrap_text_dynamic(pie_pagina, footer_font, max_width, 100)
-            for line in pie_lines:
-                draw.text((x_padding, y_offset), line, font=footer_font, fill=(180, 180, 220, 200))
-                y_offset += footer_size + 4
-            
-            y_offset += 30
-            
-            # REDIMENSIONAR IMAGEN AL CONTENIDO
-            h = min(y_offset + 40, 1500)  # Máximo 1500px
-            
-            # Crear imagen final con altura adaptada
-            final_bg = self._create_gradient_bg(w, h, (20, 15, 40), color_rgb)
-            
-            # Efecto de luz
-            light_final = Image.new('RGBA', (w, h), (0, 0, 0, 0))
-            light_draw_final = ImageDraw.Draw(light_final)
-            light_draw_final.ellipse([(w//2 - 400, -150), (w//2 + 400, 300)], fill=(150, 200, 255, 45))
-            light_final = light_final.filter(ImageFilter.GaussianBlur(radius=150))
-            final_bg = Image.alpha_composite(final_bg, light_final)
-            
-            # Panel glass
-            panel_final = self._create_glass_panel(w - 60, h - 60, 30, 30)
-            final_bg.paste(panel_final, (30, 30), panel_final)
-            
-            # Copiar contenido de bg a final_bg
-            draw_final = ImageDraw.Draw(final_bg)
-            
-            y_offset_final = 60
-            
-            # Redibujar TODO en la imagen final
-            for line in titulo_lines:
-                draw_final.text((x_padding, y_offset_final), line, font=title_font, fill=(150, 220, 255, 255))
-                y_offset_final += titulo_size + 8
-            y_offset_final += 10
+            maquetador.dibujar(draw, bloque_pie, (x_padding, y_offset), fill=(180, 180, 220, 200))
             
-            for line in subtitulo_lines:
-                draw_final.text((x_padding, y_offset_final), line, font=subtitle_font, fill=(200, 180, 255, 220))
-                y_offset_final += subtitulo_size + 6
-            y_offset_final += 15
-            
-            draw_final.line([(x_padding, y_offset_final), (w - x_padding, y_offset_final)], fill=(150, 150, 200, 120), width=2)
-            y_offset_final += 25
-            
-            for line in msg_lines:
-                wrapped = self._wrap_text_dynamic(line, mensaje_font, max_width, 40)
-                for wline in wrapped:
-                    draw_final.text((x_padding, y_offset_final), wline, font=mensaje_font, fill=(255, 255, 255, 255))
-                    y_offset_final += mensaje_size + 8
-            y_offset_final += 15
-            
-            draw_final.line([(x_padding, y_offset_final), (w - x_padding, y_offset_final)], fill=(150, 150, 200, 120), width=2)
-            y_offset_final += 25
-            
-            for step in steps:
-                draw_final.text((x_padding, y_offset_final), step, font=pasos_font, fill=(255, 255, 255, 240))
-                y_offset_final += pasos_size + 10
-            y_offset_final += 15
-            
-            for line in pie_lines:
-                draw_final.text((x_padding, y_offset_final), line, font=footer_font, fill=(180, 180, 220, 200))
-                y_offset_final += footer_size + 4
-            
-            img_bytes = io.BytesIO()
-            final_bg.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            
-            return img_bytes
+            return bg
         
         except Exception as e:
             import traceback
@@ -742,12 +597,9 @@ class GlassImageBuilder:
             traceback.print_exc()
             # Fallback
             blank = Image.new('RGBA', (1400, 600), (30, 15, 60, 255))
-            img_bytes = io.BytesIO()
-            blank.save(img_bytes, format='PNG')
-            img_bytes.seek(0)
-            return img_bytes
+            return blank
     
-    def create_suggestion_image(self, author: str, categoria: str, sugerencia: str, detalles: str) -> io.BytesIO:
+    def create_suggestion_image(self, author: str, categoria: str, sugerencia: str, detalles: str) -> Image.Image:
         """Crear imagen de sugerencia con efecto glass"""
         w, h = 1200, 600
         
@@ -758,7 +610,7 @@ class GlassImageBuilder:
         light = Image.new('RGBA', (w, h), (0, 0, 0, 0))
         light_draw = ImageDraw.Draw(light)
         light_draw.ellipse([(w//2 - 300, -100), (w//2 + 300, 250)], fill=(150, 200, 255, 40))
-        light = light.filter(ImageFilter.GaussianBlur(radius=150))
+        light = self._difuminar_luz(light, 150)
         bg = Image.alpha_composite(bg, light)
         
         draw = ImageDraw.Draw(bg)
@@ -779,49 +631,24 @@ class GlassImageBuilder:
             # Línea separadora
             draw.line([(70, 140), (w - 70, 140)], fill=(150, 150, 200, 100), width=2)
             
-            # Sugerencia principal
-            y = 160
-            for line in self._wrap_text(sugerencia, 80):
-                draw.text((70, y), line, font=self._load_font("classic.ttf", 16), fill=(255, 255, 255, 230))
-                y += 30
+            # Sugerencia principal (lo que no cabe en el panel se corta con elipsis)
+            bloque = maquetador.maquetar(sugerencia, w - 140, "classic", 16, interlineado=12, max_lineas=10)
+            y = maquetador.dibujar(draw, bloque, (70, 160), fill=(255, 255, 255, 230)) + 12
             
             # Detalles
             if detalles != "Sin detalles":
                 y += 10
                 draw.text((70, y), "📋 Detalles:", font=self._load_font("classic.ttf", 14), fill=(180, 180, 220, 200))
                 y += 25
-                for line in self._wrap_text(detalles, 80):
-                    draw.text((85, y), line, font=self._load_font("classic.ttf", 14), fill=(200, 200, 230, 180))
-                    y += 22
+                restantes = max(0, (h - 50 - y) // 22)
+                if restantes:
+                    bloque = maquetador.maquetar(detalles, w - 155, "classic", 14, interlineado=6, max_lineas=restantes)
+                    maquetador.dibujar(draw, bloque, (85, y), fill=(200, 200, 230, 180))
         
         except:
             pass
         
-        # Convertir a BytesIO
-        img_bytes = io.BytesIO()
-        bg.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
-        
-        return img_bytes
-    
-    def _wrap_text(self, text: str, max_length: int) -> list:
-        """Dividir texto en líneas"""
-        words = text.split()
-        lines = []
-        current = ""
-        
-        for word in words:
-            if len(current) + len(word) + 1 <= max_length:
-                current += word + " "
-            else:
-                if current:
-                    lines.append(current.strip())
-                current = word + " "
-        
-        if current:
-            lines.append(current.strip())
-        
-        return lines
+        return bg
     
     def create_profile_card(self, discord_name: str, discord_avatar: Image.Image, 
                            roblox_name: str, roblox_avatar: Image.Image) -> Image.Image:
@@ -838,7 +665,7 @@ class GlassImageBuilder:
             [(w//2 - 250, -50), (w//2 + 250, 250)],
             fill=(100, 180, 255, 40)
         )
-        light = light.filter(ImageFilter.GaussianBlur(radius=120))
+        light = self._difuminar_luz(light, 120)
         bg = Image.alpha_composite(bg, light)
         
         draw = ImageDraw.Draw(bg)
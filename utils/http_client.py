@@ -0,0 +1,233 @@
+"""
+🌐 HTTP Client - Sesiones aiohttp compartidas por todo el bot
+Abrir un ClientSession por cada GET paga TCP, TLS y DNS en cada descarga.
+Aquí vive una sesión por propósito (CDN de Discord, APIs de Roblox, URLs
+arbitrarias de usuarios), cada una con su pool de conexiones keep-alive,
+caché de DNS, tope de conexiones por host y timeouts por defecto.
+bot.py la cierra al apagar y muestra sus estadísticas en render-stats.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+
+DISCORD_CDN, ROBLOX, EXTERNO = "discord_cdn", "roblox", "externo"
+
+# Hosts de cada propósito (sufijos); lo que no encaja va a EXTERNO
+HOSTS = {
+    DISCORD_CDN: ("cdn.discordapp.com", "media.discordapp.net", "discordapp.net", "discord.com"),
+    ROBLOX: ("roblox.com", "rbxcdn.com"),
+}
+
+USER_AGENT = "Desfcita-Bot (aiohttp)"
+
+# Trozo en que se lee un cuerpo con tope de bytes
+TROZO_LECTURA = 64 * 1024
+
+
+@dataclass(frozen=True)
+class PerfilSesion:
+    limite: int                 # Conexiones abiertas en total
+    por_host: int               # Conexiones simultáneas a un mismo host
+    timeout_total: float        # Segundos por petición (conectar + leer)
+    timeout_conectar: float
+    keepalive: float = 30.0     # Segundos que una conexión libre sigue abierta
+    dns_ttl: int = 300          # Segundos de la caché de DNS
+
+
+PERFILES = {
+    DISCORD_CDN: PerfilSesion(limite=40, por_host=16, timeout_total=15, timeout_conectar=5),
+    ROBLOX: PerfilSesion(limite=30, por_host=8, timeout_total=10, timeout_conectar=5),
+    # URLs que pega la gente: pocas conexiones por host y sin esperar mucho
+    EXTERNO: PerfilSesion(limite=20, por_host=4, timeout_total=15, timeout_conectar=5, keepalive=15.0),
+}
+
+
+def proposito(url: str) -> str:
+    """Propósito de una URL según su host"""
+    try:
+        host = (urlparse(str(url)).hostname or "").lower()
+    except Exception:
+        return EXTERNO
+    for nombre, sufijos in HOSTS.items():
+        if any(host == s or host.endswith("." + s) for s in sufijos):
+            return nombre
+    return EXTERNO
+
+
+class ClienteHTTP:
+    """Una ClientSession con pool por propósito, creada la primera vez que se usa"""
+
+    def __init__(self, perfiles: Optional[Dict[str, PerfilSesion]] = None):
+        self.perfiles = dict(perfiles or PERFILES)
+        self._sesiones: Dict[str, aiohttp.ClientSession] = {}
+        self.stats: Dict[str, Dict[str, int]] = {
+            nombre: {"peticiones": 0, "errores": 0, "conexiones_nuevas": 0, "reutilizadas": 0, "sesiones": 0,
+                     "bytes_leidos": 0, "excedidas": 0}
+            for nombre in self.perfiles
+        }
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # 🔌 SESIONES
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def _trazas(self, nombre: str) -> aiohttp.TraceConfig:
+        """Contadores por propósito (también para quien usa la sesión directamente)"""
+        stats = self.stats[nombre]
+        traza = aiohttp.TraceConfig()
+
+        async def inicio(session, ctx, params):
+            stats["peticiones"] += 1
+
+        async def error(session, ctx, params):
+            stats["errores"] += 1
+
+        async def nueva(session, ctx, params):
+            stats["conexiones_nuevas"] += 1
+
+        async def reutilizada(session, ctx, params):
+            stats["reutilizadas"] += 1
+
+        traza.on_request_start.append(inicio)
+        traza.on_request_exception.append(error)
+        traza.on_connection_create_end.append(nueva)
+        traza.on_connection_reuseconn.append(reutilizada)
+        return traza
+
+    def sesion(self, nombre: str = EXTERNO) -> aiohttp.ClientSession:
+        """Sesión compartida del propósito (llamar desde el event loop)"""
+        sesion = self._sesiones.get(nombre)
+        if sesion is None or sesion.closed:
+            perfil = self.perfiles[nombre]
+            conector = aiohttp.TCPConnector(
+                limit=perfil.limite,
+                limit_per_host=perfil.por_host,
+                use_dns_cache=True,
+                ttl_dns_cache=perfil.dns_ttl,
+                keepalive_timeout=perfil.keepalive,
+            )
+            sesion = aiohttp.ClientSession(
+                connector=conector,
+                timeout=aiohttp.ClientTimeout(total=perfil.timeout_total, connect=perfil.timeout_conectar),
+                headers={"User-Agent": USER_AGENT},
+                trace_configs=[self._trazas(nombre)],
+            )
+            self._sesiones[nombre] = sesion
+            self.stats[nombre]["sesiones"] += 1
+        return sesion
+
+    def para(self, url: str, nombre: Optional[str] = None) -> aiohttp.ClientSession:
+        return self.sesion(nombre or proposito(url))
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # 📥 ATAJOS
+    # ══════════════════════════════════════════════════════════════════════════
+
+    async def _cuerpo(self, resp: aiohttp.ClientResponse, nombre: str, max_bytes: Optional[int]) -> Optional[bytes]:
+        """
+        Leer el cuerpo por trozos. Con max_bytes se rechaza antes de leer si
+        Content-Length ya lo supera y se corta en cuanto lo recibido lo pasa
+        (hay hosts que no mandan Content-Length o mienten).
+        """
+        stats = self.stats[nombre]
+        if max_bytes is not None and (resp.content_length or 0) > max_bytes:
+            stats["excedidas"] += 1
+            return None
+        trozos, total = [], 0
+        async for trozo in resp.content.iter_chunked(TROZO_LECTURA):
+            total += len(trozo)
+            stats["bytes_leidos"] += len(trozo)
+            if max_bytes is not None and total > max_bytes:
+                stats["excedidas"] += 1
+                return None
+            trozos.append(trozo)
+        return b"".join(trozos)
+
+    async def leer(self, url: str, nombre: Optional[str] = None, timeout: Optional[float] = None,
+                   max_bytes: Optional[int] = None) -> Optional[bytes]:
+        """Cuerpo de un GET con estado 200 (None si falla, no es 200 o pasa de max_bytes)"""
+        nombre = nombre or proposito(url)
+        kwargs = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+        try:
+            async with self.sesion(nombre).get(str(url), **kwargs) as resp:
+                if resp.status == 200:
+                    return await self._cuerpo(resp, nombre, max_bytes)
+        except Exception:
+            pass
+        return None
+
+    async def leer_condicional(self, url: str, etag: Optional[str] = None, modificado: Optional[str] = None,
+                               nombre: Optional[str] = None, timeout: Optional[float] = None,
+                               max_bytes: Optional[int] = None
+                               ) -> Tuple[Optional[int], Optional[bytes], Dict[str, str]]:
+        """
+        GET con If-None-Match / If-Modified-Since.
+        Devuelve (estado, cuerpo, cabeceras); cuerpo solo con 200 (None si pasa de
+        max_bytes) y estado None si no hubo respuesta.
+        """
+        nombre = nombre or proposito(url)
+        cabeceras = {}
+        if etag:
+            cabeceras["If-None-Match"] = etag
+        if modificado:
+            cabeceras["If-Modified-Since"] = modificado
+        kwargs = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+        try:
+            async with self.sesion(nombre).get(str(url), headers=cabeceras, **kwargs) as resp:
+                validadores = {k: resp.headers[k] for k in ("ETag", "Last-Modified") if k in resp.headers}
+                cuerpo = await self._cuerpo(resp, nombre, max_bytes) if resp.status == 200 else None
+                return resp.status, cuerpo, validadores
+        except Exception:
+            return None, None, {}
+
+    async def leer_json(self, url: str, nombre: Optional[str] = None, **kwargs) -> Optional[Any]:
+        """JSON de un GET con estado 200 (None si falla)"""
+        try:
+            async with self.para(url, nombre).get(str(url), **kwargs) as resp:
+                if resp.status == 200:
+                    return await resp.json(content_type=None)
+        except Exception:
+            pass
+        return None
+
+    async def estado(self, url: str, nombre: Optional[str] = None, timeout: float = 5) -> Optional[int]:
+        """Código de estado de un HEAD (None si no hubo respuesta)"""
+        try:
+            async with self.para(url, nombre).head(str(url), timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+                return resp.status
+        except Exception:
+            return None
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # 🧹 CIERRE Y ESTADÍSTICAS
+    # ══════════════════════════════════════════════════════════════════════════
+
+    async def cerrar(self):
+        sesiones, self._sesiones = self._sesiones, {}
+        for sesion in sesiones.values():
+            try:
+                await sesion.close()
+            except Exception:
+                pass
+
+    def estadisticas(self) -> Dict[str, dict]:
+        datos = {}
+        for nombre, stats in self.stats.items():
+            pool = {"en_uso": 0, "libres": 0}
+            sesion = self._sesiones.get(nombre)
+            if sesion is not None and not sesion.closed:
+                # Atributos internos del conector: solo informativos
+                try:
+                    pool["en_uso"] = len(sesion.connector._acquired)
+                    pool["libres"] = sum(len(c) for c in sesion.connector._conns.values())
+                except Exception:
+                    pass
+            datos[nombre] = {**stats, **pool, "abierta": sesion is not None and not sesion.closed}
+        return datos
+
+
+# Instancia compartida del proceso del bot (bot.py la cierra al apagar)
+cliente_http = ClienteHTTP()
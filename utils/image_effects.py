@@ -0,0 +1,284 @@
+"""
+✨ Image Effects - Primitivas vectorizadas compartidas por los builders
+Gradientes lineales/radiales, viñeta, ruido, destellos y tinte glass
+calculados sobre arrays en lugar de dibujar línea a línea con ImageDraw.
+"""
+
+import random
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter
+
+try:
+    import numpy as np
+except ImportError:  # Sin NumPy se usan equivalentes en C de Pillow
+    np = None
+
+
+Color = Sequence[float]
+
+
+def _rgba(color: Color) -> Tuple[float, float, float, float]:
+    """Normalizar (r, g, b) o (r, g, b, a) a cuatro canales"""
+    if len(color) == 3:
+        return (color[0], color[1], color[2], 255)
+    return tuple(color[:4])
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🌈 GRADIENTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def linear_gradient(width: int, height: int, color1: Color, color2: Color,
+                    horizontal: bool = False) -> Image.Image:
+    """
+    Gradiente lineal RGBA de color1 a color2 (de arriba abajo o de izquierda a derecha).
+    Acepta colores con alfa y componentes float; cada canal se trunca como
+    int(c1 + (c2 - c1) * t) con t = i / n, igual que los bucles originales.
+    """
+    c1, c2 = _rgba(color1), _rgba(color2)
+    n = width if horizontal else height
+
+    if np is not None:
+        t = np.arange(n, dtype=np.float32)[:, None] / n
+        fila = (np.asarray(c1, np.float32) + (np.asarray(c2, np.float32) - np.asarray(c1, np.float32)) * t)
+        fila = np.clip(fila, 0, 255).astype(np.uint8)
+        if horizontal:
+            arr = np.broadcast_to(fila[None, :, :], (height, width, 4))
+        else:
+            arr = np.broadcast_to(fila[:, None, :], (height, width, 4))
+        return Image.fromarray(np.ascontiguousarray(arr), 'RGBA')
+
+    # Fallback: una tira de 1px y se estira en C
+    tira = [
+        tuple(max(0, min(255, int(a + (b - a) * i / n))) for a, b in zip(c1, c2))
+        for i in range(n)
+    ]
+    strip = Image.new('RGBA', (n, 1) if horizontal else (1, n))
+    strip.putdata(tira)
+    return strip.resize((width, height), Image.Resampling.NEAREST)
+
+
+def _distancias(width: int, height: int, center: Optional[Tuple[float, float]], radius: Optional[float]):
+    """Mapa de distancia normalizada (0 en el centro, 1 en el radio) como array float32"""
+    cx, cy = center if center else (width / 2, height / 2)
+    radius = radius or (cx ** 2 + cy ** 2) ** 0.5
+    ys = (np.arange(height, dtype=np.float32) - cy)[:, None]
+    xs = (np.arange(width, dtype=np.float32) - cx)[None, :]
+    return np.minimum(np.sqrt(xs * xs + ys * ys) / radius, 1.0)
+
+
+def _distancias_reducidas(width: int, height: int, center, radius, paso: int = 8) -> Image.Image:
+    """Fallback sin NumPy: distancia en una rejilla reducida y reescalada con bilineal"""
+    cx, cy = center if center else (width / 2, height / 2)
+    radius = radius or (cx ** 2 + cy ** 2) ** 0.5
+    w, h = max(1, width // paso + 1), max(1, height // paso + 1)
+    mapa = Image.new('L', (w, h))
+    mapa.putdata([
+        int(255 * min(1.0, ((x * paso - cx) ** 2 + (y * paso - cy) ** 2) ** 0.5 / radius))
+        for y in range(h) for x in range(w)
+    ])
+    return mapa.resize((width, height), Image.Resampling.BILINEAR)
+
+
+def radial_gradient(width: int, height: int, inner: Color, outer: Color,
+                    center: Optional[Tuple[float, float]] = None,
+                    radius: Optional[float] = None) -> Image.Image:
+    """Gradiente radial RGBA: inner en el centro, outer a partir del radio (por defecto, la esquina)"""
+    c1, c2 = _rgba(inner), _rgba(outer)
+
+    if np is not None:
+        t = _distancias(width, height, center, radius)[:, :, None]
+        arr = np.asarray(c1, np.float32) + (np.asarray(c2, np.float32) - np.asarray(c1, np.float32)) * t
+        return Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8), 'RGBA')
+
+    mascara = _distancias_reducidas(width, height, center, radius)
+    base = Image.new('RGBA', (width, height), tuple(int(c) for c in c1))
+    exterior = Image.new('RGBA', (width, height), tuple(int(c) for c in c2))
+    return Image.composite(exterior, base, mascara)
+
+
+def vignette(width: int, height: int, max_alpha: int = 100, color: Tuple[int, int, int] = (0, 0, 0)) -> Image.Image:
+    """Capa RGBA que oscurece hacia los bordes (alfa = max_alpha * distancia al centro)"""
+    return radial_gradient(width, height, (*color, 0), (*color, max_alpha))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🌟 RUIDO Y DESTELLOS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def noise(width: int, height: int, max_alpha: int = 20, color: Tuple[int, int, int] = (255, 255, 255),
+          seed: Optional[int] = None) -> Image.Image:
+    """Grano uniforme: cada píxel recibe un alfa aleatorio en [0, max_alpha]"""
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        alfa = rng.integers(0, max_alpha + 1, size=(height, width), dtype=np.uint8)
+        capa = Image.new('RGBA', (width, height), (*color, 0))
+        capa.putalpha(Image.fromarray(alfa, 'L'))
+        return capa
+
+    # effect_noise genera ruido gaussiano en C; se reescala a [0, max_alpha]
+    alfa = Image.effect_noise((width, height), 64).point(lambda v: v * max_alpha // 255)
+    capa = Image.new('RGBA', (width, height), (*color, 0))
+    capa.putalpha(alfa)
+    return capa
+
+
+def sparkle_field(width: int, height: int, count: int, color: Tuple[int, int, int] = (255, 255, 255),
+                  alpha_range: Tuple[int, int] = (10, 50), size_range: Tuple[int, int] = (1, 3),
+                  seed: Optional[int] = None) -> Image.Image:
+    """
+    Capa RGBA con `count` destellos cuadrados de lado aleatorio en size_range.
+    Sustituye a los cientos de draw.ellipse de 1-3px (a ese tamaño son cuadrados).
+    """
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        xs = rng.integers(0, width, count)
+        ys = rng.integers(0, height, count)
+        lados = rng.integers(size_range[0], size_range[1] + 1, count)
+        alfas = rng.integers(alpha_range[0], alpha_range[1] + 1, count).astype(np.uint8)
+
+        alfa = np.zeros((height, width), dtype=np.uint8)
+        for dy in range(int(lados.max()) if count else 0):
+            for dx in range(int(lados.max())):
+                sel = lados > max(dx, dy)
+                np.maximum.at(
+                    alfa,
+                    (np.minimum(ys[sel] + dy, height - 1), np.minimum(xs[sel] + dx, width - 1)),
+                    alfas[sel]
+                )
+        capa = Image.new('RGBA', (width, height), (*color, 0))
+        capa.putalpha(Image.fromarray(alfa, 'L'))
+        return capa
+
+    rnd = random.Random(seed)
+    capa = Image.new('RGBA', (width, height), (*color, 0))
+    draw = ImageDraw.Draw(capa)
+    for _ in range(count):
+        x, y = rnd.randint(0, width - 1), rnd.randint(0, height - 1)
+        lado = rnd.randint(*size_range)
+        draw.rectangle([x, y, x + lado - 1, y + lado - 1], fill=(*color, rnd.randint(*alpha_range)))
+    return capa
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🧊 TINTE GLASS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def glass_tint(img: Image.Image, color: Tuple[int, int, int] = (255, 255, 255), alpha: int = 30,
+               blur: int = 0) -> Image.Image:
+    """Desenfoque opcional + velo de color semitransparente (alpha_composite de una capa sólida)"""
+    img = img.convert('RGBA')
+    if blur:
+        img = fast_blur(img, blur)
+    return Image.alpha_composite(img, Image.new('RGBA', img.size, (*color, alpha)))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🌫️ BLUR APROXIMADO
+# ══════════════════════════════════════════════════════════════════════════════
+
+# A partir de este radio el blur se hace a baja resolución
+BLUR_UMBRAL = 12
+# Sigma mínima (px) que debe quedar en la imagen reducida para que el reescalado no se note
+BLUR_SIGMA_REDUCIDA = 4
+BLUR_FACTOR_MAX = 8
+# Error máximo frente al blur exacto (niveles 0-255, en el percentil BLUR_PERCENTIL de
+# cada canal y con alpha premultiplicado: el color de un píxel casi transparente no se ve)
+BLUR_ERROR_MAX = 4
+BLUR_PERCENTIL = 0.99
+# Lado máximo de la imagen de prueba con la que se verifica cada (radio, modo)
+BLUR_LADO_PRUEBA = 512
+
+
+def blur_factor(radius: float) -> int:
+    """Factor de reducción según el radio: 1 (exacto) por debajo del umbral"""
+    if radius < BLUR_UMBRAL:
+        return 1
+    return max(1, min(BLUR_FACTOR_MAX, int(radius // BLUR_SIGMA_REDUCIDA)))
+
+
+def downscaled_blur(img: Image.Image, radius: float, factor: Optional[int] = None) -> Image.Image:
+    """
+    GaussianBlur aproximado: reducir `factor` veces, desenfocar con el radio
+    escalado y volver al tamaño original. Para luces y sombras de radio grande
+    la diferencia no se ve y el coste baja con el cuadrado del factor.
+    Sin factor se usa blur_factor(radius) (sin verificar; ver fast_blur).
+    """
+    factor = blur_factor(radius) if factor is None else factor
+    if factor <= 1:
+        return img.filter(ImageFilter.GaussianBlur(radius))
+    w, h = img.size
+    # reduce() promedia bloques de factor x factor (más barato que resize BOX) y
+    # redondea el tamaño hacia arriba; el radio usa la escala real
+    pequeña = img.reduce(factor)
+    pequeña = pequeña.filter(ImageFilter.GaussianBlur(radius * pequeña.width / w))
+    return pequeña.resize((w, h), Image.Resampling.BILINEAR)
+
+
+def blur_error(img: Image.Image, radius: float, factor: int, exacto: Optional[Image.Image] = None,
+               percentil: float = BLUR_PERCENTIL) -> int:
+    """
+    Diferencia (0-255) entre el blur aproximado y el exacto: el percentil
+    `percentil` del canal que peor sale. RGBA se compara premultiplicado.
+    """
+    if exacto is None:
+        exacto = img.filter(ImageFilter.GaussianBlur(radius))
+    aproximado = downscaled_blur(img, radius, factor)
+    if img.mode == 'RGBA':
+        exacto, aproximado = exacto.convert('RGBa'), aproximado.convert('RGBa')
+    histograma = ImageChops.difference(exacto, aproximado).histogram()
+    peor = 0
+    for c in range(len(histograma) // 256):
+        canal = histograma[c * 256:(c + 1) * 256]
+        limite, acumulado = percentil * sum(canal), 0
+        for nivel, cuenta in enumerate(canal):
+            acumulado += cuenta
+            if acumulado >= limite:
+                peor = max(peor, nivel)
+                break
+    return peor
+
+
+@lru_cache(maxsize=64)
+def _factor_verificado(radius: float, modo: str) -> int:
+    """
+    Mayor factor <= blur_factor(radius) cuyo error no pasa de BLUR_ERROR_MAX
+    en una imagen de prueba con bordes duros (el peor caso para el reescalado).
+    Se calcula una vez por (radio, modo) y proceso; el blur exacto, una sola vez.
+    """
+    factor = blur_factor(radius)
+    if factor <= 1:
+        return 1
+    lado = int(min(BLUR_LADO_PRUEBA, max(64, radius * 4)))
+    prueba = Image.new(modo, (lado, lado), 0)
+    draw = ImageDraw.Draw(prueba)
+    tinta = (255,) * len(modo) if len(modo) > 1 else 255
+    draw.ellipse([lado // 4, lado // 4, lado * 3 // 4, lado * 3 // 4], fill=tinta)
+    draw.rectangle([0, 0, lado // 8, lado], fill=tinta)
+    exacto = prueba.filter(ImageFilter.GaussianBlur(radius))
+    while factor > 1 and blur_error(prueba, radius, factor, exacto) > BLUR_ERROR_MAX:
+        factor -= 1
+    return factor
+
+
+def factor_verificado(radius: float, modo: str = 'RGBA') -> int:
+    """Factor que usaría fast_blur (1 si el modo no se puede verificar)"""
+    if radius < BLUR_UMBRAL:
+        return 1
+    try:
+        return _factor_verificado(float(radius), modo)
+    except Exception:
+        # Modos raros (P, I;16...): sin verificación, blur exacto
+        return 1
+
+
+def fast_blur(img: Image.Image, radius: float) -> Image.Image:
+    """
+    GaussianBlur para cualquier radio: exacto por debajo de BLUR_UMBRAL y, por
+    encima, a baja resolución con el mayor factor que respeta BLUR_ERROR_MAX.
+    """
+    if radius < BLUR_UMBRAL:
+        return img.filter(ImageFilter.GaussianBlur(radius))
+    return downscaled_blur(img, radius, factor_verificado(radius, img.mode))
@@ -0,0 +1,179 @@
+"""
+🎚️ Quality Tiers - Niveles de calidad del render según la carga
+Con la cola de render llena, las pasadas decorativas (partículas, burbujas,
+destellos, 3D, blurs de radio grande) se llevan casi todo el tiempo y en una
+miniatura del chat no se notan. Cada RenderSpec lleva un nivel:
+
+    completa  -> todo como siempre
+    reducida  -> menos partículas y blurs aproximados
+    minima    -> sin decorado
+
+El render service elige el nivel según la profundidad de la cola y la
+latencia reciente (con histéresis) salvo que el servidor tenga uno fijado.
+Los builders consultan el nivel activo con calidad_actual() / escalar().
+"""
+
+import time
+import contextvars
+from typing import Dict, Optional
+
+
+COMPLETA, REDUCIDA, MINIMA = "completa", "reducida", "minima"
+NIVELES = (COMPLETA, REDUCIDA, MINIMA)
+
+ALIAS = {
+    "full": COMPLETA,
+    "reduced": REDUCIDA,
+    "minimal": MINIMA,
+    "mínima": MINIMA,
+}
+
+# Fracción de los efectos decorativos que se dibuja en cada nivel
+FACTOR = {COMPLETA: 1.0, REDUCIDA: 0.4, MINIMA: 0.0}
+
+# Umbrales para bajar de nivel: renders en curso por worker y latencia media (ms)
+UMBRALES = {
+    REDUCIDA: {"cola": 2.0, "ms": 1500},
+    MINIMA: {"cola": 4.0, "ms": 4000},
+}
+# Para volver a subir la carga debe quedar por debajo de umbral * HISTERESIS...
+HISTERESIS = 0.5
+# ...durante al menos estos segundos (se sube de un nivel en un nivel)
+ESPERA_SUBIR = 15.0
+# Sin renders terminados en este tiempo la latencia media deja de contar
+OLVIDAR_LATENCIA = 60.0
+
+
+def normalizar(nivel: str) -> str:
+    nivel = ALIAS.get(str(nivel).lower(), str(nivel).lower())
+    if nivel not in NIVELES:
+        raise ValueError(f"Nivel de calidad desconocido: {nivel}")
+    return nivel
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🖌️ LADO DEL BUILDER (worker o hilo de fallback)
+# ══════════════════════════════════════════════════════════════════════════════
+
+# ContextVar: en el fallback por hilos cada render ve su propio nivel
+_actual: contextvars.ContextVar = contextvars.ContextVar("calidad_render", default=COMPLETA)
+
+
+def activar(nivel: Optional[str]) -> contextvars.Token:
+    return _actual.set(nivel or COMPLETA)
+
+
+def restaurar(token: contextvars.Token):
+    _actual.reset(token)
+
+
+def calidad_actual() -> str:
+    return _actual.get()
+
+
+def escalar(cantidad: int) -> int:
+    """Cuántos elementos decorativos dibujar en el nivel activo (igual en completa)"""
+    factor = FACTOR[calidad_actual()]
+    return cantidad if factor >= 1.0 else int(cantidad * factor)
+
+
+def decorativos() -> bool:
+    """False en calidad mínima: saltarse las pasadas puramente decorativas"""
+    return calidad_actual() != MINIMA
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🚦 SELECTOR (proceso del bot)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class SelectorCalidad:
+    """Nivel automático por carga + niveles fijados por servidor"""
+
+    def __init__(self, workers: int = 2, alfa: float = 0.3):
+        self.workers = max(1, workers)
+        self.alfa = alfa
+        self.nivel = COMPLETA
+        self.fijados: Dict[str, str] = {}
+        self.en_cola = 0
+        self.latencia_ms = 0.0
+        self._ultima_muestra = 0.0
+        self._calma_desde: Optional[float] = None
+        self.stats = {
+            "bajadas": 0, "subidas": 0, "degradados": 0,
+            "por_nivel": {n: 0 for n in NIVELES},
+        }
+
+    def configurar(self, fijados: Optional[Dict[str, str]] = None, workers: Optional[int] = None):
+        if fijados is not None:
+            # Referencia al dict de config, igual que los overrides de encode
+            self.fijados = fijados
+        if workers is not None:
+            self.workers = max(1, workers)
+
+    def _exigido(self, escala: float = 1.0) -> str:
+        """Nivel que pide la carga actual con los umbrales multiplicados por escala"""
+        por_worker = self.en_cola / self.workers
+        for nivel in (MINIMA, REDUCIDA):
+            u = UMBRALES[nivel]
+            if por_worker >= u["cola"] * escala or self.latencia_ms >= u["ms"] * escala:
+                return nivel
+        return COMPLETA
+
+    def observar(self, en_cola: int, latencia_ms: Optional[float] = None):
+        """Actualizar con la profundidad de la cola y, al terminar un render, su latencia"""
+        self.en_cola = en_cola
+        if latencia_ms is not None:
+            self.latencia_ms += self.alfa * (latencia_ms - self.latencia_ms)
+            self._ultima_muestra = time.monotonic()
+        elif time.monotonic() - self._ultima_muestra > OLVIDAR_LATENCIA:
+            self.latencia_ms = 0.0
+
+        actual = NIVELES.index(self.nivel)
+        exigido = self._exigido()
+        if NIVELES.index(exigido) > actual:
+            # Bajar es inmediato
+            self.nivel = exigido
+            self.stats["bajadas"] += 1
+            self._calma_desde = None
+        elif actual > 0 and NIVELES.index(self._exigido(HISTERESIS)) < actual:
+            # Subir solo tras un rato de calma, y de un nivel en un nivel
+            ahora = time.monotonic()
+            if self._calma_desde is None:
+                self._calma_desde = ahora
+            elif ahora - self._calma_desde >= ESPERA_SUBIR:
+                self.nivel = NIVELES[actual - 1]
+                self.stats["subidas"] += 1
+                self._calma_desde = ahora
+        else:
+            self._calma_desde = None
+
+    def para(self, guild_id=None) -> str:
+        nivel = self.fijados.get(str(guild_id), self.nivel) if guild_id is not None else self.nivel
+        self.stats["por_nivel"][nivel] += 1
+        if nivel != COMPLETA:
+            self.stats["degradados"] += 1
+        return nivel
+
+    def fijar(self, guild_id, nivel: str) -> str:
+        nivel = normalizar(nivel)
+        self.fijados[str(guild_id)] = nivel
+        return nivel
+
+    def quitar(self, guild_id):
+        self.fijados.pop(str(guild_id), None)
+
+    def estadisticas(self) -> dict:
+        return {
+            "nivel": self.nivel,
+            "en_cola": self.en_cola,
+            "latencia_ms": round(self.latencia_ms, 1),
+            "fijados": len(self.fijados),
+            "bajadas": self.stats["bajadas"],
+            "subidas": self.stats["subidas"],
+            "degradados": self.stats["degradados"],
+            "por_nivel": dict(self.stats["por_nivel"]),
+        }
+
+
+# Instancia compartida del proceso del bot
+calidades = SelectorCalidad()
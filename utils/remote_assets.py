@@ -0,0 +1,340 @@
+"""
+🖼️ Remote Assets - Caché de avatares, iconos de servidor y fondos remotos
+Cada render descargaba el avatar o el icono a tamaño completo y lo volvía a
+decodificar. Aquí hay dos mitades:
+
+  · Proceso del bot (assets_remotos): pide al CDN de Discord la variante
+    ?size= más pequeña que alcanza para el tamaño dibujado y guarda los bytes
+    en memoria (LRU por bytes) y en disco (data/remote_assets). Los assets
+    de Discord llevan el hash en la ruta y nunca cambian; las URLs externas
+    se revalidan con ETag / Last-Modified pasado REVALIDAR_CADA.
+  · Workers de render (imagen_rgba): decodifican esos bytes una vez por
+    (contenido, tamaño) y guardan la variante RGBA ya redimensionada en una
+    LRU con presupuesto de bytes. Devuelven referencias copy-on-write, como
+    el registro de assets del repo.
+
+Las URLs que pega la gente pueden apuntar a cualquier cosa: la descarga se
+corta en MAX_BYTES_REMOTO (Content-Length y bytes recibidos) y decodificar()
+rechaza imágenes de más de MAX_PIXELES antes de tocar los píxeles. Los JPEG
+se decodifican ya reducidos con Image.draft y el resto se reduce con
+Image.reduce antes del LANCZOS final.
+"""
+
+import io
+import os
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from PIL import Image, ImageOps
+
+from utils.http_client import DISCORD_CDN, cliente_http, proposito
+from utils.render_cache import CacheRender
+from utils.single_flight import descargas
+
+
+# Tamaños que acepta el CDN de Discord en ?size=
+TAMAÑOS_CDN = tuple(2 ** n for n in range(4, 13))  # 16 ... 4096
+
+# Primer segmento de las rutas del CDN que admiten ?size= (los adjuntos no)
+RUTAS_CON_TAMAÑO = ("avatars", "icons", "banners", "splashes", "guilds", "embed", "role-icons",
+                    "app-icons", "emojis")
+
+# Segundos que una URL externa se sirve sin preguntar al host
+REVALIDAR_CADA = 30 * 60
+
+# Tope de lo que se descarga por imagen (un fondo de 40 MB no llega al worker)
+MAX_BYTES_REMOTO = 8 * 1024 * 1024
+
+# Tope de píxeles de una imagen remota (Image.MAX_IMAGE_PIXELS solo avisa hasta el doble)
+MAX_PIXELES = 40_000_000
+
+Tamaño = Optional[Tuple[int, int]]
+
+
+def tamaño_cdn(px: int) -> int:
+    """Menor tamaño del CDN que cubre px (el máximo si no hay ninguno)"""
+    return next((t for t in TAMAÑOS_CDN if t >= px), TAMAÑOS_CDN[-1])
+
+
+def url_cdn(url: str, px: Optional[int] = None) -> str:
+    """URL con la variante ?size= justa para dibujar a px (las que no son del CDN, tal cual)"""
+    if not px or proposito(url) != DISCORD_CDN:
+        return url
+    partes = urlparse(url)
+    if partes.path.strip("/").split("/")[0] not in RUTAS_CON_TAMAÑO:
+        return url
+    query = dict(parse_qsl(partes.query))
+    query["size"] = str(tamaño_cdn(int(px)))
+    return urlunparse(partes._replace(query=urlencode(query)))
+
+
+def clave_asset(url: str) -> Tuple[str, bool]:
+    """
+    (clave, inmutable). En el CDN de Discord la ruta lleva el hash del asset
+    (o el id del adjunto): la clave es la ruta más el tamaño y se ignoran las
+    firmas (ex, is, hm) que caducan. El resto se identifica por la URL.
+    """
+    if proposito(url) == DISCORD_CDN:
+        partes = urlparse(url)
+        tamaño = dict(parse_qsl(partes.query)).get("size", "")
+        return f"discord:{partes.path}:{tamaño}", True
+    return url, False
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 📥 BYTES (PROCESO DEL BOT)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class CacheAssetsRemotos:
+    """Bytes de imágenes remotas en memoria + disco, con revalidación HTTP"""
+
+    def __init__(self, max_memoria_mb: int = 32, max_disco_mb: int = 256,
+                 carpeta: str = os.path.join("data", "remote_assets"),
+                 revalidar_cada: float = REVALIDAR_CADA):
+        # Mismo almacén en dos niveles que la caché de renders; el "formato" guarda los metadatos
+        self.almacen = CacheRender(max_memoria_mb, max_disco_mb, carpeta)
+        self.revalidar_cada = revalidar_cada
+        self.stats = {"hits": 0, "descargas": 0, "revalidadas": 0, "no_modificadas": 0,
+                      "obsoletas": 0, "fallos": 0, "kb_descargados": 0}
+        self.max_bytes = MAX_BYTES_REMOTO
+
+    # ── Almacén ──
+
+    async def _cargar(self, clave: str) -> Optional[Tuple[bytes, dict]]:
+        entrada = self.almacen.obtener_memoria(clave)
+        if entrada is not None:
+            data, cabecera = entrada
+            return data, json.loads(cabecera)
+        blob = await asyncio.to_thread(self.almacen.leer_disco, clave)
+        if blob is None:
+            return None
+        cabecera, _, data = blob.partition(b"\n")
+        try:
+            meta = json.loads(cabecera)
+        except ValueError:
+            return None
+        self.almacen.guardar_memoria(clave, data, cabecera.decode("utf-8"))
+        return data, meta
+
+    async def _guardar(self, clave: str, data: bytes, meta: dict):
+        # json.dumps escapa los saltos de línea: la primera línea del blob es siempre la cabecera
+        cabecera = json.dumps(meta, separators=(",", ":"))
+        self.almacen.guardar_memoria(clave, data, cabecera)
+        await asyncio.to_thread(self.almacen.escribir_disco, clave, cabecera.encode("utf-8") + b"\n" + data)
+
+    @staticmethod
+    def _meta(url: str, validadores: Dict[str, str], anterior: Optional[dict] = None) -> dict:
+        meta = dict(anterior or {}, url=url, validado=time.time())
+        if "ETag" in validadores:
+            meta["etag"] = validadores["ETag"]
+        if "Last-Modified" in validadores:
+            meta["modificado"] = validadores["Last-Modified"]
+        return meta
+
+    # ── Descarga ──
+
+    async def _resolver(self, url: str, clave: str, inmutable: bool, timeout: Optional[float],
+                        max_bytes: int) -> Optional[bytes]:
+        guardado = await self._cargar(clave)
+        if guardado is not None:
+            data, meta = guardado
+            if inmutable or time.time() - meta.get("validado", 0) < self.revalidar_cada:
+                self.stats["hits"] += 1
+                return data
+            return await self._revalidar(url, clave, data, meta, timeout, max_bytes)
+
+        estado, data, validadores = await cliente_http.leer_condicional(url, timeout=timeout, max_bytes=max_bytes)
+        if estado != 200 or not data:
+            self.stats["fallos"] += 1
+            return None
+        self.stats["descargas"] += 1
+        self.stats["kb_descargados"] += len(data) // 1024
+        await self._guardar(clave, data, self._meta(url, validadores))
+        return data
+
+    async def _revalidar(self, url: str, clave: str, data: bytes, meta: dict,
+                         timeout: Optional[float], max_bytes: int) -> bytes:
+        self.stats["revalidadas"] += 1
+        estado, nuevo, validadores = await cliente_http.leer_condicional(
+            url, meta.get("etag"), meta.get("modificado"), timeout=timeout, max_bytes=max_bytes)
+        if estado == 304:
+            self.stats["no_modificadas"] += 1
+            await self._guardar(clave, data, self._meta(url, validadores, meta))
+            return data
+        if estado == 200 and nuevo:
+            self.stats["descargas"] += 1
+            self.stats["kb_descargados"] += len(nuevo) // 1024
+            await self._guardar(clave, nuevo, self._meta(url, validadores))
+            return nuevo
+        # Host caído o respuesta rara: mejor la copia que ya teníamos que nada
+        self.stats["obsoletas"] += 1
+        return data
+
+    async def obtener(self, url: Optional[str], px: Optional[int] = None, timeout: Optional[float] = None,
+                      max_bytes: Optional[int] = None) -> Optional[bytes]:
+        """
+        Bytes de la imagen para dibujarla a `px` píxeles de lado (None = tamaño original).
+        Las peticiones concurrentes del mismo asset comparten una sola descarga.
+        Lo que pase de max_bytes (por defecto MAX_BYTES_REMOTO) no se descarga entero.
+        """
+        if not url:
+            return None
+        url = url_cdn(str(url), px)
+        clave, inmutable = clave_asset(url)
+        huella = hashlib.sha256(clave.encode("utf-8")).hexdigest()
+        try:
+            return await descargas.hacer(("remote_asset", huella),
+                                         lambda: self._resolver(url, huella, inmutable, timeout,
+                                                                max_bytes or self.max_bytes))
+        except Exception:
+            self.stats["fallos"] += 1
+            return None
+
+    async def obtener_varias(self, pares: Sequence[Tuple[Optional[str], Optional[int]]], concurrencia: int = 4,
+                             timeout: Optional[float] = None) -> List[Optional[bytes]]:
+        """Varios (url, px) a la vez, como mucho `concurrencia` en vuelo"""
+        semaforo = asyncio.Semaphore(max(1, concurrencia))
+
+        async def uno(url, px):
+            if not url:
+                return None
+            async with semaforo:
+                return await self.obtener(url, px, timeout)
+
+        return list(await asyncio.gather(*(uno(url, px) for url, px in pares)))
+
+    def estadisticas(self) -> dict:
+        almacen = self.almacen.estadisticas()
+        return {
+            **self.stats,
+            "hits_memoria": almacen["hits_memoria"],
+            "hits_disco": almacen["hits_disco"],
+            "entradas_memoria": almacen["entradas_memoria"],
+            "mb_memoria": almacen["mb_memoria"],
+            "entradas_disco": almacen["entradas_disco"],
+            "mb_disco": almacen["mb_disco"],
+        }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🛡️ DECODIFICACIÓN ACOTADA
+# ══════════════════════════════════════════════════════════════════════════════
+
+# Lo que se deja a LANCZOS tras Image.reduce (como reducing_gap=2 de Pillow)
+HOLGURA_REDUCCION = 2
+
+# Contadores del proceso: cuánto cuesta decodificar lo que llega de fuera
+metricas_decodificacion = {"decodificaciones": 0, "ms_total": 0.0, "drafts": 0, "reducciones": 0,
+                           "rechazadas": 0}
+
+
+def decodificar(data: bytes, tamaño: Tamaño = None, recortar: bool = False,
+                max_pixeles: int = MAX_PIXELES) -> Image.Image:
+    """
+    Bytes -> RGBA a `tamaño` sin decodificar más píxeles de los necesarios.
+    Image.open solo lee la cabecera: el tope de píxeles se comprueba antes de
+    decodificar. Con draft el JPEG sale ya escalado 1/2, 1/4 u 1/8 desde la
+    DCT; los demás formatos se decodifican enteros y se reducen por bloques
+    con Image.reduce antes del LANCZOS final. Lanza Image.DecompressionBombError.
+    """
+    tamaño = tuple(tamaño) if tamaño else None
+    inicio = time.perf_counter()
+    try:
+        img = Image.open(io.BytesIO(data))
+        if img.width * img.height > max_pixeles:
+            metricas_decodificacion["rechazadas"] += 1
+            raise Image.DecompressionBombError(
+                f"Imagen de {img.width}x{img.height} supera el tope de {max_pixeles} píxeles")
+        if tamaño:
+            # Solo JPEG implementa draft; nunca baja de `tamaño` en ninguno de los dos lados
+            original = img.size
+            img.draft(None, tamaño)
+            if img.size != original:
+                metricas_decodificacion["drafts"] += 1
+        img = img.convert("RGBA")
+        if tamaño and img.size != tamaño:
+            factor = min(img.width // tamaño[0], img.height // tamaño[1]) // HOLGURA_REDUCCION
+            if factor >= 2:
+                img = img.reduce(factor)
+                metricas_decodificacion["reducciones"] += 1
+            if recortar:
+                img = ImageOps.fit(img, tamaño, Image.Resampling.LANCZOS)
+            else:
+                img = img.resize(tamaño, Image.Resampling.LANCZOS)
+        metricas_decodificacion["decodificaciones"] += 1
+        return img
+    finally:
+        metricas_decodificacion["ms_total"] += (time.perf_counter() - inicio) * 1000
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🎨 VARIANTES DECODIFICADAS (WORKERS DE RENDER)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class VariantesDecodificadas:
+    """LRU por bytes de imágenes RGBA ya redimensionadas, por (contenido, tamaño, recorte)"""
+
+    def __init__(self, max_mb: int = 48):
+        self.max_bytes = max_mb * 1024 * 1024
+        self._imagenes: "OrderedDict[Tuple[str, Tamaño, bool], Image.Image]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {"hits": 0, "decodificaciones": 0, "evicciones": 0, "errores": 0}
+
+    @staticmethod
+    def _referencia(img: Image.Image) -> Image.Image:
+        """Referencia copy-on-write (Pillow copia antes de cualquier escritura)"""
+        ref = img._new(img.im)
+        ref.readonly = 1
+        return ref
+
+    def obtener(self, data: Optional[bytes], tamaño: Tamaño = None, recortar: bool = False) -> Optional[Image.Image]:
+        if not data:
+            return None
+        tamaño = tuple(tamaño) if tamaño else None
+        clave = (hashlib.sha1(data).hexdigest(), tamaño, recortar)
+        img = self._imagenes.get(clave)
+        if img is not None:
+            self._imagenes.move_to_end(clave)
+            self.stats["hits"] += 1
+            return self._referencia(img)
+        try:
+            img = decodificar(data, tamaño, recortar)
+        except Exception:
+            self.stats["errores"] += 1
+            return None
+        self.stats["decodificaciones"] += 1
+        peso = img.width * img.height * 4
+        if peso <= self.max_bytes:
+            self._imagenes[clave] = img
+            self._bytes += peso
+            while self._bytes > self.max_bytes and self._imagenes:
+                _, vieja = self._imagenes.popitem(last=False)
+                self._bytes -= vieja.width * vieja.height * 4
+                self.stats["evicciones"] += 1
+        return self._referencia(img)
+
+    def estadisticas(self) -> dict:
+        m = metricas_decodificacion
+        return {**self.stats, "variantes": len(self._imagenes), "kb": self._bytes // 1024,
+                "max_kb": self.max_bytes // 1024, "drafts": m["drafts"], "reducciones": m["reducciones"],
+                "rechazadas": m["rechazadas"],
+                "ms_decodificacion": round(m["ms_total"] / m["decodificaciones"], 1) if m["decodificaciones"] else 0.0}
+
+
+# Instancias compartidas: assets_remotos en el bot, variantes en cada worker
+assets_remotos = CacheAssetsRemotos()
+variantes = VariantesDecodificadas()
+
+
+def imagen_rgba(data: Optional[bytes], tamaño: Tamaño = None, recortar: bool = False) -> Optional[Image.Image]:
+    """Imagen RGBA (copy-on-write) a `tamaño`; recortar=True encuadra como ImageOps.fit"""
+    return variantes.obtener(data, tamaño, recortar)
+
+
+def estadisticas_variantes() -> dict:
+    return variantes.estadisticas()
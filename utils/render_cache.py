@@ -0,0 +1,308 @@
+"""
+🧠 Render Cache - Caché direccionada por contenido para renders deterministas
+Los builders que son funciones puras de sus argumentos se marcan con
+@render_cacheable(). El render service calcula un hash estable de
+(builder, argumentos, política de encode, versión de assets y de utils/) y sirve el
+resultado ya codificado desde memoria (LRU con presupuesto de bytes) o
+desde disco (data/render_cache, con tope de tamaño y desalojo LRU).
+"""
+
+import os
+import json
+import time
+import hashlib
+import importlib
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from PIL import Image
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Carpetas cuyos archivos forman parte de la clave (cambiar una fuente invalida la caché)
+CARPETAS_ASSETS = ("fonts", "banner")
+# Código compartido de los builders (efectos, texto, fuentes, encode...): cambiarlo también invalida
+CARPETAS_CODIGO = ("utils",)
+
+
+def render_cacheable(version: int = 1):
+    """Marcar un builder como determinista; subir `version` invalida lo cacheado"""
+    def decorador(func):
+        func._render_cache = version
+        return func
+    return decorador
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🔑 CLAVES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _canonico(valor: Any) -> Any:
+    """Convertir argumentos a una forma JSON estable (bytes e imágenes por su hash)"""
+    if isinstance(valor, (bytes, bytearray)):
+        return {"__bytes__": hashlib.sha256(valor).hexdigest()}
+    if isinstance(valor, Image.Image):
+        return {"__img__": [valor.mode, valor.size, hashlib.sha256(valor.tobytes()).hexdigest()]}
+    if is_dataclass(valor):
+        return _canonico(asdict(valor))
+    if isinstance(valor, dict):
+        return {str(k): _canonico(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        items = [_canonico(v) for v in valor]
+        return sorted(items, key=repr) if isinstance(valor, (set, frozenset)) else items
+    if valor is None or isinstance(valor, (str, int, float, bool)):
+        return valor
+    return repr(valor)
+
+
+def huella_spec(spec, **extra) -> str:
+    """Hash estable de un RenderSpec (target, argumentos, tiles y política de encode)"""
+    tiles = getattr(spec, "tiles", ())
+    if tiles:
+        extra["tiles"] = [[t.target, _canonico(t.args), _canonico(t.kwargs)] for t in tiles]
+    datos = json.dumps({
+        "target": spec.target,
+        "args": _canonico(spec.args),
+        "kwargs": _canonico(spec.kwargs),
+        "politica": _canonico(spec.politica),
+        **extra,
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(datos.encode("utf-8")).hexdigest()
+
+
+def version_assets(base_dir: str = BASE_DIR) -> str:
+    """Huella de las fuentes, imágenes y módulos de utils/ del repo (ruta, tamaño y mtime)"""
+    h = hashlib.sha1()
+    for carpeta in CARPETAS_ASSETS + CARPETAS_CODIGO:
+        ruta = os.path.join(base_dir, carpeta)
+        if not os.path.isdir(ruta):
+            continue
+        for nombre in sorted(os.listdir(ruta)):
+            if carpeta in CARPETAS_CODIGO and not nombre.endswith(".py"):
+                continue
+            try:
+                st = os.stat(os.path.join(ruta, nombre))
+                h.update(f"{carpeta}/{nombre}:{st.st_size}:{int(st.st_mtime)}".encode())
+            except OSError:
+                pass
+    return h.hexdigest()[:16]
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🗄️ CACHÉ EN DOS NIVELES
+# ══════════════════════════════════════════════════════════════════════════════
+
+class CacheRender:
+    """Memoria (LRU por bytes) + disco (LRU por mtime con tope de tamaño)"""
+
+    def __init__(self, max_memoria_mb: int = 64, max_disco_mb: int = 256,
+                 carpeta: str = os.path.join("data", "render_cache")):
+        self.max_memoria = max_memoria_mb * 1024 * 1024
+        self.max_disco = max_disco_mb * 1024 * 1024
+        self.carpeta = carpeta
+        self._memoria: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._bytes_memoria = 0
+        # Índice del disco: clave -> (bytes, último uso); se construye al primer acceso
+        self._disco: Optional[Dict[str, Tuple[int, float]]] = None
+        self._bytes_disco = 0
+        self._lock_disco = threading.Lock()
+        self._version_assets = version_assets()
+        self._targets: Dict[str, Optional[str]] = {}
+        self.stats = {"hits_memoria": 0, "hits_disco": 0, "misses": 0, "evicciones_memoria": 0,
+                      "evicciones_disco": 0}
+
+    def configurar(self, max_memoria_mb: Optional[int] = None, max_disco_mb: Optional[int] = None,
+                   carpeta: Optional[str] = None):
+        if max_memoria_mb is not None:
+            self.max_memoria = max_memoria_mb * 1024 * 1024
+        if max_disco_mb is not None:
+            self.max_disco = max_disco_mb * 1024 * 1024
+        if carpeta is not None:
+            self.carpeta = carpeta
+            self._disco = None
+
+    def _version_target(self, target: str) -> Optional[str]:
+        """Versión del builder si está marcado con @render_cacheable (None = no cachear)"""
+        if target not in self._targets:
+            version = None
+            try:
+                modulo, _, ruta = target.partition(":")
+                mod = importlib.import_module(modulo)
+                obj = mod
+                for parte in ruta.split("."):
+                    obj = getattr(obj, parte)
+                marca = getattr(obj, "_render_cache", None)
+                if marca is not None:
+                    # El mtime del módulo invalida lo cacheado tras un deploy
+                    mtime = int(os.path.getmtime(mod.__file__)) if getattr(mod, "__file__", None) else 0
+                    version = f"{marca}:{mtime}"
+            except Exception:
+                pass
+            self._targets[target] = version
+        return self._targets[target]
+
+    def olvidar_versiones(self):
+        """
+        Tras recargar módulos en caliente: volver a leer el mtime de cada builder,
+        de los assets y de utils/. La memoria se vacía (sus claves ya no se pueden pedir);
+        en disco las entradas viejas salen por el LRU.
+        """
+        self._targets.clear()
+        self._version_assets = version_assets()
+        self._memoria.clear()
+        self._bytes_memoria = 0
+
+    def clave(self, spec) -> Optional[str]:
+        """Hash estable del spec, o None si el builder (o alguno de sus tiles) no optó por la caché"""
+        version = self._version_target(spec.target)
+        if version is None:
+            return None
+        extra = {}
+        tiles = getattr(spec, "tiles", ())
+        if tiles:
+            # Una hoja es tan determinista como sus tiles, y cambia cuando cambia cualquiera
+            versiones = [self._version_target(t.target) for t in tiles]
+            if any(v is None for v in versiones):
+                return None
+            extra["versiones_tiles"] = versiones
+        return huella_spec(spec, version=version, assets=self._version_assets, **extra)
+
+    # ── Memoria ──
+
+    def obtener_memoria(self, clave: str) -> Optional[Tuple[bytes, str]]:
+        entrada = self._memoria.get(clave)
+        if entrada is not None:
+            self._memoria.move_to_end(clave)
+            self.stats["hits_memoria"] += 1
+        return entrada
+
+    def guardar_memoria(self, clave: str, data: bytes, formato: str):
+        if len(data) > self.max_memoria:
+            return
+        anterior = self._memoria.pop(clave, None)
+        if anterior is not None:
+            self._bytes_memoria -= len(anterior[0])
+        self._memoria[clave] = (data, formato)
+        self._bytes_memoria += len(data)
+        while self._bytes_memoria > self.max_memoria and self._memoria:
+            _, (viejo, _) = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(viejo)
+            self.stats["evicciones_memoria"] += 1
+
+    # ── Disco (bloqueante: llamar desde un hilo) ──
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.carpeta, clave[:2], clave + ".bin")
+
+    def _indexar(self):
+        if self._disco is not None:
+            return
+        self._disco, self._bytes_disco = {}, 0
+        if not os.path.isdir(self.carpeta):
+            return
+        for raiz, _, archivos in os.walk(self.carpeta):
+            for nombre in archivos:
+                if nombre.endswith(".bin"):
+                    try:
+                        st = os.stat(os.path.join(raiz, nombre))
+                    except OSError:
+                        continue
+                    self._disco[nombre[:-4]] = (st.st_size, st.st_mtime)
+                    self._bytes_disco += st.st_size
+
+    def leer_disco(self, clave: str) -> Optional[bytes]:
+        with self._lock_disco:
+            return self._leer_disco(clave)
+
+    def escribir_disco(self, clave: str, data: bytes):
+        with self._lock_disco:
+            self._escribir_disco(clave, data)
+
+    def _leer_disco(self, clave: str) -> Optional[bytes]:
+        self._indexar()
+        if clave not in self._disco:
+            return None
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "rb") as f:
+                data = f.read()
+            ahora = time.time()
+            os.utime(ruta, (ahora, ahora))
+        except OSError:
+            self._olvidar_disco(clave)
+            return None
+        self._disco[clave] = (len(data), ahora)
+        self.stats["hits_disco"] += 1
+        return data
+
+    def _escribir_disco(self, clave: str, data: bytes):
+        if len(data) > self.max_disco:
+            return
+        self._indexar()
+        ruta = self._ruta(clave)
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            temporal = ruta + ".tmp"
+            with open(temporal, "wb") as f:
+                f.write(data)
+            os.replace(temporal, ruta)
+        except OSError as e:
+            print(f"Render cache: no se pudo escribir en disco ({e})")
+            return
+        self._olvidar_disco(clave)
+        self._disco[clave] = (len(data), time.time())
+        self._bytes_disco += len(data)
+        self._recortar_disco()
+
+    def _olvidar_disco(self, clave: str):
+        anterior = self._disco.pop(clave, None) if self._disco is not None else None
+        if anterior is not None:
+            self._bytes_disco -= anterior[0]
+
+    def _recortar_disco(self):
+        if self._bytes_disco <= self.max_disco:
+            return
+        for clave, _ in sorted(self._disco.items(), key=lambda kv: kv[1][1]):
+            if self._bytes_disco <= self.max_disco:
+                break
+            try:
+                os.remove(self._ruta(clave))
+            except OSError:
+                pass
+            self._olvidar_disco(clave)
+            self.stats["evicciones_disco"] += 1
+
+    def vaciar(self):
+        """Borrar ambos niveles (p. ej. tras cambiar un builder sin tocar su versión)"""
+        self._memoria.clear()
+        self._bytes_memoria = 0
+        with self._lock_disco:
+            self._indexar()
+            for clave in list(self._disco):
+                try:
+                    os.remove(self._ruta(clave))
+                except OSError:
+                    pass
+                self._olvidar_disco(clave)
+        self._targets.clear()
+
+    def estadisticas(self) -> dict:
+        hits = self.stats["hits_memoria"] + self.stats["hits_disco"]
+        total = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "entradas_memoria": len(self._memoria),
+            "mb_memoria": round(self._bytes_memoria / 1024 / 1024, 1),
+            "max_memoria_mb": self.max_memoria // 1024 // 1024,
+            "entradas_disco": len(self._disco) if self._disco is not None else 0,
+            "mb_disco": round(self._bytes_disco / 1024 / 1024, 1),
+            "max_disco_mb": self.max_disco // 1024 // 1024,
+        }
+
+
+# Instancia compartida: vive en el proceso del bot, delante del pool de render
+render_cache = CacheRender()
@@ -0,0 +1,378 @@
+"""
+🏭 Render Service - Renderizado de imágenes fuera del event loop
+Los builders envían un RenderSpec (picklable) y reciben los bytes ya codificados.
+Usa un ProcessPoolExecutor con workers precalentados y cae a renderizado
+en proceso (en un hilo) si el pool no está disponible.
+"""
+
+import io
+import os
+import json
+import time
+import asyncio
+import importlib
+import multiprocessing
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from utils.encode_policy import (
+    EXTENSIONES, PoliticaEncode, codificar_imagen, detectar_formato, metricas, politicas
+)
+from utils.render_cache import huella_spec, render_cache
+from utils.single_flight import renders
+from utils.quality_tiers import COMPLETA, activar, calidades, restaurar
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 📦 ESPECIFICACIÓN DE RENDER
+# ══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class RenderSpec:
+    """
+    Trabajo de render serializable.
+
+    target: "paquete.modulo:funcion" o "paquete.modulo:Clase.metodo"
+            (la clase se instancia una vez por proceso).
+    args/kwargs: solo datos planos (str, int, bytes, tuplas, dicts...).
+    guild_id: servidor para el que se renderiza (overrides de la política de encode).
+    politica: política explícita; si falta se resuelve con guild_id al enviar.
+    calidad: completa / reducida / minima; si falta la elige el selector según la carga.
+    tiles: specs que el worker renderiza antes, en el mismo proceso, y pasa al
+           target como primer argumento (lista de imágenes) para componer la hoja.
+    """
+    target: str
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    guild_id: Optional[int] = None
+    politica: Optional[PoliticaEncode] = None
+    calidad: Optional[str] = None
+    tiles: Tuple["RenderSpec", ...] = ()
+
+
+class ImagenRender(io.BytesIO):
+    """BytesIO con el formato real del resultado, para nombrar el adjunto"""
+
+    def __init__(self, data: bytes, formato: str):
+        super().__init__(data)
+        self.formato = formato
+
+    @property
+    def extension(self) -> str:
+        return EXTENSIONES.get(self.formato, "png")
+
+    def nombre(self, base: str) -> str:
+        """'banner.png' -> 'banner.webp' si la política eligió WebP"""
+        return f"{os.path.splitext(base)[0]}.{self.extension}"
+
+
+# Estado por proceso (worker o proceso principal en modo fallback)
+_instancias: Dict[str, Any] = {}
+
+
+def _resolver(target: str):
+    modulo, _, ruta = target.partition(":")
+    mod = importlib.import_module(modulo)
+    if "." not in ruta:
+        return getattr(mod, ruta)
+    clase, metodo = ruta.split(".", 1)
+    clave = f"{modulo}:{clase}"
+    if clave not in _instancias:
+        _instancias[clave] = getattr(mod, clase)()
+    return getattr(_instancias[clave], metodo)
+
+
+def codificar(resultado, politica: Optional[PoliticaEncode] = None) -> Tuple[bytes, dict]:
+    """Normalizar lo que devuelva un builder a (bytes, info de encode)"""
+    if isinstance(resultado, Image.Image):
+        return codificar_imagen(resultado, politica or politicas.defecto)
+    if isinstance(resultado, io.BytesIO):
+        resultado = resultado.getvalue()
+    if isinstance(resultado, (bytes, bytearray)):
+        # Ya codificado por el builder (GIF/APNG animados...): se respeta tal cual
+        data = bytes(resultado)
+        return data, {"formato": detectar_formato(data), "bytes": len(data), "ms": 0.0}
+    if isinstance(resultado, (dict, list, int, float)):
+        # Consultas de estado (stats de cachés del worker...)
+        data = json.dumps(resultado).encode("utf-8")
+        return data, {"formato": "JSON", "bytes": len(data), "ms": 0.0}
+    raise TypeError(f"Resultado de render no soportado: {type(resultado).__name__}")
+
+
+def _renderizar_tiles(tiles: Sequence[RenderSpec]) -> List[Any]:
+    """Tiles de una hoja: misma instancia del builder, así comparten fuentes y fondos cacheados"""
+    return [_resolver(t.target)(*t.args, **t.kwargs) for t in tiles]
+
+
+def ejecutar_spec(spec: RenderSpec) -> Tuple[bytes, dict]:
+    """Punto de entrada del worker (también se usa en el fallback)"""
+    func = _resolver(spec.target)
+    token = activar(spec.calidad)
+    try:
+        args = spec.args
+        if spec.tiles:
+            args = (_renderizar_tiles(spec.tiles), *args)
+        return codificar(func(*args, **spec.kwargs), spec.politica)
+    finally:
+        restaurar(token)
+
+
+def _calentar_worker(calentamientos: Sequence[str] = ()):
+    """Initializer: importar Pillow, precargar el registro de fuentes y precalentar cachés"""
+    from PIL import ImageDraw, ImageFilter  # noqa: F401
+    try:
+        from utils.font_registry import precargar_fuentes
+        precargar_fuentes()
+    except Exception as e:
+        print(f"Error precargando fuentes: {e}")
+    for target in calentamientos:
+        try:
+            _resolver(target)()
+        except Exception as e:
+            print(f"Error precalentando {target}: {e}")
+
+
+def _ping() -> int:
+    return 1
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🏭 SERVICIO
+# ══════════════════════════════════════════════════════════════════════════════
+
+class RenderService:
+    """Pool de procesos para los builders de Pillow"""
+
+    MAX_REINICIOS = 3
+
+    def __init__(self, workers: int = 2, timeout: float = 30.0):
+        self.workers = workers
+        self.timeout = timeout
+        # Targets sin argumentos que cada worker ejecuta al arrancar
+        self.calentamientos: Tuple[str, ...] = ()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._reinicios = 0
+        # Renders lanzados y sin terminar (en un worker o esperando uno)
+        self.en_curso = 0
+        self.stats = {
+            "pool": 0, "fallback": 0, "cache": 0, "timeouts": 0, "errores": 0,
+            "lotes": 0, "tiles": 0, "ms_total": 0.0, "bytes_total": 0
+        }
+
+    def configure(self, workers: Optional[int] = None, timeout: Optional[float] = None,
+                  calentamientos: Optional[Sequence[str]] = None):
+        if workers is not None:
+            self.workers = workers
+        if timeout is not None:
+            self.timeout = timeout
+        if calentamientos is not None:
+            self.calentamientos = tuple(calentamientos)
+        calidades.configurar(workers=self.workers)
+
+    @property
+    def activo(self) -> bool:
+        return self._pool is not None
+
+    def _crear_pool(self) -> bool:
+        if self.workers <= 0:
+            return False
+        try:
+            # spawn: no heredar hilos ni sockets del proceso del bot
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_calentar_worker,
+                initargs=(self.calentamientos,)
+            )
+            return True
+        except Exception as e:
+            print(f"Render service sin workers ({e}); se renderiza en proceso")
+            self._pool = None
+            return False
+
+    async def start(self):
+        """Crear el pool y levantar todos los workers antes del primer render"""
+        if self._pool is not None:
+            return
+        if not self._crear_pool():
+            # Sin workers el render es en proceso: precalentar aquí
+            await asyncio.to_thread(_calentar_worker, self.calentamientos)
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)))
+        except Exception as e:
+            print(f"Error calentando workers de render: {e}")
+            self._descartar_pool()
+
+    def _descartar_pool(self):
+        if self._pool is not None:
+            try:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            except Exception:
+                pass
+        self._pool = None
+
+    def _reciclar_pool(self, pool: ProcessPoolExecutor):
+        """
+        Matar los workers de un pool con un job colgado y crear otro: wait_for
+        solo deja de esperar, el worker seguiría ocupado con el render.
+        Los jobs que compartían el pool caen al fallback en proceso.
+        """
+        if self._pool is pool:
+            self._pool = None
+            self._crear_pool()
+        procesos = list((getattr(pool, "_processes", None) or {}).values())
+        try:
+            terminar = getattr(pool, "terminate_workers", None)  # Python 3.14+
+            if terminar is not None:
+                terminar()
+                return
+            pool.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            pass
+        for proceso in procesos:
+            try:
+                proceso.terminate()
+            except Exception:
+                pass
+
+    async def render(self, spec: RenderSpec, timeout: Optional[float] = None) -> bytes:
+        """Renderizar un spec y devolver los bytes codificados"""
+        data, _ = await self._ejecutar(spec, timeout)
+        return data
+
+    async def render_io(self, spec: RenderSpec, timeout: Optional[float] = None) -> ImagenRender:
+        """Igual que render() pero listo para discord.File (usar .nombre() para el filename)"""
+        data, info = await self._ejecutar(spec, timeout)
+        return ImagenRender(data, info["formato"])
+
+    async def render_hoja(self, tiles: Sequence[RenderSpec], componer: RenderSpec,
+                          timeout: Optional[float] = None) -> ImagenRender:
+        """
+        Tiles + composición en una sola ida y vuelta: el worker renderiza cada
+        tile y llama a componer.target(imagenes, *args, **kwargs). La política,
+        el nivel de calidad y la caché son los de `componer` (solo se cachea si
+        todos los tiles son @render_cacheable). Va en un solo worker: para tiles
+        baratos, pasarlos codificados de un worker a otro cuesta más que
+        dibujarlos.
+        """
+        self.stats["lotes"] += 1
+        self.stats["tiles"] += len(tiles)
+        tiles = tuple(RenderSpec(t.target, tuple(t.args), dict(t.kwargs)) for t in tiles)
+        return await self.render_io(replace(componer, tiles=tiles), timeout)
+
+    async def _ejecutar(self, spec: RenderSpec, timeout: Optional[float] = None) -> Tuple[bytes, dict]:
+        if spec.politica is None:
+            spec = replace(spec, politica=politicas.para(spec.guild_id))
+        if spec.calidad is None:
+            calidades.observar(self.en_curso)
+            spec = replace(spec, calidad=calidades.para(spec.guild_id))
+        # Specs idénticos en vuelo (todo el servidor abriendo el mismo ranking) comparten un render.
+        # Se comparten bytes inmutables: render_io crea un ImagenRender nuevo por llamante
+        return await renders.hacer(
+            huella_spec(spec, calidad=spec.calidad), lambda: self._ejecutar_unico(spec, timeout)
+        )
+
+    async def _ejecutar_unico(self, spec: RenderSpec, timeout: Optional[float] = None) -> Tuple[bytes, dict]:
+        # Builders deterministas (@render_cacheable): memoria y luego disco.
+        # La clave no depende del nivel: se sirve la versión completa si existe
+        # y solo se guarda lo renderizado en calidad completa
+        clave = render_cache.clave(spec)
+        if clave is not None:
+            cacheado = await self._desde_cache(clave)
+            if cacheado is not None:
+                return cacheado
+            data, info = await self._renderizar(spec, timeout)
+            if spec.calidad in (None, COMPLETA):
+                render_cache.guardar_memoria(clave, data, info["formato"])
+                await asyncio.to_thread(render_cache.escribir_disco, clave, data)
+            return data, info
+        return await self._renderizar(spec, timeout)
+
+    async def _desde_cache(self, clave: str) -> Optional[Tuple[bytes, dict]]:
+        entrada = render_cache.obtener_memoria(clave)
+        if entrada is None:
+            data = await asyncio.to_thread(render_cache.leer_disco, clave)
+            if data is None:
+                render_cache.stats["misses"] += 1
+                return None
+            entrada = (data, detectar_formato(data))
+            render_cache.guardar_memoria(clave, *entrada)
+        self.stats["cache"] += 1
+        data, formato = entrada
+        return data, {"formato": formato, "bytes": len(data), "ms": 0.0}
+
+    async def _renderizar(self, spec: RenderSpec, timeout: Optional[float] = None) -> Tuple[bytes, dict]:
+        """Una ida y vuelta al worker"""
+        loop = asyncio.get_running_loop()
+        inicio = time.perf_counter()
+        # Un solo presupuesto para el pool y el fallback: el total no pasa del timeout
+        limite = inicio + (timeout or self.timeout)
+        self.en_curso += 1
+        try:
+            if self._pool is None and self._reinicios and self._reinicios <= self.MAX_REINICIOS:
+                self._crear_pool()
+
+            try:
+                pool = self._pool
+                if pool is not None:
+                    try:
+                        resultado = await asyncio.wait_for(
+                            loop.run_in_executor(pool, ejecutar_spec, spec), limite - time.perf_counter()
+                        )
+                        self.stats["pool"] += 1
+                        return self._medir(resultado, inicio)
+                    except asyncio.TimeoutError:
+                        print("Render service: render colgado, reciclando el pool")
+                        self._reciclar_pool(pool)
+                        raise
+                    except BrokenProcessPool:
+                        # Un worker murió (OOM, señal...): reintentar en proceso.
+                        # Si lo rompió un reciclado por timeout ya hay pool nuevo
+                        if self._pool is pool:
+                            print("Render service: pool roto, usando fallback en proceso")
+                            self._descartar_pool()
+                            self._reinicios += 1
+
+                restante = limite - time.perf_counter()
+                if restante <= 0:
+                    raise asyncio.TimeoutError()
+                resultado = await asyncio.wait_for(asyncio.to_thread(ejecutar_spec, spec), restante)
+                self.stats["fallback"] += 1
+                return self._medir(resultado, inicio)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise
+            except Exception:
+                self.stats["errores"] += 1
+                raise
+        finally:
+            self.en_curso -= 1
+            # La latencia incluye la espera por un worker libre; los timeouts también cuentan
+            calidades.observar(self.en_curso, (time.perf_counter() - inicio) * 1000)
+
+    async def consultar(self, target: str, *args, timeout: Optional[float] = None):
+        """Ejecutar un target que devuelve datos (dict/list) y decodificar el JSON"""
+        return json.loads(await self.render(RenderSpec(target, args, calidad=COMPLETA), timeout))
+
+    def _medir(self, resultado, inicio: float):
+        self.stats["ms_total"] += (time.perf_counter() - inicio) * 1000
+        data, info = resultado
+        self.stats["bytes_total"] += len(data)
+        if info["formato"] != "JSON":
+            metricas.registrar(info)
+        return resultado
+
+    async def shutdown(self):
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+
+
+# Instancia compartida: bot.py la configura y arranca; los módulos solo la usan
+render_service = RenderService()
@@ -2,28 +2,25 @@
 🎮 Roblox Image Builder - Crear imágenes de verificación con Pillow
 """
 
-from PIL import Image, ImageDraw, ImageFont
-import os
+from PIL import Image, ImageDraw
 from typing import Tuple
 import io
-import aiohttp
+
+from utils.font_registry import obtener_fuente
+from utils.single_flight import colapsar, descargas
+from utils.http_client import cliente_http
 
 class RobloxImageBuilder:
     """Constructor de imágenes de verificación Roblox"""
     
     def __init__(self):
-        self.fonts_dir = "fonts"
         self.title_font = self._load_font("classic.ttf", 50, bold=True)
         self.name_font = self._load_font("classic.ttf", 35)
         self.small_font = self._load_font("classic.ttf", 20)
         
     def _load_font(self, filename: str, size: int, bold: bool = False):
-        """Cargar fuente con fallback"""
-        path = os.path.join(self.fonts_dir, filename)
-        try:
-            return ImageFont.truetype(path, size)
-        except:
-            return ImageFont.load_default()
+        """Fuente del registro compartido (cargada una vez por proceso)"""
+        return obtener_fuente(filename, size)
     
     def _round_corners(self, img, radius=20):
         """Redondear esquinas de una imagen"""
@@ -36,17 +33,21 @@ class RobloxImageBuilder:
         except:
             return img
     
+    @staticmethod
+    @colapsar(descargas)
+    async def _descargar_bytes(url: str):
+        """Bytes de la imagen (descargas concurrentes de la misma URL se agrupan)"""
+        return await cliente_http.leer(url, timeout=5)
+    
     async def download_image(self, url: str, size: Tuple[int, int] = (150, 150)):
         """Descargar imagen de URL"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as r:
-                    if r.status == 200:
-                        img_data = await r.read()
-                        img = Image.open(io.BytesIO(img_data))
-                        img = img.convert('RGBA')
-                        img.thumbnail(size, Image.Resampling.LANCZOS)
-                        return self._round_corners(img, radius=15)
+            img_data = await self._descargar_bytes(url)
+            if img_data:
+                img = Image.open(io.BytesIO(img_data))
+                img = img.convert('RGBA')
+                img.thumbnail(size, Image.Resampling.LANCZOS)
+                return self._round_corners(img, radius=15)
         except:
             pass
         
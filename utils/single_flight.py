@@ -0,0 +1,92 @@
+"""
+🛫 Single Flight - Una sola tarea en vuelo por clave
+Si llegan varias peticiones idénticas a la vez (el mismo ranking, el mismo
+icono del servidor...), la primera lanza el trabajo y el resto espera ese
+mismo resultado. Cada clave tiene su timeout y se cuentan las peticiones
+colapsadas.
+"""
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave en una sola tarea"""
+
+    def __init__(self, nombre: str, timeout: Optional[float] = None):
+        self.nombre = nombre
+        self.timeout = timeout
+        self._en_vuelo: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {"lideres": 0, "colapsadas": 0, "timeouts": 0, "errores": 0}
+
+    async def hacer(self, clave: Hashable, fabrica: Callable[[], Awaitable[Any]],
+                    timeout: Optional[float] = None) -> Any:
+        """
+        Ejecutar fabrica() una sola vez para todos los que pidan `clave` mientras
+        esté en vuelo. El resultado se comparte: debe ser inmutable (bytes, tuplas...).
+        """
+        tarea = self._en_vuelo.get(clave)
+        if tarea is None:
+            tarea = asyncio.ensure_future(self._ejecutar(fabrica, timeout or self.timeout))
+            self._en_vuelo[clave] = tarea
+            tarea.add_done_callback(functools.partial(self._aterrizar, clave))
+            self.stats["lideres"] += 1
+        else:
+            self.stats["colapsadas"] += 1
+        # shield: si un llamante se cancela, la tarea sigue para los demás
+        return await asyncio.shield(tarea)
+
+    async def _ejecutar(self, fabrica: Callable[[], Awaitable[Any]], timeout: Optional[float]) -> Any:
+        try:
+            if timeout:
+                return await asyncio.wait_for(fabrica(), timeout)
+            return await fabrica()
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise
+        except Exception:
+            self.stats["errores"] += 1
+            raise
+
+    def _aterrizar(self, clave: Hashable, tarea: asyncio.Task):
+        if self._en_vuelo.get(clave) is tarea:
+            del self._en_vuelo[clave]
+        # Evitar "exception was never retrieved" si todos los llamantes se cancelaron
+        if not tarea.cancelled():
+            tarea.exception()
+
+    @property
+    def en_vuelo(self) -> int:
+        return len(self._en_vuelo)
+
+    def estadisticas(self) -> dict:
+        total = self.stats["lideres"] + self.stats["colapsadas"]
+        return {
+            **self.stats,
+            "en_vuelo": self.en_vuelo,
+            "ratio_colapso": round(self.stats["colapsadas"] / total, 3) if total else 0.0,
+        }
+
+
+def colapsar(grupo: SingleFlight, timeout: Optional[float] = None):
+    """
+    Decorador para corrutinas de descarga: las llamadas concurrentes con los
+    mismos argumentos comparten una sola ejecución.
+    """
+    def decorador(func):
+        @functools.wraps(func)
+        async def envoltura(*args, **kwargs):
+            clave = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(clave)
+            except TypeError:
+                return await func(*args, **kwargs)
+            return await grupo.hacer(clave, lambda: func(*args, **kwargs), timeout)
+        return envoltura
+    return decorador
+
+
+# Grupos compartidos del proceso del bot
+renders = SingleFlight("renders")
+descargas = SingleFlight("descargas", timeout=15)
@@ -0,0 +1,408 @@
+"""
+🗄️ Storage - Motor de persistencia SQLite (aiosqlite) para el bot
+Una tabla por dominio, modo WAL y upserts por fila en lugar de reescribir JSON.
+Quien sabe qué cambió pasa las claves de primer nivel a sincronizar() y solo
+esas se serializan y comparan; sin claves se recorre el dominio entero.
+"""
+
+import os
+import json
+import atexit
+import asyncio
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import aiosqlite
+except ImportError:  # Sin aiosqlite se escribe de forma síncrona
+    aiosqlite = None
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 📋 ESQUEMA POR DOMINIO
+# ══════════════════════════════════════════════════════════════════════════════
+
+# dominio -> (archivo JSON legacy, columnas clave, tipo raíz)
+# La primera columna es el grupo que marca sincronizar(claves=...):
+# clave en config/warns, servidor en tickets e id de la historia en stories
+DOMINIOS = {
+    "config": ("config.json", ("clave",), dict),
+    "warns": ("warns.json", ("clave",), dict),
+    "tickets": ("tickets.json", ("guild_id", "ticket_id"), dict),
+    "stories": ("anonymous_stories.json", ("id",), list),
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+CREATE TABLE IF NOT EXISTS config (
+    clave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS warns (
+    clave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tickets (
+    guild_id TEXT NOT NULL,
+    ticket_id TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    PRIMARY KEY (guild_id, ticket_id)
+);
+CREATE TABLE IF NOT EXISTS stories (
+    id INTEGER PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+"""
+
+
+def _dump(valor: Any) -> str:
+    """Serializar un valor de forma estable para poder compararlo"""
+    return json.dumps(valor, ensure_ascii=False, sort_keys=True)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 👁️ VISTAS FINAS SOBRE LAS TABLAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+class VistaDict(dict):
+    """Dict normal que sabe a qué dominio del storage pertenece"""
+
+    def __init__(self, storage: "SQLiteStorage", dominio: str, datos: dict):
+        super().__init__(datos)
+        self._storage = storage
+        self._dominio = dominio
+
+    def guardar(self, *claves):
+        """Persistir solo las filas que cambiaron (de `claves` si se indican)"""
+        self._storage.sincronizar(self._dominio, self, claves or None)
+
+
+class VistaLista(list):
+    """Lista normal que sabe a qué dominio del storage pertenece"""
+
+    def __init__(self, storage: "SQLiteStorage", dominio: str, datos: list):
+        super().__init__(datos)
+        self._storage = storage
+        self._dominio = dominio
+
+    def guardar(self, *ids):
+        """Persistir solo las filas que cambiaron (de las historias `ids` si se indican)"""
+        self._storage.sincronizar(self._dominio, self, ids or None)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# 🗄️ MOTOR SQLITE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class SQLiteStorage:
+    """Persistencia por filas con lectura síncrona al inicio y escritura async"""
+
+    REINTENTO_MIN = 1.0     # Segundos antes de reintentar un lote fallido (se dobla en cada fallo)
+    REINTENTO_MAX = 60.0
+
+    def __init__(self, data_folder: str = "data", db_name: str = "desfcita.db"):
+        self.data_folder = data_folder
+        self.path = os.path.join(data_folder, db_name)
+        os.makedirs(data_folder, exist_ok=True)
+
+        # Última versión persistida de cada fila: dominio -> grupo -> {clave: json}
+        self._snapshots: Dict[str, Dict[str, Dict[tuple, str]]] = {}
+        # Escrituras pendientes coalescidas: (dominio, clave) -> json | None (borrar)
+        self._pendientes: Dict[Tuple[str, tuple], Optional[str]] = {}
+
+        self._writer: Optional[asyncio.Task] = None
+        self._fallos = 0            # Drenados fallidos seguidos (marca la espera del reintento)
+        self._esperando = False     # El escritor está dormido antes de reintentar
+        self.stats = {"upserts": 0, "deletes": 0, "flushes": 0, "migrados": 0, "reintentos": 0}
+
+        self._inicializar()
+        atexit.register(self._flush_sync)
+
+    # ──────────────────────────────────────────────────────────────────────
+    # 🔧 Inicialización y migración
+    # ──────────────────────────────────────────────────────────────────────
+
+    def _conectar_sync(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _inicializar(self):
+        """Crear esquema e importar los JSON antiguos una sola vez"""
+        conn = self._conectar_sync()
+        try:
+            conn.executescript(ESQUEMA)
+            migrado = conn.execute("SELECT valor FROM meta WHERE clave = 'json_importado'").fetchone()
+            if not migrado:
+                self._importar_json(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('json_importado', '1')"
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _importar_json(self, conn: sqlite3.Connection):
+        for dominio, (archivo, _, tipo) in DOMINIOS.items():
+            ruta = os.path.join(self.data_folder, archivo)
+            if not os.path.exists(ruta):
+                continue
+            try:
+                with open(ruta, "r", encoding="utf-8") as f:
+                    datos = json.load(f)
+                if not isinstance(datos, tipo):
+                    continue
+                filas = self._filas_planas(dominio, datos)
+                conn.executemany(self._sql_upsert(dominio), filas)
+                self.stats["migrados"] += len(filas)
+            except Exception as e:
+                print(f"Error importando {archivo}: {e}")
+
+    # ──────────────────────────────────────────────────────────────────────
+    # 🔀 Conversión objeto <-> filas
+    # ──────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _historias_por_id(historias: list) -> Dict[str, Any]:
+        """Historias por id estable; las que llegan sin id reciben el siguiente libre"""
+        siguiente = max((h["id"] for h in historias if isinstance(h, dict) and isinstance(h.get("id"), int)),
+                        default=0) + 1
+        por_id = {}
+        for historia in historias:
+            if isinstance(historia, dict) and not isinstance(historia.get("id"), int):
+                historia["id"] = siguiente
+                siguiente += 1
+            if isinstance(historia, dict):
+                por_id[str(historia["id"])] = historia
+        return por_id
+
+    def _grupos(self, dominio: str, datos) -> Dict[str, Any]:
+        """Valores de primer nivel por grupo (sin serializar nada)"""
+        if dominio == "stories":
+            return self._historias_por_id(datos)
+        return {str(k): v for k, v in datos.items()}
+
+    def _filas(self, dominio: str, grupo: str, valor) -> Dict[tuple, str]:
+        """Filas de un grupo: un ticket por fila en tickets, una fila en el resto"""
+        if dominio == "tickets":
+            if not isinstance(valor, dict):
+                return {}
+            return {(grupo, str(tid)): _dump(ticket) for tid, ticket in valor.items()}
+        if dominio == "stories":
+            return {(int(grupo),): _dump(valor)}
+        return {(grupo,): _dump(valor)}
+
+    def _aplanar(self, dominio: str, datos) -> Dict[str, Dict[tuple, str]]:
+        return {g: self._filas(dominio, g, v) for g, v in self._grupos(dominio, datos).items()}
+
+    def _filas_planas(self, dominio: str, datos) -> List[tuple]:
+        """Parámetros de upsert para todo el dominio (importaciones)"""
+        return [(*k, v) for filas in self._aplanar(dominio, datos).values() for k, v in filas.items()]
+
+    def _reconstruir(self, dominio: str, filas: List[tuple]):
+        if dominio == "tickets":
+            datos: Dict[str, dict] = {}
+            for gid, tid, valor in filas:
+                datos.setdefault(gid, {})[tid] = json.loads(valor)
+            return datos
+        if dominio == "stories":
+            return [json.loads(valor) for _, valor in sorted(filas)]
+        return {k: json.loads(valor) for k, valor in filas}
+
+    def _sql_upsert(self, dominio: str) -> str:
+        claves = DOMINIOS[dominio][1]
+        columnas = ", ".join(claves)
+        marcas = ", ".join("?" for _ in claves)
+        return (
+            f"INSERT INTO {dominio} ({columnas}, valor) VALUES ({marcas}, ?) "
+            f"ON CONFLICT ({columnas}) DO UPDATE SET valor = excluded.valor"
+        )
+
+    def _sql_delete(self, dominio: str) -> str:
+        condicion = " AND ".join(f"{c} = ?" for c in DOMINIOS[dominio][1])
+        return f"DELETE FROM {dominio} WHERE {condicion}"
+
+    # ──────────────────────────────────────────────────────────────────────
+    # 📖 Lectura
+    # ──────────────────────────────────────────────────────────────────────
+
+    def cargar(self, dominio: str, default=None):
+        """Leer un dominio completo y devolver su vista (solo al arrancar)"""
+        conn = self._conectar_sync()
+        try:
+            filas = conn.execute(f"SELECT * FROM {dominio}").fetchall()
+        finally:
+            conn.close()
+
+        datos = self._reconstruir(dominio, filas)
+        if default:
+            for k, v in default.items():
+                datos.setdefault(k, v)
+        self._snapshots[dominio] = self._aplanar(dominio, datos)
+
+        if DOMINIOS[dominio][2] is list:
+            return VistaLista(self, dominio, datos)
+        return VistaDict(self, dominio, datos)
+
+    # ──────────────────────────────────────────────────────────────────────
+    # ✏️ Escritura
+    # ──────────────────────────────────────────────────────────────────────
+
+    def sincronizar(self, dominio: str, datos, claves: Optional[Sequence[Any]] = None):
+        """
+        Comparar con la última versión y encolar solo las filas distintas.
+        Con `claves` solo se serializan esos grupos (una clave que ya no está
+        en `datos` se borra); sin ellas se compara el dominio entero.
+        """
+        previas = self._snapshots.setdefault(dominio, {})
+        if claves is None:
+            nuevas = self._aplanar(dominio, datos)
+            grupos = previas.keys() | nuevas.keys()
+        else:
+            actuales = self._grupos(dominio, datos)
+            grupos = {str(c) for c in claves}
+            nuevas = {g: self._filas(dominio, g, actuales[g]) for g in grupos if g in actuales}
+
+        for grupo in grupos:
+            antes, ahora = previas.get(grupo, {}), nuevas.get(grupo, {})
+            for clave, valor in ahora.items():
+                if antes.get(clave) != valor:
+                    self._pendientes[(dominio, clave)] = valor
+            for clave in antes.keys() - ahora.keys():
+                self._pendientes[(dominio, clave)] = None
+            if grupo in nuevas:
+                previas[grupo] = ahora
+            else:
+                previas.pop(grupo, None)
+
+        self._programar()
+
+    def _programar(self):
+        """Lanzar el escritor async o escribir directo si no hay loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_sync()
+            return
+        if self._writer is None or self._writer.done():
+            self._writer = loop.create_task(self._drenar())
+
+    def _tomar_lote(self):
+        pendientes, self._pendientes = self._pendientes, {}
+
+        upserts: Dict[str, list] = {}
+        deletes: Dict[str, list] = {}
+        for (dominio, clave), valor in pendientes.items():
+            if valor is None:
+                deletes.setdefault(dominio, []).append(clave)
+            else:
+                upserts.setdefault(dominio, []).append((*clave, valor))
+        return pendientes, upserts, deletes
+
+    def _devolver_lote(self, pendientes):
+        """Reencolar un lote fallido sin pisar escrituras más nuevas"""
+        for clave, valor in pendientes.items():
+            self._pendientes.setdefault(clave, valor)
+
+    def _sentencias(self, upserts, deletes):
+        for dominio, filas in upserts.items():
+            yield self._sql_upsert(dominio), filas
+        for dominio, claves in deletes.items():
+            yield self._sql_delete(dominio), claves
+
+    def _contar(self, upserts, deletes):
+        self.stats["upserts"] += sum(len(f) for f in upserts.values())
+        self.stats["deletes"] += sum(len(c) for c in deletes.values())
+        self.stats["flushes"] += 1
+
+    def _hay_pendientes(self) -> bool:
+        return bool(self._pendientes)
+
+    async def _drenar(self, espera: float = 0.0, reintentar: bool = True):
+        """Escribir en lotes mientras haya cambios encolados; si falla, reintentar con espera creciente"""
+        if espera:
+            self._esperando = True
+            try:
+                await asyncio.sleep(espera)
+            finally:
+                self._esperando = False
+        if aiosqlite is None:
+            self._flush_sync()
+            return
+        # La conexión vive solo mientras haya cola: su hilo no es daemon
+        # y dejarla abierta bloquearía la salida del proceso
+        try:
+            conn = await aiosqlite.connect(self.path)
+            await conn.execute("PRAGMA synchronous=NORMAL")
+        except Exception as e:
+            print(f"Error abriendo SQLite: {e}")
+            if reintentar:
+                self._reintentar()
+            return
+        fallo = False
+        try:
+            while self._hay_pendientes():
+                pendientes, upserts, deletes = self._tomar_lote()
+                try:
+                    for sql, filas in self._sentencias(upserts, deletes):
+                        await conn.executemany(sql, filas)
+                    await conn.commit()
+                    self._contar(upserts, deletes)
+                except Exception as e:
+                    print(f"Error guardando en SQLite: {e}")
+                    self._devolver_lote(pendientes)
+                    fallo = True
+                    break
+        finally:
+            await conn.close()
+        if not fallo:
+            self._fallos = 0
+        elif reintentar:
+            self._reintentar()
+
+    def _reintentar(self):
+        """Volver a programar el escritor: lo devuelto a la cola no espera a otro cambio"""
+        self._fallos += 1
+        self.stats["reintentos"] += 1
+        espera = min(self.REINTENTO_MIN * 2 ** (self._fallos - 1), self.REINTENTO_MAX)
+        self._writer = asyncio.get_running_loop().create_task(self._drenar(espera))
+
+    def _flush_sync(self):
+        """Escritura síncrona (arranque, sin loop o al salir del proceso)"""
+        if not self._hay_pendientes():
+            return
+        pendientes, upserts, deletes = self._tomar_lote()
+        try:
+            conn = self._conectar_sync()
+            try:
+                for sql, filas in self._sentencias(upserts, deletes):
+                    conn.executemany(sql, filas)
+                conn.commit()
+            finally:
+                conn.close()
+            self._contar(upserts, deletes)
+        except Exception as e:
+            print(f"Error guardando en SQLite: {e}")
+            self._devolver_lote(pendientes)
+
+    async def close(self):
+        """Esperar al escritor y vaciar lo que quede en cola"""
+        writer = self._writer
+        if writer and not writer.done():
+            # Un reintento dormido no se espera: lo pendiente se escribe aquí
+            if self._esperando:
+                writer.cancel()
+            try:
+                await writer
+            except (Exception, asyncio.CancelledError):
+                pass
+        if self._writer is not writer and not self._writer.done():
+            # El escritor falló mientras se esperaba y dejó otro reintento programado
+            self._writer.cancel()
+        if self._hay_pendientes():
+            await self._drenar(reintentar=False)
+        self._flush_sync()
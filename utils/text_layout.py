@@ -0,0 +1,214 @@
+"""
+📐 Text Layout - Maquetación de texto por píxeles
+Parte el texto en líneas según el ancho real en píxeles (no por número de
+caracteres), con los avances de cada glifo cacheados por (cara, tamaño), y
+devuelve el bloque ya medido: las líneas, su ancho y el alto total. Con eso
+el builder sabe el tamaño de la imagen antes de dibujar y dibuja una sola
+vez. Los caracteres que la cara no tiene (emojis) se miden y dibujan con
+fonts/emojis.ttf a través del registro de fuentes.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from PIL import ImageDraw, ImageFont
+
+from utils.font_registry import CARA_EMOJI, fuentes as registro_fuentes
+
+
+ELIPSIS = "…"
+
+Tramo = Tuple[str, ImageFont.ImageFont]
+
+
+@dataclass
+class Linea:
+    texto: str
+    ancho: float
+    alto: int
+    tramos: List[Tramo] = field(default_factory=list)
+
+
+@dataclass
+class Bloque:
+    lineas: List[Linea]
+    interlineado: int = 0
+
+    @property
+    def alto(self) -> int:
+        if not self.lineas:
+            return 0
+        return sum(l.alto for l in self.lineas) + self.interlineado * (len(self.lineas) - 1)
+
+    @property
+    def ancho(self) -> float:
+        return max((l.ancho for l in self.lineas), default=0)
+
+    @property
+    def textos(self) -> List[str]:
+        return [l.texto for l in self.lineas]
+
+
+class MotorTexto:
+    """Medición, ajuste de línea y dibujo de bloques de texto"""
+
+    def __init__(self, registro=registro_fuentes):
+        self.registro = registro
+        # (cara, tamaño) -> {caracter: (avance, usa_emoji)}
+        self._avances: Dict[Tuple[str, int], Dict[str, Tuple[float, bool]]] = {}
+        self._altos: Dict[Tuple[str, int, bool], int] = {}
+        self.stats = {"glifos": 0, "bloques": 0}
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # 📏 MEDICIÓN
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def _glifo(self, caracter: str, cara: str, tamaño: int) -> Tuple[float, bool]:
+        clave = (self.registro.normalizar(cara), int(tamaño))
+        avances = self._avances.setdefault(clave, {})
+        glifo = avances.get(caracter)
+        if glifo is None:
+            emoji = (not self.registro.tiene_glifo(cara, tamaño, caracter)
+                     and self.registro.tiene_glifo(CARA_EMOJI, tamaño, caracter))
+            fuente = self.registro.obtener(CARA_EMOJI if emoji else cara, tamaño)
+            glifo = (fuente.getlength(caracter), emoji)
+            avances[caracter] = glifo
+            self.stats["glifos"] += 1
+        return glifo
+
+    def medir(self, texto: str, cara: str = "classic", tamaño: int = 20) -> float:
+        """Ancho en píxeles (suma de avances; no aplica kerning entre pares)"""
+        return sum(self._glifo(c, cara, tamaño)[0] for c in texto)
+
+    def _alto_linea(self, cara: str, tamaño: int, con_emoji: bool) -> int:
+        clave = (self.registro.normalizar(cara), int(tamaño), con_emoji)
+        if clave not in self._altos:
+            caras = (cara, CARA_EMOJI) if con_emoji else (cara,)
+            alto = 0
+            for c in caras:
+                fuente = self.registro.obtener(c, tamaño)
+                try:
+                    ascenso, descenso = fuente.getmetrics()
+                    alto = max(alto, ascenso + descenso)
+                except Exception:
+                    alto = max(alto, int(tamaño))
+            self._altos[clave] = alto
+        return self._altos[clave]
+
+    def _linea(self, texto: str, cara: str, tamaño: int) -> Linea:
+        glifos = [self._glifo(c, cara, tamaño) for c in texto]
+        con_emoji = any(emoji for _, emoji in glifos)
+        return Linea(
+            texto=texto,
+            ancho=sum(avance for avance, _ in glifos),
+            alto=self._alto_linea(cara, tamaño, con_emoji),
+            tramos=self.registro.tramos(texto, cara, tamaño) if con_emoji
+            else [(texto, self.registro.obtener(cara, tamaño))],
+        )
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # ↩️ AJUSTE DE LÍNEA
+    # ══════════════════════════════════════════════════════════════════════════
+
+    def envolver(self, texto: str, ancho_max: float, cara: str = "classic", tamaño: int = 20) -> List[str]:
+        """Partir en líneas que caben en ancho_max; respeta los saltos de línea del texto"""
+        lineas: List[str] = []
+        espacio = self.medir(" ", cara, tamaño)
+        for parrafo in (texto or "").split("\n"):
+            actual, ancho_actual = "", 0.0
+            for palabra in parrafo.split():
+                ancho_palabra = self.medir(palabra, cara, tamaño)
+                if actual and ancho_actual + espacio + ancho_palabra <= ancho_max:
+                    actual += " " + palabra
+                    ancho_actual += espacio + ancho_palabra
+                    continue
+                if actual:
+                    lineas.append(actual)
+                if ancho_palabra <= ancho_max:
+                    actual, ancho_actual = palabra, ancho_palabra
+                    continue
+                # Palabra más larga que la línea (URLs, "aaaaaa..."): cortar por caracteres
+                actual, ancho_actual = "", 0.0
+                for c in palabra:
+                    avance = self._glifo(c, cara, tamaño)[0]
+                    if actual and ancho_actual + avance > ancho_max:
+                        lineas.append(actual)
+                        actual, ancho_actual = "", 0.0
+                    actual += c
+                    ancho_actual += avance
+            if actual or not parrafo.strip():
+                lineas.append(actual)
+        # Sin líneas vacías al final (texto terminado en salto de línea)
+        while lineas and not lineas[-1]:
+            lineas.pop()
+        return lineas
+
+    def _recortar(self, texto: str, ancho_max: float, cara: str, tamaño: int) -> str:
+        """Última línea visible con elipsis, sin pasarse del ancho"""
+        # Fuentes pixel sin "…": se dibujaría el hueco de .notdef
+        elipsis = ELIPSIS if self.registro.tiene_glifo(cara, tamaño, ELIPSIS) else "..."
+        limite = ancho_max - self.medir(elipsis, cara, tamaño)
+        ancho = 0.0
+        for i, c in enumerate(texto):
+            ancho += self._glifo(c, cara, tamaño)[0]
+            if ancho > limite:
+                return texto[:i].rstrip() + elipsis
+        return texto.rstrip() + elipsis
+
+    def maquetar(self, texto: str, ancho_max: float, cara: str = "classic", tamaño: int = 20,
+                 interlineado: int = 0, max_lineas: Optional[int] = None) -> Bloque:
+        """Líneas medidas y alto total del bloque en una sola pasada"""
+        textos = self.envolver(texto, ancho_max, cara, tamaño)
+        if max_lineas is not None and len(textos) > max_lineas:
+            textos = textos[:max_lineas]
+            textos[-1] = self._recortar(textos[-1], ancho_max, cara, tamaño)
+        self.stats["bloques"] += 1
+        return Bloque([self._linea(t, cara, tamaño) for t in textos], interlineado)
+
+    # ══════════════════════════════════════════════════════════════════════════
+    # 🖌️ DIBUJO
+    # ══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def dibujar_linea(draw: ImageDraw.ImageDraw, xy: Tuple[float, float], linea: Linea, **kwargs):
+        x, y = xy
+        for trozo, fuente in linea.tramos:
+            draw.text((x, y), trozo, font=fuente, **kwargs)
+            x += fuente.getlength(trozo)
+
+    def dibujar(self, draw: ImageDraw.ImageDraw, bloque: Bloque, xy: Tuple[float, float],
+                ancho_caja: Optional[float] = None, alinear: str = "izquierda",
+                sombra: Optional[Tuple[tuple, int]] = None, **kwargs) -> float:
+        """
+        Dibujar el bloque desde xy (esquina superior izquierda de la caja).
+        alinear: izquierda / centro / derecha dentro de ancho_caja.
+        sombra: (color, desplazamiento) para una sombra desplazada.
+        Devuelve la y donde termina el bloque.
+        """
+        x0, y = xy
+        ancho_caja = bloque.ancho if ancho_caja is None else ancho_caja
+        for linea in bloque.lineas:
+            x = x0
+            if alinear == "centro":
+                x = x0 + (ancho_caja - linea.ancho) // 2
+            elif alinear == "derecha":
+                x = x0 + ancho_caja - linea.ancho
+            if sombra is not None:
+                color, desplazamiento = sombra
+                extra = {k: v for k, v in kwargs.items() if k != "fill"}
+                self.dibujar_linea(draw, (x + desplazamiento, y + desplazamiento), linea, fill=color, **extra)
+            self.dibujar_linea(draw, (x, y), linea, **kwargs)
+            y += linea.alto + bloque.interlineado
+        return y - bloque.interlineado if bloque.lineas else y
+
+    def estadisticas(self) -> dict:
+        return {**self.stats, "fuentes": len(self._avances)}
+
+
+# Instancia por proceso (comparte el registro de fuentes del proceso)
+maquetador = MotorTexto()
+
+
+def maquetar(texto: str, ancho_max: float, cara: str = "classic", tamaño: int = 20,
+             interlineado: int = 0, max_lineas: Optional[int] = None) -> Bloque:
+    return maquetador.maquetar(texto, ancho_max, cara, tamaño, interlineado, max_lineas)